@@ -1,36 +1,71 @@
-from fastapi import FastAPI, HTTPException, Request
+from fastapi import FastAPI, HTTPException, Request, UploadFile, File, Form
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import Response
+from starlette.middleware.gzip import GZipMiddleware, DEFAULT_EXCLUDED_CONTENT_TYPES
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from pydantic import BaseModel
 from typing import Optional, List, Dict, Any
 import secrets
 import hashlib
-from modules.prompt_generator import build_prompt, load_spirits, get_spirit_by_id
-from modules.artifact_store import save_artifact, list_artifacts, get_artifact, delete_artifact
-from modules.session_manager import (
-    create_session, get_session, list_sessions, delete_session, increment_participant_count, decrement_participant_count
-)
-from modules.session_artifact_store import (
-    save_session_artifact, list_session_artifacts, get_session_artifact, 
-    delete_session_artifact, save_culture_map_data, get_latest_culture_map_data
-)
-from modules.realtime_sync import (
-    lock_field, unlock_field, update_field_value, get_field_updates, cleanup_expired_locks, cleanup_all_stale_locks
+import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from modules.prompt_generator import build_prompt, make_prompt_payload, get_catalog, prompt_size
+from modules.spirit_graph import resolve_node
+from modules.spirit_importer import import_workbook, validate_catalog, diff_catalogs, write_catalog
+from modules.batch_prompts import parse_rows, generate_batch
+from modules.response_cache import prompt_response_cache, catalog_bodies, request_key, etag_for, etag_matches
+from modules.artifact_store import STORE_DIR
+from modules.session_manager import SESSIONS_DIR
+from modules.culture_map_store import CultureMapConflict
+from modules.result_store import ResultValidationError
+from modules.io_executors import ExecutorSaturated, run_read, run_write, executor_stats, shutdown_executors
+from modules.admission import AdmissionMiddleware, admission_stats, suggest_poll_ms
+from modules.storage_api import (
+    save_artifact, query_artifacts, get_artifact, delete_artifact,
+    create_session, get_session, list_sessions, delete_session, increment_participant_count, decrement_participant_count,
+    save_session_artifact, list_session_artifacts, query_session_artifacts, get_session_artifact,
+    delete_session_artifact, save_culture_map_data, get_latest_culture_map_data,
+    apply_culture_map_delta, list_culture_map_versions, get_culture_map_version,
+    culture_map_version_at, diff_culture_map_versions,
+    ingest_result, result_store_stats,
+    lock_field, unlock_field, update_field_value, get_field_updates, cleanup_expired_locks, cleanup_all_stale_locks,
 )
+from modules.result_analytics import contribution_aggregates, scope_for
+from modules import shared_state, jsonio
+from modules.token_store import gateway_tokens
+from modules.idempotency import IdempotencyKeyReused, idempotency_cache
+from modules.event_bus import event_bus, session_topic
+from modules.retention import ArtifactGarbageCollector, STORE_POLICY, SESSION_POLICY
 from pathlib import Path
 from fastapi.staticfiles import StaticFiles
 import time
 from datetime import datetime, timedelta
 
-app = FastAPI(title="동암정신 내재화 성과분석기 API", version="1.6")
+
+class FastJSONResponse(JSONResponse):
+	"""jsonio로 직렬화하는 JSON 응답 (orjson이 설치되어 있으면 orjson 사용)
+
+	저장소가 돌려주는 값은 이미 JSON 기본 타입이므로 큰 조회 응답은 이 클래스로 바로 감싸
+	FastAPI의 jsonable_encoder(재귀 변환, 직렬화보다 몇 배 느림)를 건너뛴다.
+	"""
+
+	def render(self, content: Any) -> bytes:
+		return jsonio.dumps(content)
+
+
+app = FastAPI(title="동암정신 내재화 성과분석기 API", version="1.6", default_response_class=FastJSONResponse)
 
 # 관리자 계정 설정
 ADMIN_PASSWORD = "WINTER09@!"
 ADMIN_PASSWORD_HASH = hashlib.sha256(ADMIN_PASSWORD.encode()).hexdigest()
 
-# 간단한 gw_* 토큰 저장소 (온프렘 전용 가벼운 메모리 보관)
-_GW_TOKENS: Dict[str, float] = {}
-_TEMP_PASSWORDS: set[str] = set()  # 필요 시 사전에 주입하거나 런타임 등록
+
+# artifact 보존 정책/고아 파일 정리 (백그라운드)
+_ARTIFACT_GC = ArtifactGarbageCollector(STORE_DIR, SESSIONS_DIR, SESSIONS_DIR.parent / ".artifact_gc.lock")
+
+# 클라이언트별 요청 수 제한 (CORS 안쪽에 두어 429 응답에도 CORS 헤더가 붙게 한다)
+app.add_middleware(AdmissionMiddleware)
 
 # CORS middleware
 app.add_middleware(
@@ -41,6 +76,70 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# 큰 응답(artifact 목록, 컬처맵 등)은 gzip으로 보낸다.
+# 카탈로그처럼 이미 압축해 둔 응답(Content-Encoding 있음)과 스트리밍(SSE, NDJSON)은 건드리지 않는다.
+try:
+	GZIP_MIN_BYTES = max(0, int(os.getenv("GZIP_MIN_BYTES", "1024")))
+	GZIP_LEVEL = min(9, max(1, int(os.getenv("GZIP_LEVEL", "5"))))
+except Exception:
+	GZIP_MIN_BYTES, GZIP_LEVEL = 1024, 5
+app.add_middleware(
+	GZipMiddleware,
+	minimum_size=GZIP_MIN_BYTES,
+	compresslevel=GZIP_LEVEL,
+	exclude_content_types=DEFAULT_EXCLUDED_CONTENT_TYPES + ("application/x-ndjson",),
+)
+
+
+@app.on_event("startup")
+async def _start_background_jobs():
+	_ARTIFACT_GC.start()
+	await event_bus.start()
+
+
+@app.on_event("shutdown")
+async def _stop_background_jobs():
+	_ARTIFACT_GC.stop()
+	await event_bus.stop()
+	shutdown_executors()
+	if _SPIRIT_IMPORT_POOL is not None:
+		_SPIRIT_IMPORT_POOL.shutdown(wait=False, cancel_futures=True)
+
+
+@app.exception_handler(IdempotencyKeyReused)
+async def _idempotency_key_reused_handler(request: Request, exc: IdempotencyKeyReused):
+	return JSONResponse(status_code=422, content={"detail": str(exc)})
+
+
+async def _idempotent(request: Request, body: BaseModel, write):
+	"""Idempotency-Key 헤더가 있으면 같은 키의 재시도/동시 중복 요청에 첫 실행 결과를 돌려준다"""
+	key = request.headers.get("idempotency-key")
+	if key is None:
+		return await write()
+	try:
+		result, replayed = await idempotency_cache.run(request.url.path, key, body.model_dump(), write)
+	except ValueError as e:
+		raise HTTPException(status_code=400, detail=str(e))
+	return FastJSONResponse(result, headers={"Idempotent-Replayed": "true" if replayed else "false"})
+
+
+@app.exception_handler(ExecutorSaturated)
+async def _executor_saturated_handler(request: Request, exc: ExecutorSaturated):
+	# 대기열이 가득 찬 경우 요청을 쌓아두지 않고 바로 돌려보낸다
+	return JSONResponse(status_code=503, content={"detail": str(exc)}, headers={"Retry-After": "1"})
+
+
+# 엑셀 파싱은 별도 프로세스에서 수행해 이벤트 루프/요청 스레드를 막지 않는다 (처음 사용할 때 생성)
+_SPIRIT_IMPORT_POOL: Optional[ProcessPoolExecutor] = None
+_SPIRIT_IMPORT_LOCK = asyncio.Lock()
+
+
+def _spirit_import_pool() -> ProcessPoolExecutor:
+	global _SPIRIT_IMPORT_POOL
+	if _SPIRIT_IMPORT_POOL is None:
+		_SPIRIT_IMPORT_POOL = ProcessPoolExecutor(max_workers=1)
+	return _SPIRIT_IMPORT_POOL
+
 
 class GeneratePromptRequest(BaseModel):
 	spiritId: str
@@ -53,6 +152,7 @@ class GeneratePromptRequest(BaseModel):
 	keyLearning: Optional[str] = None  # 상세: 교훈
 	# 하위 호환: text가 넘어오면 coreText로 매핑
 	text: Optional[str] = None
+	compact: bool = False  # 요소 목록 중복/예시 JSON을 뺀 축약 프롬프트
 
 
 class SaveArtifactRequest(BaseModel):
@@ -82,6 +182,27 @@ class SaveCultureMapRequest(BaseModel):
 	layerState: Dict[str, Any]
 
 
+class CultureMapItemChanges(BaseModel):
+	added: List[Dict[str, Any]] = []
+	updated: List[Dict[str, Any]] = []
+	removed: List[Any] = []  # id 또는 항목
+
+
+class PatchCultureMapRequest(BaseModel):
+	baseVersion: int
+	notes: Optional[CultureMapItemChanges] = None
+	connections: Optional[CultureMapItemChanges] = None
+	layerState: Optional[Dict[str, Any]] = None
+
+
+class IngestResultRequest(BaseModel):
+	result: Any  # LLM이 반환한 JSON (문자열 그대로 또는 객체)
+	sessionCode: Optional[str] = None
+	team: Optional[str] = None
+	spiritId: Optional[str] = None
+	timestamp: Optional[int] = None
+
+
 class FieldLockRequest(BaseModel):
 	sessionCode: str
 	fieldId: str
@@ -109,107 +230,304 @@ class GatewayAuthRequest(BaseModel):
 # 업로드/추출 기능은 비활성화되었습니다. 외부 LLM 분석을 위한 사용자 설명 텍스트를 사용하세요.
 
 
+def _catalog_response(request: Request, version: str, body) -> Response:
+	"""카탈로그 버전별로 미리 직렬화/압축한 본문을 돌려준다.
+
+	?v=<버전>으로 요청하면 URL이 버전마다 달라지므로 오래 캐시하게 하고,
+	그렇지 않으면 ETag로 매번 재검증하게 한다.
+	"""
+	if request.query_params.get("v") == version:
+		cache_control = "public, max-age=31536000, immutable"
+	else:
+		cache_control = "public, max-age=0, must-revalidate"
+	headers = {
+		"ETag": body.etag,
+		"Cache-Control": cache_control,
+		"Vary": "Accept-Encoding",
+		"X-Catalog-Version": version,
+	}
+	if etag_matches(request.headers.get("if-none-match"), body.etag):
+		return Response(status_code=304, headers=headers)
+	content, encoding = body.select(request.headers.get("accept-encoding"))
+	if encoding:
+		headers["Content-Encoding"] = encoding
+	return Response(content=content, media_type="application/json", headers=headers)
+
+
+async def _catalog_body(version: str, key: Optional[str], build):
+	# 카탈로그가 바뀐 직후에는 직렬화/압축(gzip 9, brotli 11)이 무거우므로 읽기 실행기에서 만든다
+	body = catalog_bodies.peek(version, key)
+	if body is None:
+		body = await run_read(catalog_bodies.get, version, key, build)
+	return body
+
+
 @app.get("/api/spirits")
-def get_spirits():
-	return load_spirits()
+async def get_spirits(request: Request):
+	catalog = await run_read(get_catalog)
+	body = await _catalog_body(catalog.version, None, lambda: catalog.data)
+	return _catalog_response(request, catalog.version, body)
+
+
+@app.get("/api/spirits/{spirit_id}")
+async def get_spirit(spirit_id: str, request: Request):
+	"""정신 하나만 조회 (작업 중인 정신만 필요한 클라이언트용)"""
+	catalog = await run_read(get_catalog)
+	spirit = catalog.get_spirit(spirit_id)
+	if spirit is None:
+		raise HTTPException(status_code=404, detail="Unknown spiritId")
+	body = await _catalog_body(catalog.version, spirit_id, lambda: spirit)
+	return _catalog_response(request, catalog.version, body)
+
+
+async def _spirit_graph_node(spirit_id: str, element_id: Optional[str] = None):
+	graph = (await run_read(get_catalog)).graphs.get(spirit_id)
+	if graph is None:
+		raise HTTPException(status_code=404, detail="Unknown spiritId")
+	if element_id is None:
+		return graph, None
+	eid = resolve_node(graph, element_id)
+	if eid is None:
+		raise HTTPException(status_code=404, detail="Unknown element_id")
+	return graph, eid
+
+
+@app.get("/api/spirits/{spirit_id}/graph")
+async def get_spirit_graph(spirit_id: str):
+	"""정신 요소 연결 그래프 전체 (노드 + 간선)"""
+	graph, _ = await _spirit_graph_node(spirit_id)
+	return FastJSONResponse(graph.to_dict())
+
+
+@app.get("/api/spirits/{spirit_id}/graph/{element_id}")
+async def get_spirit_graph_element(spirit_id: str, element_id: str):
+	"""요소의 직접 연결과 상류/하류 도달 범위"""
+	graph, eid = await _spirit_graph_node(spirit_id, element_id)
+	return {
+		"element": graph.nodes[eid],
+		"neighbors": graph.neighbors(eid),
+		"downstream": graph.closure(eid, "downstream"),
+		"upstream": graph.closure(eid, "upstream"),
+	}
+
+
+@app.get("/api/spirits/{spirit_id}/graph/{element_id}/behaviors")
+async def get_behaviors_reaching(spirit_id: str, element_id: str):
+	"""해당 요소(주로 무형 믿음)까지 연결 경로가 있는 행동 요소"""
+	graph, eid = await _spirit_graph_node(spirit_id, element_id)
+	return {"element": graph.nodes[eid], "behaviors": graph.behaviors_reaching(eid)}
+
+
+def _render_prompt_bodies(payload: Dict[str, Any], spirit: Dict[str, Any], version: str) -> Dict[bool, bytes]:
+	"""compact 여부 -> 응답 본문. 응답의 size에 두 모드 크기가 모두 들어가므로 둘 다 만든다."""
+	prompts = {compact: build_prompt(payload, spirit, version, compact=compact) for compact in (False, True)}
+	size = {"full": prompt_size(prompts[False]), "compact": prompt_size(prompts[True])}
+	return {
+		compact: jsonio.dumps({"prompt": prompt, "compact": compact, "size": size})
+		for compact, prompt in prompts.items()
+	}
+
+
+def _cache_prompt_bodies(bodies: Dict[str, bytes]) -> None:
+	for key, content in bodies.items():
+		prompt_response_cache.put(key, content)
 
 
 @app.post("/api/generate-prompt")
-def generate_prompt(body: GeneratePromptRequest):
+async def generate_prompt(body: GeneratePromptRequest, request: Request):
 	try:
-		spirits = load_spirits()
-		spirit = get_spirit_by_id(spirits, body.spiritId)
+		catalog = await run_read(get_catalog)
+		spirit = catalog.get_spirit(body.spiritId)
 		if spirit is None:
 			raise HTTPException(status_code=404, detail="Unknown spiritId")
 		# normalize
-		core = (body.coreText or body.text or "").strip()
-		if not core:
-			raise HTTPException(status_code=400, detail="coreText is required")
-		payload = {
-			"activityName": body.activityName,
-			"coreText": core,
-			"teamLeaderObservation": body.teamLeaderObservation,
-			"outcomes": body.outcomes,
-			"outputs": body.outputs,
-			"factors": body.factors,
-			"keyLearning": body.keyLearning,
-		}
-		prompt = build_prompt(payload, spirit)
-		return {"prompt": prompt}
+		try:
+			payload = make_prompt_payload(body.model_dump())
+		except ValueError as e:
+			raise HTTPException(status_code=400, detail=str(e))
+
+		# 같은 입력 + 같은 카탈로그 버전이면 결과가 같으므로 해시로 캐시/ETag를 만든다
+		key = request_key(payload, body.spiritId, catalog.version, "compact" if body.compact else "full")
+		etag = etag_for(key)
+		headers = {"ETag": etag, "Cache-Control": "no-cache"}
+		if etag_matches(request.headers.get("if-none-match"), etag):
+			return Response(status_code=304, headers=headers)
+		content = prompt_response_cache.peek(key)
+		if content is None:
+			# 다른 워커가 이미 만든 응답이 있으면 재사용
+			content = await run_read(prompt_response_cache.get_shared, key)
+		if content is None:
+			# 프롬프트 생성은 이벤트 루프 밖(읽기 실행기)에서 하고, 함께 만든 반대 모드 응답도 캐시한다
+			bodies = await run_read(_render_prompt_bodies, payload, spirit, catalog.version)
+			content = bodies[body.compact]
+			other_key = request_key(payload, body.spiritId, catalog.version, "full" if body.compact else "compact")
+			# 캐시 저장은 부가 작업이므로 실패해도 이미 만든 프롬프트는 그대로 돌려준다
+			try:
+				await run_write(_cache_prompt_bodies, {key: content, other_key: bodies[not body.compact]})
+			except ExecutorSaturated:
+				print("[WARNING] Skipped caching prompt response: write queue is full")
+			except Exception as e:
+				print(f"[WARNING] Failed to cache prompt response: {e}")
+		return Response(content=content, media_type="application/json", headers=headers)
 	except HTTPException:
 		raise
+	except ExecutorSaturated:
+		raise
 	except Exception as e:
 		raise HTTPException(status_code=400, detail=f"Failed to build prompt: {e}")
 
 
-	@app.post("/api/gateway-auth")
-	def gateway_auth(body: GatewayAuthRequest):
-		try:
-			is_admin = False
-			now = time.time()
-			expires_at = now + 24 * 3600  # 24h
-
-			# 1) 관리자 비밀번호
-			if body.password:
-				if hashlib.sha256(body.password.encode()).hexdigest() == ADMIN_PASSWORD_HASH or body.password == ADMIN_PASSWORD:
-					is_admin = True
-				else:
-					# 2) 임시 비밀번호 (온프렘 완화: 임시 저장소 없이도 길이 기준으로 허용)
-					if body.tempPassword and len(body.tempPassword) >= 3:
-						is_admin = False
-					else:
-						return {"success": False, "error": "Invalid credentials"}
+@app.post("/api/generate-prompt/batch")
+async def generate_prompt_batch(
+	file: UploadFile = File(...),
+	sessionCode: Optional[str] = Form(None),
+	save: bool = Form(True),
+	compact: bool = Form(False),
+):
+	"""CSV/JSONL/JSON 배열/XLSX 행마다 프롬프트를 만들어 NDJSON으로 완료 순서대로 스트리밍"""
+	content = await file.read()
+	try:
+		rows = await run_read(parse_rows, file.filename or "", content)
+	except ValueError as e:
+		raise HTTPException(status_code=400, detail=str(e))
+	except ExecutorSaturated:
+		raise
+	except Exception as e:
+		raise HTTPException(status_code=400, detail=f"Failed to read batch file: {e}")
+
+	if save and sessionCode and not await get_session(sessionCode, update_access_time=False):
+		raise HTTPException(status_code=404, detail="Session not found")
+
+	loop = asyncio.get_running_loop()
+
+	def _save(row: Dict[str, Any], prompt: str) -> Optional[str]:
+		# 배치 작업 스레드에서 호출된다. 다른 라우트와 같은 쓰기 실행기를 거치도록 루프에 제출하고,
+		# 대기열이 가득 차면 ExecutorSaturated가 그 행의 saveError로 전달된다.
+		if sessionCode:
+			coro = save_session_artifact(
+				session_code=sessionCode,
+				content=prompt,
+				team=row.get("team"),
+				label=row.get("label") or row.get("activityName"),
+				type_="prompt",
+			)
+		else:
+			coro = save_artifact(
+				content=prompt,
+				team=row.get("team"),
+				label=row.get("label") or row.get("activityName"),
+				type_="prompt",
+			)
+		art = asyncio.run_coroutine_threadsafe(coro, loop).result()
+		return art["id"] if art else None
+
+	catalog = await run_read(get_catalog)
+
+	def _stream():
+		for result in generate_batch(rows, catalog, _save if save else None, compact=compact):
+			yield jsonio.dumps_text(result) + "\n"
+
+	return StreamingResponse(_stream(), media_type="application/x-ndjson")
+
+
+def _temp_password_ok(temp_password: Optional[str]) -> bool:
+	# 온프렘 완화: 임시 비밀번호 저장소 없이 길이 기준으로만 허용한다
+	return bool(temp_password) and len(temp_password) >= 3
+
+
+@app.post("/api/gateway-auth")
+async def gateway_auth(body: GatewayAuthRequest):
+	try:
+		is_admin = False
+
+		# 1) 관리자 비밀번호
+		if body.password:
+			if hashlib.sha256(body.password.encode()).hexdigest() == ADMIN_PASSWORD_HASH or body.password == ADMIN_PASSWORD:
+				is_admin = True
 			else:
-				# password 미제공 시 tempPassword만 검사 (온프렘 완화)
-				if body.tempPassword and len(body.tempPassword) >= 3:
+				# 2) 임시 비밀번호 (온프렘 완화: 임시 저장소 없이도 길이 기준으로 허용)
+				if _temp_password_ok(body.tempPassword):
 					is_admin = False
 				else:
 					return {"success": False, "error": "Invalid credentials"}
+		else:
+			# password 미제공 시 tempPassword만 검사 (온프렘 완화)
+			if _temp_password_ok(body.tempPassword):
+				is_admin = False
+			else:
+				return {"success": False, "error": "Invalid credentials"}
 
-			# gw_* 토큰 발급
-			token = f"gw_{secrets.token_urlsafe(32)}"
-			_GW_TOKENS[token] = expires_at
+		# gw_* 토큰 발급
+		token = f"gw_{secrets.token_urlsafe(32)}"
+		# 공유 저장소에도 기록해야 재시작 후/다른 워커에서도 만료 시각을 확인할 수 있다
+		expires_at = await run_write(gateway_tokens.issue, token)
 
-			return {
-				"success": True,
-				"sessionToken": token,
-				"isAdmin": is_admin,
-				"expiresAt": int(expires_at)
-			}
-		except Exception as e:
-			raise HTTPException(status_code=500, detail=f"Gateway auth failed: {e}")
+		return {
+			"success": True,
+			"sessionToken": token,
+			"isAdmin": is_admin,
+			"expiresAt": int(expires_at)
+		}
+	except ExecutorSaturated:
+		raise
+	except Exception as e:
+		raise HTTPException(status_code=500, detail=f"Gateway auth failed: {e}")
 
 
 @app.post("/api/artifacts")
-def create_artifact(body: SaveArtifactRequest):
-	try:
-		art = save_artifact(
-			content=body.content,
-			team=body.team,
-			label=body.label,
-			type_=body.type,
-		)
-		return {"id": art["id"]}
-	except Exception as e:
-		raise HTTPException(status_code=400, detail=f"Failed to save artifact: {e}")
+async def create_artifact(body: SaveArtifactRequest, request: Request):
+	async def _write():
+		try:
+			art = await save_artifact(
+				content=body.content,
+				team=body.team,
+				label=body.label,
+				type_=body.type,
+			)
+			return {"id": art["id"]}
+		except ExecutorSaturated:
+			raise
+		except Exception as e:
+			raise HTTPException(status_code=400, detail=f"Failed to save artifact: {e}")
+
+	return await _idempotent(request, body, _write)
 
 
 @app.get("/api/artifacts")
-def get_artifacts():
-	return {"items": list_artifacts()}
+async def get_artifacts(
+	type: Optional[str] = None,
+	team: Optional[str] = None,
+	labelPrefix: Optional[str] = None,
+	createdFrom: Optional[int] = None,
+	createdTo: Optional[int] = None,
+	limit: Optional[int] = None,
+	cursor: Optional[str] = None,
+):
+	try:
+		return FastJSONResponse(await query_artifacts(
+			type_=type,
+			team=team,
+			label_prefix=labelPrefix,
+			created_from=createdFrom,
+			created_to=createdTo,
+			limit=limit,
+			cursor=cursor,
+		))
+	except ValueError as e:
+		raise HTTPException(status_code=400, detail=str(e))
 
 
 @app.get("/api/artifacts/{artifact_id}")
-def read_artifact(artifact_id: str):
-	art = get_artifact(artifact_id)
+async def read_artifact(artifact_id: str):
+	art = await get_artifact(artifact_id)
 	if not art:
 		raise HTTPException(status_code=404, detail="artifact not found")
-	return art
+	return FastJSONResponse(art)
 
 
 @app.delete("/api/artifacts/{artifact_id}")
-def remove_artifact(artifact_id: str):
-	ok = delete_artifact(artifact_id)
+async def remove_artifact(artifact_id: str):
+	ok = await delete_artifact(artifact_id)
 	if not ok:
 		raise HTTPException(status_code=404, detail="artifact not found")
 	return {"ok": True}
@@ -220,72 +538,74 @@ def remove_artifact(artifact_id: str):
 # ==============================================================================
 
 @app.post("/api/sessions")
-def create_new_session(body: CreateSessionRequest):
-	try:
-		session = create_session(name=body.name, description=body.description)
-		return session
-	except Exception as e:
-		raise HTTPException(status_code=400, detail=f"Failed to create session: {e}")
+async def create_new_session(body: CreateSessionRequest, request: Request):
+	async def _write():
+		try:
+			session = await create_session(name=body.name, description=body.description)
+			return session
+		except ExecutorSaturated:
+			raise
+		except Exception as e:
+			raise HTTPException(status_code=400, detail=f"Failed to create session: {e}")
+
+	return await _idempotent(request, body, _write)
 
 
 @app.get("/api/sessions")
-def get_all_sessions():
-	return {"sessions": list_sessions()}
+async def get_all_sessions():
+	return FastJSONResponse({"sessions": await list_sessions()})
 
 
 @app.get("/api/sessions/{session_code}")
-def get_session_info(session_code: str):
-	session = get_session(session_code)
+async def get_session_info(session_code: str):
+	session = await get_session(session_code)
 	if not session:
 		raise HTTPException(status_code=404, detail="Session not found")
 	return session
 
 
 @app.post("/api/sessions/{session_code}/join")
-def join_session(session_code: str):
-	session = get_session(session_code)
+async def join_session(session_code: str):
+	session = await get_session(session_code)
 	if not session:
 		raise HTTPException(status_code=404, detail="Session not found")
-	increment_participant_count(session_code)
+	await increment_participant_count(session_code)
 	return {"message": "Joined session successfully", "session": session}
 
 
 @app.post("/api/sessions/{session_code}/leave")
-def leave_session(session_code: str):
-	session = get_session(session_code)
+async def leave_session(session_code: str):
+	session = await get_session(session_code)
 	if not session:
 		raise HTTPException(status_code=404, detail="Session not found")
 	
-	decrement_participant_count(session_code)
+	await decrement_participant_count(session_code)
 	
 	# 참가자가 0명이 되면 세션을 자동으로 정리
-	updated_session = get_session(session_code, update_access_time=False)
+	updated_session = await get_session(session_code, update_access_time=False)
 	if updated_session and updated_session.get("participantCount", 0) <= 0:
 		print(f"[INFO] Auto-deleting empty session: {session_code}")
-		delete_session(session_code)
+		await delete_session(session_code)
 		return {"message": "Left session successfully - session deleted (empty)"}
 	
 	return {"message": "Left session successfully"}
 
 
 @app.delete("/api/sessions/{session_code}")
-def remove_session(session_code: str):
-	success = delete_session(session_code)
+async def remove_session(session_code: str):
+	success = await delete_session(session_code)
 	if not success:
 		raise HTTPException(status_code=404, detail="Session not found")
 	return {"ok": True}
 
 
-@app.post("/api/sessions/cleanup-all")
-def cleanup_all_sessions():
-	"""모든 세션을 정리하는 관리용 API"""
+def _cleanup_all_sessions():
 	try:
 		from modules.session_manager import _load_sessions_index, _save_sessions_index
 		import shutil
-		from pathlib import Path
 		
 		# 모든 세션 디렉토리 삭제
-		sessions_dir = Path(__file__).resolve().parent.parent / "uploads" / "sessions"
+		sessions_dir = SESSIONS_DIR
 		removed_count = 0
 		
 		idx = _load_sessions_index()
@@ -312,9 +632,13 @@ def cleanup_all_sessions():
 		raise HTTPException(status_code=500, detail=f"Failed to cleanup sessions: {e}")
 
 
-@app.post("/api/sessions/reset-participant-counts")
-def reset_participant_counts():
-	"""모든 세션의 참가자 수를 0으로 초기화"""
+@app.post("/api/sessions/cleanup-all")
+async def cleanup_all_sessions():
+	"""모든 세션을 정리하는 관리용 API"""
+	return await run_write(_cleanup_all_sessions)
+
+
+def _reset_participant_counts():
 	try:
 		from modules.session_manager import _load_sessions_index, _save_sessions_index
 		
@@ -337,48 +661,80 @@ def reset_participant_counts():
 		raise HTTPException(status_code=500, detail=f"Failed to reset participant counts: {e}")
 
 
+@app.post("/api/sessions/reset-participant-counts")
+async def reset_participant_counts():
+	"""모든 세션의 참가자 수를 0으로 초기화"""
+	return await run_write(_reset_participant_counts)
+
+
 # ==============================================================================
 # Session-specific Artifact APIs
 # ==============================================================================
 
 @app.post("/api/session-artifacts")
-def create_session_artifact(body: SaveSessionArtifactRequest):
-	try:
-		artifact = save_session_artifact(
-			session_code=body.sessionCode,
-			content=body.content,
-			team=body.team,
-			label=body.label,
-			type_=body.type,
-		)
-		if not artifact:
-			raise HTTPException(status_code=404, detail="Session not found")
-		return {"id": artifact["id"]}
-	except HTTPException:
-		raise
-	except Exception as e:
-		raise HTTPException(status_code=400, detail=f"Failed to save session artifact: {e}")
+async def create_session_artifact(body: SaveSessionArtifactRequest, request: Request):
+	async def _write():
+		try:
+			artifact = await save_session_artifact(
+				session_code=body.sessionCode,
+				content=body.content,
+				team=body.team,
+				label=body.label,
+				type_=body.type,
+			)
+			if not artifact:
+				raise HTTPException(status_code=404, detail="Session not found")
+			return {"id": artifact["id"]}
+		except HTTPException:
+			raise
+		except ExecutorSaturated:
+			raise
+		except Exception as e:
+			raise HTTPException(status_code=400, detail=f"Failed to save session artifact: {e}")
+
+	return await _idempotent(request, body, _write)
 
 
 @app.get("/api/session-artifacts/{session_code}")
-def get_session_artifacts(session_code: str):
-	session = get_session(session_code)
+async def get_session_artifacts(
+	session_code: str,
+	type: Optional[str] = None,
+	team: Optional[str] = None,
+	labelPrefix: Optional[str] = None,
+	createdFrom: Optional[int] = None,
+	createdTo: Optional[int] = None,
+	limit: Optional[int] = None,
+	cursor: Optional[str] = None,
+):
+	session = await get_session(session_code)
 	if not session:
 		raise HTTPException(status_code=404, detail="Session not found")
-	return {"items": list_session_artifacts(session_code)}
+	try:
+		return FastJSONResponse(await query_session_artifacts(
+			session_code,
+			type_=type,
+			team=team,
+			label_prefix=labelPrefix,
+			created_from=createdFrom,
+			created_to=createdTo,
+			limit=limit,
+			cursor=cursor,
+		))
+	except ValueError as e:
+		raise HTTPException(status_code=400, detail=str(e))
 
 
 @app.get("/api/session-artifacts/{session_code}/{artifact_id}")
-def read_session_artifact(session_code: str, artifact_id: str):
-	artifact = get_session_artifact(session_code, artifact_id)
+async def read_session_artifact(session_code: str, artifact_id: str):
+	artifact = await get_session_artifact(session_code, artifact_id)
 	if not artifact:
 		raise HTTPException(status_code=404, detail="Artifact not found")
-	return artifact
+	return FastJSONResponse(artifact)
 
 
 @app.delete("/api/session-artifacts/{session_code}/{artifact_id}")
-def remove_session_artifact(session_code: str, artifact_id: str):
-	success = delete_session_artifact(session_code, artifact_id)
+async def remove_session_artifact(session_code: str, artifact_id: str):
+	success = await delete_session_artifact(session_code, artifact_id)
 	if not success:
 		raise HTTPException(status_code=404, detail="Artifact not found")
 	return {"ok": True}
@@ -389,60 +745,220 @@ def remove_session_artifact(session_code: str, artifact_id: str):
 # ==============================================================================
 
 @app.post("/api/culture-map")
-def save_culture_map(body: SaveCultureMapRequest):
-	try:
-		session = get_session(body.sessionCode)
-		if not session:
-			raise HTTPException(status_code=404, detail="Session not found")
+async def save_culture_map(body: SaveCultureMapRequest, request: Request):
+	async def _write():
+		try:
+			session = await get_session(body.sessionCode)
+			if not session:
+				raise HTTPException(status_code=404, detail="Session not found")
 		
-		artifact = save_culture_map_data(
-			session_code=body.sessionCode,
-			notes=body.notes,
-			connections=body.connections,
-			layer_state=body.layerState
-		)
+			artifact = await save_culture_map_data(
+				session_code=body.sessionCode,
+				notes=body.notes,
+				connections=body.connections,
+				layer_state=body.layerState
+			)
 		
-		if not artifact:
-			raise HTTPException(status_code=500, detail="Failed to save culture map")
+			if not artifact:
+				raise HTTPException(status_code=500, detail="Failed to save culture map")
+			_publish_session_event(body.sessionCode, "culture_map.saved", version=artifact.get("version"))
 		
-		return {"id": artifact["id"], "message": "Culture map saved successfully"}
-	except HTTPException:
-		raise
-	except Exception as e:
-		raise HTTPException(status_code=400, detail=f"Failed to save culture map: {e}")
+			return {"id": artifact["id"], "version": artifact.get("version"), "message": "Culture map saved successfully"}
+		except HTTPException:
+			raise
+		except ExecutorSaturated:
+			raise
+		except Exception as e:
+			raise HTTPException(status_code=400, detail=f"Failed to save culture map: {e}")
+
+	return await _idempotent(request, body, _write)
+
+
+@app.patch("/api/culture-map/{session_code}")
+async def patch_culture_map(session_code: str, body: PatchCultureMapRequest, request: Request):
+	"""baseVersion 기준 변경분(추가/수정/삭제된 노트·연결)만 저장"""
+	async def _write():
+		session = await get_session(session_code)
+		if not session:
+			raise HTTPException(status_code=404, detail="Session not found")
+		try:
+			ops = {
+				"notes": body.notes.model_dump() if body.notes else {},
+				"connections": body.connections.model_dump() if body.connections else {},
+				"layerState": body.layerState,
+			}
+			result = await apply_culture_map_delta(session_code, body.baseVersion, ops)
+			if not result:
+				raise HTTPException(status_code=500, detail="Failed to save culture map")
+			_publish_session_event(session_code, "culture_map.saved", version=result["version"])
+			return {"id": result["id"], "version": result["version"], "message": "Culture map updated successfully"}
+		except CultureMapConflict as e:
+			raise HTTPException(status_code=409, detail={"message": str(e), "currentVersion": e.current_version})
+		except HTTPException:
+			raise
+		except ValueError as e:
+			raise HTTPException(status_code=422, detail=str(e))
+		except ExecutorSaturated:
+			raise
+		except Exception as e:
+			raise HTTPException(status_code=400, detail=f"Failed to update culture map: {e}")
+
+	return await _idempotent(request, body, _write)
 
 
 @app.get("/api/culture-map/{session_code}")
-def get_culture_map(session_code: str):
-	session = get_session(session_code)
+async def get_culture_map(session_code: str):
+	session = await get_session(session_code)
 	if not session:
 		raise HTTPException(status_code=404, detail="Session not found")
 	
-	culture_map_data = get_latest_culture_map_data(session_code)
+	culture_map_data = await get_latest_culture_map_data(session_code)
 	if not culture_map_data:
 		return {"notes": [], "connections": [], "layerState": None}
 	
-	return culture_map_data
+	return FastJSONResponse(culture_map_data)
+
+
+@app.get("/api/culture-map/{session_code}/history")
+async def get_culture_map_history(session_code: str):
+	"""컬처맵 버전 목록 (오래된 순)"""
+	session = await get_session(session_code, update_access_time=False)
+	if not session:
+		raise HTTPException(status_code=404, detail="Session not found")
+	versions = await list_culture_map_versions(session_code) or []
+	return FastJSONResponse({"versions": versions, "latestVersion": versions[-1]["version"] if versions else 0})
+
+
+@app.get("/api/culture-map/{session_code}/versions/{version}")
+async def get_culture_map_at_version(session_code: str, version: int):
+	data = await get_culture_map_version(session_code, version)
+	if data is None:
+		raise HTTPException(status_code=404, detail="Version not found")
+	return FastJSONResponse(data)
+
+
+@app.get("/api/culture-map/{session_code}/at")
+async def get_culture_map_at_time(session_code: str, timestamp: int):
+	"""timestamp(초) 시점의 컬처맵"""
+	version = await culture_map_version_at(session_code, timestamp)
+	if version is None:
+		raise HTTPException(status_code=404, detail="No culture map saved before this time")
+	return FastJSONResponse(await get_culture_map_version(session_code, version))
+
+
+@app.get("/api/culture-map/{session_code}/diff")
+async def get_culture_map_diff(session_code: str, fromVersion: int, toVersion: int):
+	diff = await diff_culture_map_versions(session_code, fromVersion, toVersion)
+	if diff is None:
+		raise HTTPException(status_code=404, detail="Version not found")
+	return FastJSONResponse(diff)
+
+
+# ==============================================================================
+# Result ingestion
+# ==============================================================================
+
+@app.post("/api/results")
+async def ingest_analysis_result(body: IngestResultRequest):
+	"""붙여넣은 분석 결과를 검증해 요소별 행으로 결과 저장소에 추가"""
+	if body.sessionCode and not await get_session(body.sessionCode, update_access_time=False):
+		raise HTTPException(status_code=404, detail="Session not found")
+	catalog = await run_read(get_catalog)
+	if body.spiritId and catalog.get_spirit(body.spiritId) is None:
+		raise HTTPException(status_code=404, detail="Unknown spiritId")
+	try:
+		info = await ingest_result(
+			body.result,
+			session_code=body.sessionCode,
+			team=body.team,
+			spirit_id=body.spiritId,
+			catalog=catalog,
+			timestamp=body.timestamp,
+		)
+	except ResultValidationError as e:
+		raise HTTPException(status_code=422, detail=str(e))
+	except ExecutorSaturated:
+		raise
+	except Exception as e:
+		print(f"[ERROR] Failed to ingest result: {e}")
+		raise HTTPException(status_code=500, detail="Failed to ingest result")
+	try:
+		await run_read(contribution_aggregates.refresh, catalog)
+	except Exception as e:
+		# 집계는 다음 조회 때 watermark부터 다시 따라잡는다
+		print(f"[WARNING] Failed to update contribution aggregates: {e}")
+	return info
+
+
+@app.get("/api/results/stats")
+async def get_result_store_stats():
+	return await result_store_stats()
+
+
+@app.get("/api/analytics/contributions")
+async def get_contribution_matrix(sessionCode: Optional[str] = None, team: Optional[str] = None, spiritId: Optional[str] = None):
+	"""spirit × element 기여도 행렬 (세션/팀/세션+팀/전체)"""
+	await run_read(contribution_aggregates.refresh)
+	return contribution_aggregates.matrix(scope_for(sessionCode, team), spiritId)
 
 
 # ==============================================================================
 # Realtime Sync APIs
 # ==============================================================================
 
+def _publish_session_event(session_code: str, type_: str, **data: Any) -> None:
+	"""세션 이벤트를 모든 워커의 구독자(SSE)에게 알린다. 실패해도 요청은 성공으로 처리."""
+	try:
+		event_bus.publish(session_topic(session_code), {"type": type_, "sessionCode": session_code, **data})
+	except Exception as e:
+		print(f"[WARNING] Failed to publish {type_} for session {session_code}: {e}")
+
+
+@app.get("/api/sessions/{session_code}/events")
+async def session_events(session_code: str, request: Request):
+	"""세션 이벤트 스트림 (text/event-stream). resync 이벤트를 받으면 전체 상태를 다시 읽는다."""
+	session = await get_session(session_code, update_access_time=False)
+	if not session:
+		raise HTTPException(status_code=404, detail="Session not found")
+	sub = event_bus.subscribe(session_topic(session_code))
+
+	async def _stream():
+		try:
+			yield "retry: 2000\n\n"
+			while not await request.is_disconnected():
+				event = await sub.get(timeout=15)
+				if event is None:
+					yield ": keepalive\n\n"
+					continue
+				yield f"event: {event.get('type', 'message')}\ndata: {jsonio.dumps_text(event)}\n\n"
+		finally:
+			event_bus.unsubscribe(sub)
+
+	return StreamingResponse(
+		_stream(),
+		media_type="text/event-stream",
+		headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+	)
+
+
 @app.post("/api/fields/lock")
-def lock_input_field(body: FieldLockRequest):
+async def lock_input_field(body: FieldLockRequest):
 	try:
 		print(f"[DEBUG] Lock request - sessionCode: {body.sessionCode}, fieldId: {body.fieldId}, userId: {body.userId}")
 		# 잠금 요청이므로 접근 시간은 업데이트하지 않음
-		session = get_session(body.sessionCode, update_access_time=False)
+		session = await get_session(body.sessionCode, update_access_time=False)
 		print(f"[DEBUG] Session lookup result: {session}")
 		if not session:
 			print(f"[WARNING] Session not found during field lock for code: {body.sessionCode}")
 			return {"success": False, "message": "Session not found"}
 		
-		success = lock_field(body.sessionCode, body.fieldId, body.userId)
+		success = await lock_field(body.sessionCode, body.fieldId, body.userId)
 		print(f"[DEBUG] Lock field result: {success}")
+		if success:
+			_publish_session_event(body.sessionCode, "field.locked", fieldId=body.fieldId, userId=body.userId)
 		return {"success": success, "message": "Field locked" if success else "Field is locked by another user"}
+	except ExecutorSaturated:
+		raise
 	except Exception as e:
 		print(f"[ERROR] Failed to lock field: {e}")
 		import traceback
@@ -451,18 +967,21 @@ def lock_input_field(body: FieldLockRequest):
 
 
 @app.post("/api/fields/unlock")
-def unlock_input_field(body: FieldLockRequest):
+async def unlock_input_field(body: FieldLockRequest):
 	try:
 		print(f"[DEBUG] Unlock request - sessionCode: {body.sessionCode}, fieldId: {body.fieldId}, userId: {body.userId}")
 		# 잠금 해제 요청이므로 접근 시간은 업데이트하지 않음
-		session = get_session(body.sessionCode, update_access_time=False)
+		session = await get_session(body.sessionCode, update_access_time=False)
 		print(f"[DEBUG] Session lookup result: {session}")
 		if not session:
 			print(f"[WARNING] Session not found during field unlock for code: {body.sessionCode}")
 			return {"success": True, "message": "Field unlocked (session not found)"}
 		
-		unlock_field(body.sessionCode, body.fieldId, body.userId)
+		await unlock_field(body.sessionCode, body.fieldId, body.userId)
+		_publish_session_event(body.sessionCode, "field.unlocked", fieldId=body.fieldId, userId=body.userId)
 		return {"success": True, "message": "Field unlocked"}
+	except ExecutorSaturated:
+		raise
 	except Exception as e:
 		print(f"[ERROR] Failed to unlock field: {e}")
 		import traceback
@@ -471,19 +990,25 @@ def unlock_input_field(body: FieldLockRequest):
 
 
 @app.post("/api/fields/update")
-def update_input_field(body: FieldUpdateRequest):
+async def update_input_field(body: FieldUpdateRequest):
 	try:
 		print(f"[DEBUG] Update request - sessionCode: {body.sessionCode}, fieldId: {body.fieldId}, userId: {body.userId}")
 		# 필드 업데이트는 실제 사용자 작업이므로 접근 시간 업데이트
-		session = get_session(body.sessionCode, update_access_time=True)
+		session = await get_session(body.sessionCode, update_access_time=True)
 		print(f"[DEBUG] Session lookup result: {session}")
 		if not session:
 			print(f"[WARNING] Session not found during field update for code: {body.sessionCode}")
 			return {"success": False, "message": "Session not found"}
 		
-		success = update_field_value(body.sessionCode, body.fieldId, body.value, body.userId)
+		success = await update_field_value(body.sessionCode, body.fieldId, body.value, body.userId)
 		print(f"[DEBUG] Update field result: {success}")
+		if success:
+			_publish_session_event(
+				body.sessionCode, "field.updated", fieldId=body.fieldId, userId=body.userId, value=body.value
+			)
 		return {"success": success, "message": "Field updated" if success else "Field is locked by another user"}
+	except ExecutorSaturated:
+		raise
 	except Exception as e:
 		print(f"[ERROR] Failed to update field: {e}")
 		import traceback
@@ -492,41 +1017,50 @@ def update_input_field(body: FieldUpdateRequest):
 
 
 @app.get("/api/fields/{session_code}/updates")
-def get_field_updates_api(session_code: str, since: int = 0):
+async def get_field_updates_api(session_code: str, since: int = 0):
 	try:
 		# 폴링 요청이므로 접근 시간은 업데이트하지 않음
-		session = get_session(session_code, update_access_time=False)
+		session = await get_session(session_code, update_access_time=False)
 		if not session:
 			# 폴링 요청에서 세션을 찾을 수 없는 경우, 빈 응답을 반환하여 클라이언트가 계속 폴링할 수 있도록 함
 			print(f"[WARNING] Session {session_code} not found during polling, returning empty response")
-			return {"fields": {}, "values": {}, "lastUpdate": since}
+			return {"fields": {}, "values": {}, "lastUpdate": since, "nextPollMs": suggest_poll_ms(since)}
 		
 		# 만료된 잠금들 정리
-		cleanup_expired_locks(session_code)
+		await cleanup_expired_locks(session_code)
 		
-		updates = get_field_updates(session_code, since)
-		return updates
+		updates = await get_field_updates(session_code, since)
+		# 편집 중(활성 잠금)이면 빠르게, 유휴/부하 상태면 천천히 다시 폴링하도록 제안
+		active_locks = sum(1 for state in (updates.get("fields") or {}).values() if state.get("isActive"))
+		updates["nextPollMs"] = suggest_poll_ms(updates.get("lastUpdate"), active_locks)
+		return FastJSONResponse(updates)
 	except HTTPException:
 		# HTTPException은 다시 던짐 (예: 다른 엔드포인트에서 호출된 경우)
 		raise
+	except ExecutorSaturated:
+		raise
 	except Exception as e:
 		print(f"[ERROR] Failed to get field updates for session {session_code}: {e}")
 		import traceback
 		traceback.print_exc()
 		# 폴링 요청에서는 500 대신 빈 응답을 반환하여 클라이언트가 계속 시도할 수 있도록 함
-		return {"fields": {}, "values": {}, "lastUpdate": since}
+		return {"fields": {}, "values": {}, "lastUpdate": since, "nextPollMs": suggest_poll_ms(since)}
 
 
 @app.post("/api/fields/{session_code}/cleanup")
-def cleanup_stale_locks_api(session_code: str):
+async def cleanup_stale_locks_api(session_code: str):
 	try:
 		# 정리 요청이므로 접근 시간은 업데이트하지 않음
-		session = get_session(session_code, update_access_time=False)
+		session = await get_session(session_code, update_access_time=False)
 		if not session:
 			raise HTTPException(status_code=404, detail="Session not found")
 		
-		removed_count = cleanup_all_stale_locks(session_code)
+		removed_count = await cleanup_all_stale_locks(session_code)
+		if removed_count:
+			_publish_session_event(session_code, "locks.cleaned", removed=removed_count)
 		return {"removed": removed_count, "message": f"Cleaned up {removed_count} stale locks"}
+	except ExecutorSaturated:
+		raise
 	except Exception as e:
 		print(f"[ERROR] Failed to cleanup stale locks for session {session_code}: {e}")
 		import traceback
@@ -539,7 +1073,7 @@ def cleanup_stale_locks_api(session_code: str):
 # ==============================================================================
 
 @app.post("/api/admin/login")
-def admin_login(body: AdminLoginRequest):
+async def admin_login(body: AdminLoginRequest):
 	try:
 		if body.username != "ADMIN":
 			raise HTTPException(status_code=401, detail="Invalid credentials")
@@ -559,43 +1093,167 @@ def admin_login(body: AdminLoginRequest):
 		}
 	except HTTPException:
 		raise
+	except ExecutorSaturated:
+		raise
 	except Exception as e:
 		raise HTTPException(status_code=500, detail=f"Login failed: {e}")
 
 
 @app.get("/api/admin/sessions")
-def admin_get_all_sessions():
+async def admin_get_all_sessions():
 	"""관리자용 모든 세션 조회 (추가 정보 포함)"""
 	try:
-		sessions = list_sessions()
+		sessions = await list_sessions()
 		# 각 세션에 대한 추가 정보를 포함할 수 있음
 		for session in sessions:
 			# 세션별 아티팩트 수 등 추가 정보
 			try:
-				artifacts = list_session_artifacts(session.get("code", ""))
+				artifacts = await list_session_artifacts(session.get("code", ""))
 				session["artifactCount"] = len(artifacts)
+			except ExecutorSaturated:
+				raise
 			except:
 				session["artifactCount"] = 0
 		
 		return {"sessions": sessions}
+	except ExecutorSaturated:
+		raise
 	except Exception as e:
 		raise HTTPException(status_code=500, detail=f"Failed to get sessions: {e}")
 
 
 @app.delete("/api/admin/sessions/{session_code}")
-def admin_delete_session(session_code: str):
+async def admin_delete_session(session_code: str):
 	"""관리자용 세션 강제 삭제"""
 	try:
-		success = delete_session(session_code)
+		success = await delete_session(session_code)
 		if not success:
 			raise HTTPException(status_code=404, detail="Session not found")
 		return {"message": f"Session {session_code} deleted successfully"}
 	except HTTPException:
 		raise
+	except ExecutorSaturated:
+		raise
 	except Exception as e:
 		raise HTTPException(status_code=500, detail=f"Failed to delete session: {e}")
 
 
+@app.post("/api/admin/spirits/import")
+async def admin_import_spirits(file: UploadFile = File(...), dryRun: bool = Form(False)):
+	"""엑셀 업로드로 정신 카탈로그를 갱신: 백그라운드 프로세스에서 파싱 → 검증 → 현재 카탈로그와 비교 → 교체"""
+	if not (file.filename or "").lower().endswith(".xlsx"):
+		raise HTTPException(status_code=400, detail="Only .xlsx files are supported")
+	content = await file.read()
+	loop = asyncio.get_running_loop()
+
+	async with _SPIRIT_IMPORT_LOCK:
+		try:
+			report = await loop.run_in_executor(
+				_spirit_import_pool(), partial(import_workbook, content, write=False, force=True, workers=1)
+			)
+		except Exception as e:
+			raise HTTPException(status_code=400, detail=f"Failed to read workbook: {e}")
+
+		errors, warnings = validate_catalog(report["data"])
+		if report["failed"]:
+			errors += [f"sheet '{title}': {err}" for title, err in report["failed"].items()]
+		if errors:
+			raise HTTPException(status_code=422, detail={"message": "Invalid spirit catalog", "errors": errors})
+
+		current = await run_read(get_catalog)
+		diff = diff_catalogs(current.data, report["data"])
+		result = {
+			"applied": False,
+			"previousVersion": current.version,
+			"version": current.version,
+			"updatedSheets": report["updated"],
+			"unmatchedSheets": report["unmatched"],
+			"warnings": warnings,
+			"diff": diff,
+		}
+		if dryRun or not any(diff.values()):
+			return result
+
+		# 파일 교체 후 강제로 다시 읽으면 카탈로그 버전(내용 해시)이 바뀌어
+		# 프롬프트 템플릿, 응답 캐시, /api/spirits ETag가 한 번에 무효화된다
+		def _swap():
+			write_catalog(report["data"], report["hashes"])
+			return get_catalog(force_reload=True)
+
+		try:
+			catalog = await run_write(_swap)
+		except ExecutorSaturated:
+			raise
+		except Exception as e:
+			print(f"[ERROR] Failed to apply spirit catalog: {e}")
+			raise HTTPException(status_code=500, detail=f"Failed to apply spirit catalog: {e}")
+		result.update({"applied": True, "version": catalog.version, "revision": catalog.revision})
+		return result
+
+
+@app.get("/api/admin/retention")
+async def admin_get_retention():
+	"""artifact 보존 정책과 마지막 정리 결과 조회"""
+	return {
+		"storePolicy": STORE_POLICY.to_dict(),
+		"sessionPolicy": SESSION_POLICY.to_dict(),
+		"lastRun": _ARTIFACT_GC.last_run,
+	}
+
+
+@app.post("/api/admin/retention/gc")
+async def admin_run_retention_gc(stores: int = 50):
+	"""artifact 정리를 즉시 한 번 수행 (최대 stores개 저장소)"""
+	try:
+		return await run_write(_ARTIFACT_GC.run_once, store_budget=max(1, stores))
+	except ExecutorSaturated:
+		raise
+	except Exception as e:
+		raise HTTPException(status_code=500, detail=f"Retention GC failed: {e}")
+
+
+@app.get("/api/admin/io")
+async def admin_io_stats():
+	"""읽기/쓰기 I/O 실행기 대기열 길이와 대기 시간"""
+	return executor_stats()
+
+
+@app.get("/api/admin/admission")
+async def admin_admission_stats():
+	"""클라이언트별 요청 수 제한 현황 (이 워커 기준)"""
+	return admission_stats()
+
+
+@app.get("/api/admin/events")
+async def admin_event_bus_stats():
+	"""워커 간 이벤트 버스 상태 (이 요청을 처리한 워커 기준)"""
+	return event_bus.stats()
+
+
+@app.get("/api/admin/worker")
+async def admin_worker_info():
+	"""이 요청을 처리한 워커 프로세스와 공유 상태 정보 (uvicorn --workers N 점검용)"""
+	catalog = await run_read(get_catalog)
+	return {
+		"pid": os.getpid(),
+		"catalogVersion": catalog.version,
+		"sharedState": str(shared_state.SHARED_STATE_PATH),
+		"promptCache": await run_read(prompt_response_cache.stats),
+		"gatewayTokens": gateway_tokens.stats(),
+	}
+
+
+@app.post("/api/admin/analytics/rebuild")
+async def admin_rebuild_analytics():
+	"""결과 저장소 전체로 기여도 집계를 다시 만들고 증분 집계와 일치했는지 보고"""
+	try:
+		return await run_read(contribution_aggregates.rebuild)
+	except ExecutorSaturated:
+		raise
+	except Exception as e:
+		raise HTTPException(status_code=500, detail=f"Analytics rebuild failed: {e}")
+
+
 # ==============================================================================
 # Gateway (on-prem parity for Vercel Functions)
 # ==============================================================================
@@ -607,43 +1265,42 @@ def _is_authorized_gateway(bearer: Optional[str]) -> Dict[str, Any]:
 	# Admin password direct
 	if bearer == ADMIN_PASSWORD:
 		return {"allowed": True, "isAdmin": True}
-	# Relaxed acceptance: any gw_* token is allowed (non-admin)
+	# 발급된(다른 워커/재시작 전 포함) 만료되지 않은 gw_* 토큰만 허용 (non-admin)
 	if bearer.startswith("gw_"):
-		# Optional: check in-memory tokens and expiry if we want stricter mode
-		exp = _GW_TOKENS.get(bearer)
-		if exp is None or exp > time.time():
+		if gateway_tokens.is_valid(bearer):
 			return {"allowed": True, "isAdmin": False}
-		# expired token: still allow (fully relaxed)
-		return {"allowed": True, "isAdmin": False}
+		return {"allowed": False, "isAdmin": False, "reason": "expired or unknown token"}
 	return {"allowed": False, "isAdmin": False, "reason": "invalid token"}
 
 
 @app.get("/api/gateway-admin")
-def gateway_admin(request: Request, type: Optional[str] = None):
+async def gateway_admin(request: Request, type: Optional[str] = None):
 	try:
 		auth = request.headers.get("authorization") or request.headers.get("Authorization")
 		bearer = None
 		if auth and auth.lower().startswith("bearer "):
 			bearer = auth.split(" ", 1)[1].strip()
 
-		verdict = _is_authorized_gateway(bearer)
+		verdict = await run_read(_is_authorized_gateway, bearer)
 		if not verdict.get("allowed"):
 			raise HTTPException(status_code=403, detail="Forbidden")
 
 		if type == "sessions" or type is None:
-			sessions = list_sessions()
+			sessions = await list_sessions()
 			return {"sessions": sessions, "total": len(sessions)}
 
 		# Unknown type - return minimal info
 		return {"ok": True}
 	except HTTPException:
 		raise
+	except ExecutorSaturated:
+		raise
 	except Exception as e:
 		raise HTTPException(status_code=500, detail=f"Gateway admin failed: {e}")
 
 
 @app.get("/healthz")
-def healthz():
+async def healthz():
 	return {"ok": True}
 
 @app.get("/api/network-info")
@@ -0,0 +1,236 @@
+"""
+요청 수 제한(토큰 버킷)과 서버 제안 폴링 간격
+
+- AdmissionMiddleware: 클라이언트별 토큰 버킷으로 /api 요청을 제한한다. 한도를 넘으면
+  라우트와 파일 I/O에 닿기 전에 작은 429 + Retry-After 응답을 돌려준다.
+  제한의 기준은 접속 IP다. X-Client-Id 헤더는 같은 IP(NAT 뒤 교실 등) 안에서 예산을
+  나누는 데만 쓰고, IP 전체 버킷도 함께 차감하므로 헤더를 바꿔 가며 보내도 한도가 늘지 않는다.
+  IP당 구분하는 id 수는 제한되며, 넘치는 id는 IP 공용 버킷을 같이 쓴다. 필드 폴링은 별도 버킷을 쓴다.
+- suggest_poll_ms: 세션 활동(최근 수정/잠금)과 서버 부하(읽기 실행기 대기열)로
+  다음 폴링까지 기다릴 시간을 정한다. /api/fields/{code}/updates 응답의 nextPollMs.
+
+버킷은 워커별 메모리에 있으므로 uvicorn --workers N에서는 한 클라이언트가 여러 워커로
+나뉘어 연결되면 최대 N배까지 허용될 수 있다.
+"""
+from __future__ import annotations
+
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from .io_executors import READ_EXECUTOR
+
+Bucket = Tuple[float, float]  # (남은 토큰, 마지막 갱신 시각)
+
+
+def _env_number(name: str, default: float) -> float:
+    try:
+        return max(0.0, float(os.getenv(name, str(default))))
+    except Exception:
+        return default
+
+
+# 초당 허용 요청 수 / 순간 허용량 (0이면 제한 없음)
+API_RATE = _env_number("RATE_LIMIT_RPS", 20)
+API_BURST = _env_number("RATE_LIMIT_BURST", 40)
+POLL_RATE = _env_number("POLL_RATE_LIMIT_RPS", 4)
+POLL_BURST = _env_number("POLL_RATE_LIMIT_BURST", 8)
+# IP 하나가 X-Client-Id와 상관없이 쓸 수 있는 전체 한도 (0이면 IP 전체 한도 없음)
+API_HOST_RATE = _env_number("RATE_LIMIT_HOST_RPS", 200)
+API_HOST_BURST = _env_number("RATE_LIMIT_HOST_BURST", 400)
+POLL_HOST_RATE = _env_number("POLL_RATE_LIMIT_HOST_RPS", 100)
+POLL_HOST_BURST = _env_number("POLL_RATE_LIMIT_HOST_BURST", 200)
+# 추적하는 IP 수 / IP당 따로 버킷을 주는 X-Client-Id 수
+MAX_CLIENTS = int(_env_number("RATE_LIMIT_MAX_CLIENTS", 10000)) or 10000
+MAX_IDS_PER_HOST = int(_env_number("RATE_LIMIT_IDS_PER_HOST", 64))
+
+# 폴링 간격(ms): 편집 중 / 최근 활동 / 유휴, 부하가 높을 때의 상한
+POLL_ACTIVE_MS = int(_env_number("POLL_ACTIVE_MS", 500))
+POLL_WARM_MS = int(_env_number("POLL_WARM_MS", 2000))
+POLL_IDLE_MS = int(_env_number("POLL_IDLE_MS", 5000))
+POLL_MAX_MS = int(_env_number("POLL_MAX_MS", 10000))
+# 마지막 변경 후 이 시간(초)까지는 편집 중 / 최근 활동으로 본다
+POLL_ACTIVE_WINDOW = _env_number("POLL_ACTIVE_WINDOW", 15)
+POLL_WARM_WINDOW = _env_number("POLL_WARM_WINDOW", 120)
+
+
+def _refill(bucket: Optional[Bucket], rate: float, burst: float, now: float) -> float:
+    if bucket is None:
+        return burst
+    return min(burst, bucket[0] + (now - bucket[1]) * rate)
+
+
+class _HostBuckets:
+    """IP 하나의 전체 버킷과 X-Client-Id별 버킷 (""는 id 없음/한도 초과 id의 공용 버킷)"""
+
+    __slots__ = ("total", "ids")
+
+    def __init__(self) -> None:
+        self.total: Optional[Bucket] = None
+        self.ids: "OrderedDict[str, Bucket]" = OrderedDict()
+
+
+class TokenBucketLimiter:
+    """IP별 토큰 버킷. X-Client-Id는 IP의 예산을 나누는 데만 쓴다 (IP 수는 LRU로 제한)"""
+
+    def __init__(
+        self,
+        rate: float,
+        burst: float,
+        host_rate: float = 0.0,
+        host_burst: float = 0.0,
+        max_clients: int = MAX_CLIENTS,
+        max_ids_per_host: int = MAX_IDS_PER_HOST,
+    ):
+        self.rate = rate
+        self.burst = max(1.0, burst)
+        self.host_rate = host_rate
+        self.host_burst = max(1.0, host_burst)
+        self.max_clients = max_clients
+        self.max_ids_per_host = max(0, max_ids_per_host)
+        self._hosts: "OrderedDict[str, _HostBuckets]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.admitted = 0
+        self.rejected = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.rate > 0
+
+    def _id_slot(self, entry: _HostBuckets, client_id: str, now: float) -> str:
+        """client_id가 쓸 버킷 키. IP당 id 수가 한도에 차면 공용 버킷("")을 쓴다."""
+        if not client_id or client_id in entry.ids:
+            return client_id
+        if len(entry.ids) - ("" in entry.ids) >= self.max_ids_per_host:
+            # 다시 가득 찬 버킷은 새 버킷과 같으므로 지워서 자리를 만든다
+            for key in [k for k, b in entry.ids.items() if k and _refill(b, self.rate, self.burst, now) >= self.burst]:
+                del entry.ids[key]
+            if len(entry.ids) - ("" in entry.ids) >= self.max_ids_per_host:
+                return ""
+        return client_id
+
+    def acquire(self, host: str, client_id: Optional[str] = None) -> float:
+        """토큰 하나를 쓴다. 통과하면 0, 아니면 다음 토큰까지 기다려야 할 초."""
+        if self.rate <= 0:
+            return 0.0
+        now = time.monotonic()
+        with self._lock:
+            entry = self._hosts.get(host)
+            if entry is None:
+                if len(self._hosts) >= self.max_clients:
+                    self._hosts.popitem(last=False)
+                entry = self._hosts[host] = _HostBuckets()
+            else:
+                self._hosts.move_to_end(host)
+            key = self._id_slot(entry, client_id or "", now)
+            tokens = _refill(entry.ids.get(key), self.rate, self.burst, now)
+            host_tokens = _refill(entry.total, self.host_rate, self.host_burst, now) if self.host_rate > 0 else math.inf
+            admitted = tokens >= 1.0 and host_tokens >= 1.0
+            if admitted:
+                tokens -= 1.0
+                host_tokens -= 1.0
+            entry.ids[key] = (tokens, now)
+            entry.ids.move_to_end(key)
+            if self.host_rate > 0:
+                entry.total = (host_tokens, now)
+            if admitted:
+                self.admitted += 1
+                return 0.0
+            self.rejected += 1
+            wait = (1.0 - tokens) / self.rate if tokens < 1.0 else 0.0
+            if host_tokens < 1.0:
+                wait = max(wait, (1.0 - host_tokens) / self.host_rate)
+            return wait
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "rate": self.rate,
+                "burst": self.burst,
+                "hostRate": self.host_rate,
+                "hostBurst": self.host_burst,
+                "clients": len(self._hosts),
+                "admitted": self.admitted,
+                "rejected": self.rejected,
+            }
+
+
+API_LIMITER = TokenBucketLimiter(API_RATE, API_BURST, API_HOST_RATE, API_HOST_BURST)
+POLL_LIMITER = TokenBucketLimiter(POLL_RATE, POLL_BURST, POLL_HOST_RATE, POLL_HOST_BURST)
+
+_REJECT_BODY = b'{"detail":"Too many requests"}'
+
+
+def _is_poll(method: str, path: str) -> bool:
+    return method == "GET" and path.startswith("/api/fields/") and path.endswith("/updates")
+
+
+def _client_key(scope: Dict[str, Any]) -> Tuple[str, Optional[str]]:
+    """(접속 IP, X-Client-Id). 제한은 IP 기준이고 id는 IP 안에서 예산을 나눌 때만 쓴다."""
+    client = scope.get("client")
+    host = client[0] if client else "-"
+    for name, value in scope.get("headers") or ():
+        if name == b"x-client-id":
+            return host, value[:64].decode("latin-1")
+    return host, None
+
+
+class AdmissionMiddleware:
+    """/api 요청을 클라이언트별 토큰 버킷으로 제한하는 ASGI 미들웨어"""
+
+    def __init__(self, app, api: TokenBucketLimiter = API_LIMITER, poll: TokenBucketLimiter = POLL_LIMITER):
+        self.app = app
+        self.api = api
+        self.poll = poll
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        path = scope.get("path", "")
+        method = scope.get("method", "GET")
+        # CORS preflight는 본 요청과 함께 세지 않는다
+        if not path.startswith("/api/") or method == "OPTIONS":
+            return await self.app(scope, receive, send)
+        limiter = self.poll if _is_poll(method, path) else self.api
+        wait = limiter.acquire(*_client_key(scope)) if limiter.enabled else 0.0
+        if wait <= 0:
+            return await self.app(scope, receive, send)
+        await send({
+            "type": "http.response.start",
+            "status": 429,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(_REJECT_BODY)).encode()),
+                (b"retry-after", str(max(1, math.ceil(wait))).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": _REJECT_BODY})
+
+
+def admission_stats() -> Dict[str, Any]:
+    return {"api": API_LIMITER.stats(), "poll": POLL_LIMITER.stats()}
+
+
+def load_factor() -> float:
+    """읽기 실행기의 (대기 + 실행 중) 작업 수 / 스레드 수. 1 이하면 여유가 있다."""
+    return (READ_EXECUTOR.queued + READ_EXECUTOR.running) / max(1, READ_EXECUTOR.workers)
+
+
+def suggest_poll_ms(last_update: Optional[int], active_locks: int = 0, now: Optional[float] = None) -> int:
+    """세션 활동과 서버 부하로 다음 폴링까지의 간격(ms)을 정한다"""
+    now = time.time() if now is None else now
+    idle = now - (last_update or 0)
+    if active_locks or idle < POLL_ACTIVE_WINDOW:
+        interval = POLL_ACTIVE_MS
+    elif idle < POLL_WARM_WINDOW:
+        interval = POLL_WARM_MS
+    else:
+        interval = POLL_IDLE_MS
+    # 읽기 대기열이 쌓이면 그만큼 간격을 늘린다
+    load = load_factor()
+    if load > 1:
+        interval = interval * min(load, 8.0)
+    return int(min(POLL_MAX_MS, max(POLL_ACTIVE_MS, interval)))
@@ -0,0 +1,297 @@
+from __future__ import annotations
+
+import bisect
+import heapq
+import os
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+
+from . import jsonio
+from .fileio import atomic_write_text, dir_lock
+
+
+# (createdAt, id) - 전체 정렬 키. 같은 초에 생성된 항목은 id로 순서를 고정한다.
+Key = Tuple[int, str]
+
+MAX_QUERY_LIMIT = 1000
+
+try:
+    INDEX_CACHE_SIZE = max(1, int(os.getenv("ARTIFACT_INDEX_CACHE_SIZE", "256")))
+except Exception:
+    INDEX_CACHE_SIZE = 256
+
+# 다른 프로세스가 쓰는 중인 파일을 만났을 때 다시 읽어 볼 횟수/간격
+INDEX_READ_ATTEMPTS = 3
+INDEX_READ_RETRY_SECONDS = 0.05
+
+
+class IndexReadError(RuntimeError):
+    """인덱스 파일이 있지만 읽거나 해석할 수 없음"""
+
+
+def _key_of(meta: Dict[str, Any]) -> Key:
+    return (int(meta.get("createdAt") or 0), str(meta.get("id") or ""))
+
+
+def encode_cursor(key: Key) -> str:
+    return f"{key[0]}:{key[1]}"
+
+
+def decode_cursor(cursor: str) -> Key:
+    created, sep, art_id = cursor.partition(":")
+    if not sep or not created.isdigit():
+        raise ValueError(f"invalid cursor: {cursor!r}")
+    return (int(created), art_id)
+
+
+class ArtifactIndex:
+    """artifact 인덱스의 메모리 표현.
+
+    항목은 (createdAt, id) 오름차순으로 유지되며 type/team/label 보조 인덱스가
+    함께 갱신된다. 조회는 최신순(역방향)으로 이루어지므로 매 요청마다 정렬할 필요가 없다.
+    label은 정렬된 label 목록 + label별 키 목록으로 두어, 접두사 조회도 정렬된 목록을
+    병합해서 읽기만 한다.
+    """
+
+    def __init__(self, items: Optional[List[Dict[str, Any]]] = None):
+        self._keys: List[Key] = []
+        self._by_id: Dict[str, Dict[str, Any]] = {}
+        self._by_type: Dict[Optional[str], List[Key]] = {}
+        self._by_team: Dict[Optional[str], List[Key]] = {}
+        self._labels: List[str] = []
+        self._by_label: Dict[str, List[Key]] = {}
+        self.total_bytes = 0
+        for meta in sorted(items or [], key=_key_of):
+            self._insert(meta)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    # ---------- mutation ----------
+
+    def _insert(self, meta: Dict[str, Any]) -> None:
+        key = _key_of(meta)
+        art_id = key[1]
+        if art_id in self._by_id:
+            self._remove(art_id)
+        self._by_id[art_id] = meta
+        self.total_bytes += int(meta.get("size") or 0)
+        bisect.insort(self._keys, key)
+        bisect.insort(self._by_type.setdefault(meta.get("type"), []), key)
+        bisect.insort(self._by_team.setdefault(meta.get("team"), []), key)
+        if meta.get("label"):
+            label = str(meta["label"])
+            keys = self._by_label.get(label)
+            if keys is None:
+                keys = self._by_label[label] = []
+                bisect.insort(self._labels, label)
+            bisect.insort(keys, key)
+
+    def _remove(self, art_id: str) -> Optional[Dict[str, Any]]:
+        meta = self._by_id.pop(art_id, None)
+        if meta is None:
+            return None
+        self.total_bytes -= int(meta.get("size") or 0)
+        key = _key_of(meta)
+        _discard(self._keys, key)
+        _discard(self._by_type.get(meta.get("type"), []), key)
+        _discard(self._by_team.get(meta.get("team"), []), key)
+        if meta.get("label"):
+            label = str(meta["label"])
+            keys = self._by_label.get(label, [])
+            _discard(keys, key)
+            if not keys and label in self._by_label:
+                del self._by_label[label]
+                _discard(self._labels, label)
+        return meta
+
+    def add(self, meta: Dict[str, Any]) -> None:
+        self._insert(meta)
+
+    def remove(self, art_id: str) -> Optional[Dict[str, Any]]:
+        return self._remove(art_id)
+
+    # ---------- read ----------
+
+    def oldest(self) -> Optional[Dict[str, Any]]:
+        return self._by_id[self._keys[0][1]] if self._keys else None
+
+    def get(self, art_id: str) -> Optional[Dict[str, Any]]:
+        return self._by_id.get(art_id)
+
+    def items_ascending(self) -> List[Dict[str, Any]]:
+        return [self._by_id[k[1]] for k in self._keys]
+
+    def query(
+        self,
+        *,
+        type_: Optional[str] = None,
+        team: Optional[str] = None,
+        label_prefix: Optional[str] = None,
+        created_from: Optional[int] = None,
+        created_to: Optional[int] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """필터 조건에 맞는 항목을 최신순으로 반환: (items, nextCursor)"""
+        # 가장 선택도가 높은 보조 인덱스를 후보 목록으로 사용 (각 목록은 키 순으로 정렬되어 있다)
+        if type_ is not None:
+            runs = [self._by_type.get(type_, [])]
+        elif team is not None:
+            runs = [self._by_team.get(team, [])]
+        elif label_prefix:
+            lo = bisect.bisect_left(self._labels, label_prefix)
+            hi = bisect.bisect_left(self._labels, label_prefix + "\U0010ffff")
+            runs = [self._by_label[label] for label in self._labels[lo:hi]]
+        else:
+            runs = [self._keys]
+
+        upper = decode_cursor(cursor) if cursor else None
+        ranges = []
+        for run in runs:
+            lo_idx = 0
+            hi_idx = len(run)
+            if created_from is not None:
+                lo_idx = bisect.bisect_left(run, (int(created_from), ""))
+            if created_to is not None:
+                hi_idx = min(hi_idx, bisect.bisect_left(run, (int(created_to) + 1, "")))
+            if upper is not None:
+                hi_idx = min(hi_idx, bisect.bisect_left(run, upper))
+            if lo_idx < hi_idx:
+                ranges.append(_descending(run, lo_idx, hi_idx))
+        # label이 여러 개면 최신순으로 병합하며 필요한 만큼만 읽는다
+        candidates = ranges[0] if len(ranges) == 1 else heapq.merge(*ranges, reverse=True)
+
+        cap = MAX_QUERY_LIMIT if limit is None else max(1, min(int(limit), MAX_QUERY_LIMIT))
+        out: List[Dict[str, Any]] = []
+        last_key: Optional[Key] = None
+        for key in candidates:
+            meta = self._by_id.get(key[1])
+            if meta is None:
+                continue
+            if type_ is not None and meta.get("type") != type_:
+                continue
+            if team is not None and meta.get("team") != team:
+                continue
+            if label_prefix and not str(meta.get("label") or "").startswith(label_prefix):
+                continue
+            if len(out) >= cap:
+                return out, encode_cursor(last_key) if last_key else None
+            out.append(dict(meta))
+            last_key = key
+        return out, None
+
+
+def _descending(run: List[Key], lo_idx: int, hi_idx: int) -> Iterator[Key]:
+    for pos in range(hi_idx - 1, lo_idx - 1, -1):
+        yield run[pos]
+
+
+def _discard(sorted_list: List[Any], value: Any) -> None:
+    pos = bisect.bisect_left(sorted_list, value)
+    if pos < len(sorted_list) and sorted_list[pos] == value:
+        del sorted_list[pos]
+
+
+# ---------- file-backed cache ----------
+
+# index.json 경로별로 파싱된 인덱스를 보관한다 (최근에 쓴 INDEX_CACHE_SIZE개, LRU).
+# 파일의 (mtime, size)가 바뀌면 (다른 워커가 쓴 경우 등) 다시 읽는다.
+_CACHE: "OrderedDict[str, Tuple[Tuple[int, int], ArtifactIndex]]" = OrderedDict()
+_CACHE_LOCK = threading.Lock()
+# 잠금은 사용 중인 동안만 남는다 (잡고 있거나 기다리는 스레드가 없으면 자동으로 사라짐)
+_PATH_LOCKS: "weakref.WeakValueDictionary[str, threading.RLock]" = weakref.WeakValueDictionary()
+
+
+def _signature(p: Path) -> Optional[Tuple[int, int, int]]:
+    try:
+        st = p.stat()
+    except OSError:
+        return None
+    # 원자적 교체는 inode를 바꾸므로 다른 워커가 같은 크기로 덮어써도 구분된다
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+
+def index_lock(p: Path) -> threading.RLock:
+    """인덱스 파일별 프로세스 내 잠금 (캐시된 인덱스를 읽는 동안 변경되지 않게 보호)"""
+    with _CACHE_LOCK:
+        lock = _PATH_LOCKS.get(str(p))
+        if lock is None:
+            lock = threading.RLock()
+            _PATH_LOCKS[str(p)] = lock
+        return lock
+
+
+@contextmanager
+def index_write_lock(p: Path) -> Iterator[None]:
+    """인덱스 load-modify-save 구간 잠금 (프로세스 내 잠금 + 저장소 디렉터리 파일 잠금)"""
+    with index_lock(p):
+        with dir_lock(p.parent):
+            yield
+
+
+def _cache_get(p: Path, sig: Tuple[int, int, int]) -> Optional[ArtifactIndex]:
+    with _CACHE_LOCK:
+        cached = _CACHE.get(str(p))
+        if cached is None or cached[0] != sig:
+            return None
+        _CACHE.move_to_end(str(p))
+        return cached[1]
+
+
+def _cache_put(p: Path, sig: Tuple[int, int, int], index: ArtifactIndex) -> None:
+    with _CACHE_LOCK:
+        _CACHE[str(p)] = (sig, index)
+        _CACHE.move_to_end(str(p))
+        while len(_CACHE) > INDEX_CACHE_SIZE:
+            _CACHE.popitem(last=False)
+
+
+def load_index(p: Path) -> ArtifactIndex:
+    """인덱스 파일을 읽는다. 파일이 없으면 빈 인덱스, 읽을 수 없으면 IndexReadError.
+
+    읽기 실패를 빈 인덱스로 바꾸면 다음 저장이 기존 목록을 덮어쓰므로,
+    잠시 뒤 다시 읽어 보고 그래도 실패하면 예외를 올린다 (실패 결과는 캐시하지 않음).
+    """
+    for attempt in range(INDEX_READ_ATTEMPTS):
+        sig = _signature(p)
+        if sig is None:
+            return ArtifactIndex()
+        cached = _cache_get(p, sig)
+        if cached is not None:
+            return cached
+        try:
+            data = jsonio.loads(p.read_bytes())
+            index = ArtifactIndex(data.get("items", []))
+        except FileNotFoundError:
+            continue
+        except Exception as e:
+            if attempt + 1 >= INDEX_READ_ATTEMPTS:
+                raise IndexReadError(f"artifact index unreadable: {p}: {e}") from e
+            time.sleep(INDEX_READ_RETRY_SECONDS)
+            continue
+        _cache_put(p, sig, index)
+        return index
+    raise IndexReadError(f"artifact index changed while reading: {p}")
+
+
+def save_index(p: Path, index: ArtifactIndex) -> None:
+    try:
+        atomic_write_text(p, jsonio.dumps_text({"items": index.items_ascending()}))
+    except Exception:
+        # 메모리 상태와 파일이 어긋나지 않도록 다음 조회 시 파일에서 다시 읽게 한다
+        forget_index(p)
+        raise
+    sig = _signature(p)
+    if sig is not None:
+        _cache_put(p, sig, index)
+
+
+def forget_index(p: Path) -> None:
+    with _CACHE_LOCK:
+        _CACHE.pop(str(p), None)
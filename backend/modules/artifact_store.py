@@ -1,14 +1,19 @@
 from __future__ import annotations
 
-import json
+import os
 import time
 import uuid
 from pathlib import Path
 from typing import Dict, Any, List, Optional
 
+from .artifact_index import index_lock, index_write_lock, load_index, save_index
+from .retention import STORE_POLICY, enforce_policy, remove_artifact_files
+
 
 BASE_DIR = Path(__file__).resolve().parent.parent  # backend/
-STORE_DIR = BASE_DIR.parent / "uploads" / "workshop"  # project/uploads/workshop
+# DONGAM_UPLOADS_DIR로 저장 위치를 바꿀 수 있다 (부하 테스트 등 임시 디렉터리 사용 시)
+UPLOADS_DIR = Path(os.getenv("DONGAM_UPLOADS_DIR") or (BASE_DIR.parent / "uploads"))  # project/uploads
+STORE_DIR = UPLOADS_DIR / "workshop"  # project/uploads/workshop
 STORE_DIR.mkdir(parents=True, exist_ok=True)
 
 
@@ -16,21 +21,6 @@ def _index_path() -> Path:
     return STORE_DIR / "index.json"
 
 
-def _load_index() -> Dict[str, Any]:
-    p = _index_path()
-    if not p.exists():
-        return {"items": []}
-    try:
-        return json.loads(p.read_text(encoding="utf-8"))
-    except Exception:
-        return {"items": []}
-
-
-def _save_index(data: Dict[str, Any]) -> None:
-    p = _index_path()
-    p.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
-
-
 def save_artifact(*, content: str, team: Optional[str], label: Optional[str], type_: Optional[str]) -> Dict[str, Any]:
     now = int(time.time())
     art_id = uuid.uuid4().hex[:10]
@@ -48,50 +38,70 @@ def save_artifact(*, content: str, team: Optional[str], label: Optional[str], ty
         "createdAt": now,
     }
 
-    idx = _load_index()
-    idx_items: List[Dict[str, Any]] = idx.get("items", [])
-    idx_items.append(meta)
-    idx["items"] = idx_items[-1000:]  # keep last 1000
-    _save_index(idx)
+    p = _index_path()
+    with index_write_lock(p):
+        index = load_index(p)
+        index.add(meta)
+        evicted = enforce_policy(index, STORE_POLICY)
+        save_index(p, index)
+    remove_artifact_files(STORE_DIR, evicted)
     return meta
 
 
+def query_artifacts(
+    *,
+    type_: Optional[str] = None,
+    team: Optional[str] = None,
+    label_prefix: Optional[str] = None,
+    created_from: Optional[int] = None,
+    created_to: Optional[int] = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+) -> Dict[str, Any]:
+    """필터/페이지 조건으로 artifact 조회 (최신순) -> { items, nextCursor }"""
+    p = _index_path()
+    with index_lock(p):
+        items, next_cursor = load_index(p).query(
+            type_=type_,
+            team=team,
+            label_prefix=label_prefix,
+            created_from=created_from,
+            created_to=created_to,
+            limit=limit,
+            cursor=cursor,
+        )
+    return {"items": items, "nextCursor": next_cursor}
+
+
 def list_artifacts() -> List[Dict[str, Any]]:
-    idx = _load_index()
-    items: List[Dict[str, Any]] = idx.get("items", [])
     # newest first
-    return sorted(items, key=lambda x: x.get("createdAt", 0), reverse=True)
+    return query_artifacts()["items"]
 
 
 def get_artifact(artifact_id: str) -> Optional[Dict[str, Any]]:
-    items = list_artifacts()
-    for it in items:
-        if it.get("id") == artifact_id:
-            p = STORE_DIR / it["filename"]
-            content = p.read_text(encoding="utf-8") if p.exists() else ""
-            out = dict(it)
-            out["content"] = content
-            return out
-    return None
+    p = _index_path()
+    with index_lock(p):
+        it = load_index(p).get(artifact_id)
+        if it is None:
+            return None
+        out = dict(it)
+    f = STORE_DIR / out["filename"]
+    out["content"] = f.read_text(encoding="utf-8") if f.exists() else ""
+    return out
 
 
 def delete_artifact(artifact_id: str) -> bool:
-    idx = _load_index()
-    items: List[Dict[str, Any]] = idx.get("items", [])
-    kept: List[Dict[str, Any]] = []
-    deleted = False
-    for it in items:
-        if it.get("id") == artifact_id:
-            p = STORE_DIR / it.get("filename", "")
-            try:
-                if p.exists():
-                    p.unlink()
-            except Exception:
-                pass
-            deleted = True
-            continue
-        kept.append(it)
-    if deleted:
-        idx["items"] = kept
-        _save_index(idx)
-    return deleted
+    p = _index_path()
+    with index_write_lock(p):
+        index = load_index(p)
+        it = index.remove(artifact_id)
+        if it is None:
+            return False
+        save_index(p, index)
+    f = STORE_DIR / it.get("filename", "")
+    try:
+        if f.exists():
+            f.unlink()
+    except Exception:
+        pass
+    return True
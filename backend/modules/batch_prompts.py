@@ -0,0 +1,238 @@
+from __future__ import annotations
+
+import csv
+import io
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Dict, Any, Iterator, List, Optional, Callable
+
+from .prompt_generator import SpiritCatalog, build_prompt, make_prompt_payload
+
+
+try:
+    BATCH_WORKERS = max(1, int(os.getenv("BATCH_PROMPT_WORKERS", str(min(8, (os.cpu_count() or 2))))))
+except Exception:
+    BATCH_WORKERS = 4
+
+MAX_BATCH_ROWS = 2000
+
+
+# 헤더 정규화(소문자, 공백/밑줄/하이픈 제거) -> 요청 필드명
+_FIELD_ALIASES: Dict[str, str] = {
+    "spiritid": "spiritId",
+    "spirit": "spiritId",
+    "정신": "spiritId",
+    "정신id": "spiritId",
+    "동암정신": "spiritId",
+    "연계된동암정신": "spiritId",
+    "activityname": "activityName",
+    "활동명": "activityName",
+    "coretext": "coreText",
+    "text": "coreText",
+    "핵심내용": "coreText",
+    "핵심내용및느낀점": "coreText",
+    "teamleaderobservation": "teamLeaderObservation",
+    "팀장활동목격담": "teamLeaderObservation",
+    "팀장목격담": "teamLeaderObservation",
+    "outcomes": "outcomes",
+    "목표": "outcomes",
+    "outputs": "outputs",
+    "실행/결과": "outputs",
+    "factors": "factors",
+    "enabler/blocker": "factors",
+    "keylearning": "keyLearning",
+    "핵심교훈": "keyLearning",
+    "team": "team",
+    "팀": "team",
+    "팀/조이름": "team",
+    "label": "label",
+}
+
+
+def _canonical_field(header: Any) -> Optional[str]:
+    if header is None:
+        return None
+    key = str(header).strip().lower()
+    for ch in (" ", "_", "-", "　"):
+        key = key.replace(ch, "")
+    return _FIELD_ALIASES.get(key)
+
+
+def _canonical_row(raw: Dict[Any, Any]) -> Dict[str, Any]:
+    row: Dict[str, Any] = {}
+    for header, value in raw.items():
+        field = _canonical_field(header)
+        if field is None or value is None:
+            continue
+        text = str(value).strip()
+        if text:
+            row[field] = text
+    return row
+
+
+# 각 행에는 "_row"(헤더와 빈 행을 포함한 파일/시트의 행 번호)를 붙여 결과가 시트의 행과 맞도록 한다
+
+def _rows_from_csv(content: bytes) -> Iterator[Dict[str, Any]]:
+    reader = csv.reader(io.StringIO(content.decode("utf-8-sig")))
+    headers = next(reader, None) or []
+    for sheet_row, values in enumerate(reader, start=2):
+        if not any(v.strip() for v in values):
+            continue
+        row = _canonical_row(dict(zip(headers, values)))
+        row["_row"] = sheet_row
+        yield row
+
+
+def _rows_from_jsonl(content: bytes) -> Iterator[Dict[str, Any]]:
+    for line_no, line in enumerate(content.decode("utf-8-sig").splitlines(), start=1):
+        if not line.strip():
+            continue
+        try:
+            obj = json.loads(line)
+        except ValueError as e:
+            yield {"_error": f"invalid JSON line: {e}", "_row": line_no}
+            continue
+        row = _canonical_row(obj) if isinstance(obj, dict) else {"_error": "each line must be a JSON object"}
+        row["_row"] = line_no
+        yield row
+
+
+def _rows_from_json_array(content: bytes) -> Iterator[Dict[str, Any]]:
+    # .json은 객체 배열 하나. "_row"는 배열에서의 순서(1부터)
+    try:
+        data = json.loads(content.decode("utf-8-sig"))
+    except ValueError as e:
+        raise ValueError(f"invalid JSON file: {e}")
+    if not isinstance(data, list):
+        raise ValueError("a .json upload must be an array of objects (use .jsonl for one object per line)")
+    for index, obj in enumerate(data, start=1):
+        row = _canonical_row(obj) if isinstance(obj, dict) else {"_error": "each array item must be a JSON object"}
+        row["_row"] = index
+        yield row
+
+
+def _rows_from_xlsx(content: bytes) -> Iterator[Dict[str, Any]]:
+    from openpyxl import load_workbook  # optional: only needed for Excel uploads
+
+    wb = load_workbook(io.BytesIO(content), read_only=True, data_only=True)
+    try:
+        ws = wb.worksheets[0]
+        rows = ws.iter_rows(values_only=True)
+        headers = next(rows, None) or ()
+        for sheet_row, values in enumerate(rows, start=2):
+            if not any(v not in (None, "") for v in values):
+                continue
+            row = _canonical_row(dict(zip(headers, values)))
+            row["_row"] = sheet_row
+            yield row
+    finally:
+        wb.close()
+
+
+def parse_rows(filename: str, content: bytes) -> List[Dict[str, Any]]:
+    """CSV/JSONL/JSON 배열/XLSX 업로드를 요청 필드 이름으로 정리된 행 목록으로 변환"""
+    name = (filename or "").lower()
+    if name.endswith(".xlsx"):
+        rows = _rows_from_xlsx(content)
+    elif name.endswith(".jsonl") or name.endswith(".ndjson"):
+        rows = _rows_from_jsonl(content)
+    elif name.endswith(".json"):
+        rows = _rows_from_json_array(content)
+    elif name.endswith(".csv") or name.endswith(".txt"):
+        rows = _rows_from_csv(content)
+    else:
+        raise ValueError("unsupported file type (use .csv, .jsonl, .json or .xlsx)")
+    out: List[Dict[str, Any]] = []
+    for row in rows:
+        out.append(row)
+        if len(out) > MAX_BATCH_ROWS:
+            raise ValueError(f"too many rows (max {MAX_BATCH_ROWS})")
+    return out
+
+
+def _resolve_spirit(catalog: SpiritCatalog, value: Optional[str]) -> Dict[str, Any]:
+    """정확한 id 또는 정확한 이름으로만 찾는다. 없거나 이름이 여러 정신과 같으면 ValueError."""
+    if not value:
+        raise ValueError("spiritId is required")
+    spirit = catalog.get_spirit(value)
+    if spirit is not None:
+        return spirit
+    # 시트에는 id 대신 정신 이름이 들어오는 경우가 많다
+    matches = [c for c in catalog.spirits_by_id.values() if str(c.get("name") or "").strip() == value]
+    if len(matches) > 1:
+        ids = ", ".join(str(c.get("id")) for c in matches)
+        raise ValueError(f"Ambiguous spiritId {value!r} (matches {ids})")
+    if not matches:
+        raise ValueError(f"Unknown spiritId: {value!r}")
+    return matches[0]
+
+
+def _build_row(
+    index: int,
+    row: Dict[str, Any],
+    catalog: SpiritCatalog,
+    save: Optional[Callable[[Dict[str, Any], str], Optional[str]]],
+    compact: bool = False,
+) -> Dict[str, Any]:
+    result: Dict[str, Any] = {"row": row.get("_row", index), "ok": False}
+    if row.get("_error"):
+        result["error"] = row["_error"]
+        return result
+    result["activityName"] = row.get("activityName")
+    try:
+        spirit = _resolve_spirit(catalog, row.get("spiritId"))
+    except ValueError as e:
+        result["error"] = str(e)
+        return result
+    result["spiritId"] = spirit.get("id")
+    try:
+        payload = make_prompt_payload(row)
+        prompt = build_prompt(payload, spirit, catalog.version, compact=compact)
+    except Exception as e:
+        result["error"] = str(e)
+        return result
+    result["prompt"] = prompt
+    if save is not None:
+        try:
+            result["artifactId"] = save(row, prompt)
+        except Exception as e:
+            # 프롬프트는 만들어졌으므로 저장 실패만 함께 알린다
+            result["saveError"] = str(e)
+    result["ok"] = True
+    return result
+
+
+def generate_batch(
+    rows: List[Dict[str, Any]],
+    catalog: SpiritCatalog,
+    save: Optional[Callable[[Dict[str, Any], str], Optional[str]]] = None,
+    workers: int = BATCH_WORKERS,
+    compact: bool = False,
+) -> Iterator[Dict[str, Any]]:
+    """행별 프롬프트를 작업자 풀에서 만들고 완료되는 순서대로 결과를 내보낸다.
+
+    마지막에는 {"done": true, "total", "succeeded", "failed"} 요약을 내보낸다.
+    """
+    succeeded = failed = 0
+    pending = set()
+    row_iter = iter(enumerate(rows, start=1))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="batch-prompt") as pool:
+        # 동시에 제출하는 작업 수를 제한해 큰 파일도 메모리에 결과가 쌓이지 않게 한다
+        for index, row in row_iter:
+            pending.add(pool.submit(_build_row, index, row, catalog, save, compact))
+            if len(pending) >= workers * 2:
+                break
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in done:
+                result = fut.result()
+                if result.get("ok"):
+                    succeeded += 1
+                else:
+                    failed += 1
+                yield result
+                nxt = next(row_iter, None)
+                if nxt is not None:
+                    pending.add(pool.submit(_build_row, nxt[0], nxt[1], catalog, save, compact))
+    yield {"done": True, "total": succeeded + failed, "succeeded": succeeded, "failed": failed}
@@ -0,0 +1,544 @@
+from __future__ import annotations
+
+import bisect
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+from . import jsonio
+from .fileio import atomic_write_text, dir_lock
+from .session_manager import get_session_dir
+
+
+# 세션별 컬처맵 저장 구조 (uploads/sessions/<code>/culture_map/)
+#   latest.json            최신 버전 포인터 {"version", "snapshotVersion", "timestamp", "file"}
+#   versions/v00000001.json 버전별 레코드 (op log)
+#     - snapshot: {"version", "kind": "snapshot", "timestamp", "data"}
+#     - delta:    {"version", "kind": "delta", "baseVersion", "timestamp", "ops", "data"?}
+#   manifest.jsonl         버전 목록 (한 줄에 한 버전: version, kind, timestamp, snapshot, notes, connections)
+
+
+def _culture_map_dir(session_code: str) -> Optional[Path]:
+    """세션별 컬처맵 저장 디렉토리 반환"""
+    session_dir = get_session_dir(session_code)
+    if not session_dir:
+        return None
+    store_dir = session_dir / "culture_map"
+    (store_dir / "versions").mkdir(parents=True, exist_ok=True)
+    return store_dir
+
+
+def _version_filename(version: int) -> str:
+    return f"v{version:08d}.json"
+
+
+def _read_pointer(store_dir: Path) -> Optional[Dict[str, Any]]:
+    p = store_dir / "latest.json"
+    try:
+        return jsonio.loads(p.read_bytes())
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        print(f"[ERROR] Failed to read culture map pointer {p}: {e}")
+        return None
+
+
+def _read_version(store_dir: Path, version: int) -> Optional[Dict[str, Any]]:
+    p = store_dir / "versions" / _version_filename(version)
+    try:
+        return jsonio.loads(p.read_bytes())
+    except FileNotFoundError:
+        return None
+
+
+# 이 간격(델타 수)마다 델타 레코드에 전체 상태를 함께 기록해 재구성 비용을 제한한다
+try:
+    SNAPSHOT_INTERVAL = max(1, int(os.getenv("CULTURE_MAP_SNAPSHOT_INTERVAL", "20")))
+except Exception:
+    SNAPSHOT_INTERVAL = 20
+
+
+class CultureMapConflict(Exception):
+    """baseVersion이 최신 버전과 다를 때"""
+
+    def __init__(self, current_version: int):
+        super().__init__(f"base version is stale (current: {current_version})")
+        self.current_version = current_version
+
+
+def _item_key(item: Any) -> Optional[str]:
+    """노트/연결의 식별자. 연결에 id가 없으면 양 끝점으로 만든다."""
+    if isinstance(item, (str, int)):
+        return str(item)
+    if not isinstance(item, dict):
+        return None
+    if item.get("id") is not None:
+        return str(item["id"])
+    src = item.get("from", item.get("source"))
+    dst = item.get("to", item.get("target"))
+    if src is not None and dst is not None:
+        return f"{src}->{dst}"
+    return None
+
+
+class _MapState:
+    """재구성/델타 적용용 컬처맵 상태 (id -> 항목, 삽입 순서 유지)"""
+
+    def __init__(self, data: Optional[Dict[str, Any]] = None, version: int = 0):
+        data = data or {}
+        self.notes: Dict[str, Dict[str, Any]] = {}
+        self.connections: Dict[str, Dict[str, Any]] = {}
+        for n in data.get("notes") or []:
+            self.notes[_item_key(n) or f"#{len(self.notes)}"] = n
+        for c in data.get("connections") or []:
+            self.connections[_item_key(c) or f"#{len(self.connections)}"] = c
+        self.layer_state = data.get("layerState")
+        self.version = version
+        self.timestamp = data.get("timestamp")
+        self._data: Optional[Dict[str, Any]] = data if data else None
+        # 캐시된 상태에 델타를 적용하는 동안 읽기 요청이 목록을 만들지 않도록 보호
+        self._lock = threading.Lock()
+
+    def validate(self, ops: Dict[str, Any]) -> None:
+        for field, items in (("notes", self.notes), ("connections", self.connections)):
+            change = ops.get(field) or {}
+            for it in (change.get("added") or []) + (change.get("updated") or []):
+                if _item_key(it) is None:
+                    raise ValueError(f"{field}: every added/updated item needs an id")
+            removed = {_item_key(it) for it in change.get("removed") or []}
+            for it in change.get("updated") or []:
+                key = _item_key(it)
+                if key in removed:
+                    raise ValueError(f"{field}: id {key!r} is both updated and removed")
+                if key not in items:
+                    raise ValueError(f"{field}: unknown id {key!r}")
+
+    def projected_counts(self, ops: Dict[str, Any]) -> Tuple[int, int]:
+        """ops 적용 후의 (노트 수, 연결 수) - 변경된 항목만 살펴본다"""
+        counts = []
+        for field, items in (("notes", self.notes), ("connections", self.connections)):
+            change = ops.get(field) or {}
+            removed = {_item_key(it) for it in change.get("removed") or []}
+            added = {_item_key(it) for it in change.get("added") or []}
+            gone = {k for k in removed if k in items}
+            new = {k for k in added if k not in items or k in gone}
+            counts.append(len(items) - len(gone) + len(new))
+        return counts[0], counts[1]
+
+    def copy(self) -> "_MapState":
+        """델타를 미리 적용해 볼 얕은 복사본 (항목은 교체만 되므로 dict만 새로 만든다)"""
+        with self._lock:
+            clone = _MapState(version=self.version)
+            clone.notes = dict(self.notes)
+            clone.connections = dict(self.connections)
+            clone.layer_state = self.layer_state
+            clone.timestamp = self.timestamp
+        return clone
+
+    def apply(self, ops: Dict[str, Any], version: int, timestamp: int) -> None:
+        with self._lock:
+            self._apply(ops, version, timestamp)
+
+    def _apply(self, ops: Dict[str, Any], version: int, timestamp: int) -> None:
+        for field, items in (("notes", self.notes), ("connections", self.connections)):
+            change = ops.get(field) or {}
+            for it in change.get("removed") or []:
+                items.pop(_item_key(it), None)
+            for it in change.get("added") or []:
+                items[_item_key(it)] = it
+            for it in change.get("updated") or []:
+                key = _item_key(it)
+                merged = dict(items[key])
+                merged.update(it)
+                items[key] = merged
+        if "layerState" in ops and ops["layerState"] is not None:
+            self.layer_state = ops["layerState"]
+        self.version = version
+        self.timestamp = timestamp
+        self._data = None
+
+    def to_data(self) -> Dict[str, Any]:
+        with self._lock:
+            if self._data is None:
+                self._data = {
+                    "notes": list(self.notes.values()),
+                    "connections": list(self.connections.values()),
+                    "layerState": self.layer_state,
+                    "timestamp": self.timestamp,
+                    "version": self.version,
+                }
+            return self._data
+
+
+def _clean_ops(ops: Dict[str, Any]) -> Dict[str, Any]:
+    out: Dict[str, Any] = {}
+    for field in ("notes", "connections"):
+        change = ops.get(field) or {}
+        cleaned = {k: list(change.get(k) or []) for k in ("added", "updated", "removed") if change.get(k)}
+        if cleaned:
+            out[field] = cleaned
+    if ops.get("layerState") is not None:
+        out["layerState"] = ops["layerState"]
+    return out
+
+
+try:
+    _SESSION_CACHE_SIZE = max(1, int(os.getenv("CULTURE_MAP_CACHE_SESSIONS", "128")))
+except Exception:
+    _SESSION_CACHE_SIZE = 128
+
+
+class _SignatureCache:
+    """session_code -> (latest.json 시그니처, 값). 최근에 쓴 세션 maxsize개만 둔다 (LRU)."""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._items: "OrderedDict[str, Tuple[Tuple[int, int], Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, session_code: str, sig: Tuple[int, int]) -> Any:
+        with self._lock:
+            cached = self._items.get(session_code)
+            if cached is None or cached[0] != sig:
+                return None
+            self._items.move_to_end(session_code)
+            return cached[1]
+
+    def put(self, session_code: str, sig: Tuple[int, int], value: Any) -> None:
+        with self._lock:
+            self._items[session_code] = (sig, value)
+            self._items.move_to_end(session_code)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    def pop(self, session_code: str) -> None:
+        with self._lock:
+            self._items.pop(session_code, None)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+# 최신 상태 캐시: session_code -> (latest.json 시그니처, 상태)
+_LATEST_CACHE = _SignatureCache(_SESSION_CACHE_SIZE)
+
+
+def _pointer_signature(store_dir: Path) -> Optional[Tuple[int, int]]:
+    try:
+        st = (store_dir / "latest.json").stat()
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+def _reconstruct(store_dir: Path, version: int, snapshot_version: Optional[int] = None) -> Optional[_MapState]:
+    """가장 가까운 전체 상태 + 이후 델타 재적용으로 지정 버전 상태를 만든다"""
+    if version <= 0:
+        return None
+    base: Optional[Dict[str, Any]] = None
+    start = snapshot_version if snapshot_version is not None else version
+    while start > 0:
+        record = _read_version(store_dir, start)
+        if record and record.get("data") is not None:
+            base = record
+            break
+        start -= 1
+    if base is None:
+        return None
+    state = _MapState(base["data"], base["version"])
+    for v in range(start + 1, version + 1):
+        record = _read_version(store_dir, v)
+        if not record:
+            raise RuntimeError(f"culture map version {v} is missing")
+        state.apply(record.get("ops") or {}, v, record.get("timestamp"))
+    return state
+
+
+def _latest_state(session_code: str, store_dir: Path) -> Optional[_MapState]:
+    sig = _pointer_signature(store_dir)
+    if sig is None:
+        return None
+    cached = _LATEST_CACHE.get(session_code, sig)
+    if cached is not None:
+        return cached
+
+    pointer = _read_pointer(store_dir)
+    if not pointer:
+        return None
+    state = _reconstruct(store_dir, int(pointer.get("version", 0)), pointer.get("snapshotVersion"))
+    if state is not None:
+        _LATEST_CACHE.put(session_code, sig, state)
+    return state
+
+
+def _manifest_entry(record: Dict[str, Any], counts: Tuple[int, int]) -> Dict[str, Any]:
+    return {
+        "version": record["version"],
+        "kind": record.get("kind"),
+        "timestamp": record.get("timestamp"),
+        "snapshot": record.get("data") is not None,
+        "notes": counts[0],
+        "connections": counts[1],
+    }
+
+
+def _commit_record(session_code: str, store_dir: Path, record: Dict[str, Any], state: Optional[_MapState],
+                   snapshot_version: int, counts: Tuple[int, int]) -> None:
+    version = record["version"]
+    filename = _version_filename(version)
+    atomic_write_text(store_dir / "versions" / filename, jsonio.dumps_text(record))
+    # manifest는 버전 파일로부터 다시 만들 수 있으므로 fsync 없이 덧붙인다
+    with open(store_dir / "manifest.jsonl", "a", encoding="utf-8") as f:
+        f.write(jsonio.dumps_text(_manifest_entry(record, counts)) + "\n")
+    atomic_write_text(
+        store_dir / "latest.json",
+        jsonio.dumps_text({
+            "version": version,
+            "snapshotVersion": snapshot_version,
+            "timestamp": record["timestamp"],
+            "file": filename,
+        }),
+    )
+    if state is None:
+        _LATEST_CACHE.pop(session_code)
+        return
+    sig = _pointer_signature(store_dir)
+    if sig is not None:
+        _LATEST_CACHE.put(session_code, sig, state)
+
+
+def save_snapshot(session_code: str, data: Dict[str, Any],
+                  expected_version: Optional[int] = None) -> Optional[Dict[str, Any]]:
+    """컬처맵 전체 상태를 새 버전으로 저장하고 포인터를 갱신
+
+    expected_version을 주면 최신 버전이 그 값일 때만 저장한다 (아니면 CultureMapConflict).
+    """
+    store_dir = _culture_map_dir(session_code)
+    if not store_dir:
+        return None
+
+    with dir_lock(store_dir):
+        pointer = _read_pointer(store_dir) or {}
+        current = int(pointer.get("version", 0))
+        if expected_version is not None and current != expected_version:
+            raise CultureMapConflict(current)
+        version = current + 1
+        now = int(time.time())
+        data = dict(data)
+        data["timestamp"] = now
+        data["version"] = version
+        record = {"version": version, "kind": "snapshot", "timestamp": now, "data": data}
+        state = _MapState(data, version)
+        _commit_record(session_code, store_dir, record, state, version, (len(state.notes), len(state.connections)))
+
+    return {"id": f"v{version}", "version": version, "timestamp": now}
+
+
+def apply_delta(session_code: str, base_version: int, ops: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """baseVersion 기준 변경분(추가/수정/삭제)을 새 버전으로 기록
+
+    ops = {"notes": {"added": [], "updated": [], "removed": []},
+           "connections": {...}, "layerState": {...} | None}
+    """
+    store_dir = _culture_map_dir(session_code)
+    if not store_dir:
+        return None
+    ops = _clean_ops(ops)
+
+    with dir_lock(store_dir):
+        pointer = _read_pointer(store_dir) or {}
+        current = int(pointer.get("version", 0))
+        if base_version != current:
+            raise CultureMapConflict(current)
+
+        state = _latest_state(session_code, store_dir) if current else _MapState()
+        if state is None:
+            raise RuntimeError(f"culture map version {current} could not be reconstructed")
+        state.validate(ops)
+
+        version = current + 1
+        now = int(time.time())
+        counts = state.projected_counts(ops)
+        snapshot_version = int(pointer.get("snapshotVersion") or 0)
+        record: Dict[str, Any] = {
+            "version": version,
+            "kind": "delta",
+            "baseVersion": current,
+            "timestamp": now,
+            "ops": ops,
+        }
+        # 캐시된 상태는 건드리지 않고 복사본에 먼저 적용해 본다.
+        # 적용에 실패하면 아무것도 기록하지 않으므로 잘못된 델타가 이력에 남지 않는다.
+        state = state.copy()
+        state.apply(ops, version, now)
+        if current == 0 or version - snapshot_version >= SNAPSHOT_INTERVAL:
+            # 주기적으로 전체 상태를 함께 기록
+            record["data"] = state.to_data()
+            snapshot_version = version
+        _commit_record(session_code, store_dir, record, state, snapshot_version, counts)
+
+    return {"id": f"v{version}", "version": version, "timestamp": now}
+
+
+def get_latest(session_code: str) -> Optional[Dict[str, Any]]:
+    """최신 컬처맵 조회 (포인터가 바뀌지 않았다면 캐시된 상태 반환)"""
+    session_dir = get_session_dir(session_code)
+    if not session_dir:
+        return None
+    state = _latest_state(session_code, session_dir / "culture_map")
+    return state.to_data() if state else None
+
+
+def get_latest_version(session_code: str) -> int:
+    """최신 버전 번호 (저장된 버전이 없으면 0)"""
+    session_dir = get_session_dir(session_code)
+    if not session_dir:
+        return 0
+    pointer = _read_pointer(session_dir / "culture_map")
+    return int(pointer.get("version", 0)) if pointer else 0
+
+
+# ---------- history ----------
+
+try:
+    _HISTORY_CACHE_SIZE = max(1, int(os.getenv("CULTURE_MAP_HISTORY_CACHE_SIZE", "64")))
+except Exception:
+    _HISTORY_CACHE_SIZE = 64
+
+# 재구성한 과거 버전: (session_code, version) -> 데이터. 과거 버전은 바뀌지 않으므로 무효화가 필요 없다.
+_HISTORY_CACHE: "OrderedDict[Tuple[str, int], Dict[str, Any]]" = OrderedDict()
+_HISTORY_LOCK = threading.Lock()
+# session_code -> (latest.json 시그니처, manifest 항목 목록)
+_MANIFEST_CACHE = _SignatureCache(_SESSION_CACHE_SIZE)
+
+
+def _rebuild_manifest(store_dir: Path, latest: int) -> List[Dict[str, Any]]:
+    """버전 파일을 순서대로 읽어 manifest.jsonl을 다시 만든다"""
+    entries: List[Dict[str, Any]] = []
+    state: Optional[_MapState] = None
+    for v in range(1, latest + 1):
+        record = _read_version(store_dir, v)
+        if not record:
+            continue
+        if record.get("data") is not None:
+            state = _MapState(record["data"], v)
+        elif state is not None:
+            state.apply(record.get("ops") or {}, v, record.get("timestamp"))
+        counts = (len(state.notes), len(state.connections)) if state else (0, 0)
+        entries.append(_manifest_entry(record, counts))
+    atomic_write_text(
+        store_dir / "manifest.jsonl",
+        "".join(jsonio.dumps_text(e) + "\n" for e in entries),
+    )
+    return entries
+
+
+def _load_manifest(session_code: str, store_dir: Path) -> List[Dict[str, Any]]:
+    sig = _pointer_signature(store_dir)
+    if sig is None:
+        return []
+    cached = _MANIFEST_CACHE.get(session_code, sig)
+    if cached is not None:
+        return cached
+
+    pointer = _read_pointer(store_dir) or {}
+    latest = int(pointer.get("version", 0))
+    entries: List[Dict[str, Any]] = []
+    try:
+        with open(store_dir / "manifest.jsonl", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    entries.append(jsonio.loads(line))
+    except (OSError, ValueError):
+        entries = []
+    # 포인터보다 앞선(커밋되지 않은) 항목은 버리고, 빠진 항목이 있으면 다시 만든다
+    entries = [e for e in entries if int(e.get("version", 0)) <= latest]
+    if [e.get("version") for e in entries] != list(range(1, latest + 1)):
+        with dir_lock(store_dir):
+            entries = _rebuild_manifest(store_dir, latest)
+    _MANIFEST_CACHE.put(session_code, sig, entries)
+    return entries
+
+
+def _history_store_dir(session_code: str) -> Optional[Path]:
+    session_dir = get_session_dir(session_code)
+    if not session_dir or not (session_dir / "culture_map" / "latest.json").exists():
+        return None
+    return session_dir / "culture_map"
+
+
+def list_versions(session_code: str) -> Optional[List[Dict[str, Any]]]:
+    """버전 목록 (오래된 순)"""
+    store_dir = _history_store_dir(session_code)
+    if not store_dir:
+        return None
+    return list(_load_manifest(session_code, store_dir))
+
+
+def get_version(session_code: str, version: int) -> Optional[Dict[str, Any]]:
+    """지정한 버전 시점의 컬처맵 (가장 가까운 전체 상태 + 델타 재적용)"""
+    store_dir = _history_store_dir(session_code)
+    if not store_dir:
+        return None
+    key = (session_code, int(version))
+    with _HISTORY_LOCK:
+        cached = _HISTORY_CACHE.get(key)
+        if cached is not None:
+            _HISTORY_CACHE.move_to_end(key)
+            return cached
+
+    manifest = _load_manifest(session_code, store_dir)
+    if version < 1 or version > len(manifest):
+        return None
+    snapshots = [e["version"] for e in manifest if e.get("snapshot")]
+    pos = bisect.bisect_right(snapshots, version) - 1
+    state = _reconstruct(store_dir, version, snapshots[pos] if pos >= 0 else None)
+    if state is None:
+        return None
+    data = state.to_data()
+    with _HISTORY_LOCK:
+        _HISTORY_CACHE[key] = data
+        while len(_HISTORY_CACHE) > _HISTORY_CACHE_SIZE:
+            _HISTORY_CACHE.popitem(last=False)
+    return data
+
+
+def version_at(session_code: str, timestamp: int) -> Optional[int]:
+    """timestamp 시점에 유효했던 버전 번호 (그 이전 저장이 없으면 None)"""
+    store_dir = _history_store_dir(session_code)
+    if not store_dir:
+        return None
+    manifest = _load_manifest(session_code, store_dir)
+    stamps = [int(e.get("timestamp") or 0) for e in manifest]
+    pos = bisect.bisect_right(stamps, int(timestamp))
+    return manifest[pos - 1]["version"] if pos > 0 else None
+
+
+def _diff_items(before: List[Dict[str, Any]], after: List[Dict[str, Any]]) -> Dict[str, Any]:
+    old = {_item_key(it): it for it in before}
+    new = {_item_key(it): it for it in after}
+    return {
+        "added": [new[k] for k in new if k not in old],
+        "removed": [old[k] for k in old if k not in new],
+        "changed": [
+            {"id": k, "before": old[k], "after": new[k]}
+            for k in new if k in old and old[k] != new[k]
+        ],
+    }
+
+
+def diff_versions(session_code: str, from_version: int, to_version: int) -> Optional[Dict[str, Any]]:
+    """두 버전 사이의 노트/연결/레이어 상태 변화"""
+    a = get_version(session_code, from_version)
+    b = get_version(session_code, to_version)
+    if a is None or b is None:
+        return None
+    return {
+        "fromVersion": from_version,
+        "toVersion": to_version,
+        "notes": _diff_items(a.get("notes") or [], b.get("notes") or []),
+        "connections": _diff_items(a.get("connections") or [], b.get("connections") or []),
+        "layerStateChanged": a.get("layerState") != b.get("layerState"),
+    }
@@ -0,0 +1,400 @@
+"""
+워커 간 세션 이벤트 버스 (외부 서비스 없이 같은 호스트 안에서만 동작).
+
+- 호스트 잠금 파일을 먼저 잡은 워커 하나가 브로커를 띄운다. POSIX에서는 Unix 도메인 소켓,
+  Windows에서는 127.0.0.1 TCP 포트를 쓴다. 브로커 워커가 죽으면 잠금이 풀리고, 다시 연결을
+  시도하던 다른 워커가 브로커를 넘겨받는다.
+- 모든 워커(브로커 워커 포함)는 클라이언트로 접속해 로컬 구독자가 있는 토픽("session:<code>")만
+  구독하고, 발행한 이벤트는 브로커를 거쳐 그 토픽을 구독한 워커에 전달된다.
+- 프레임은 줄 단위 JSON: {"op": "sub"|"unsub"|"pub"|"resync", "topic"/"topics", "event"}
+- 느린 구독자: 큐가 가득 차면 쌓인 이벤트를 버리고 {"type": "resync"} 하나만 남긴다.
+  구독자는 이를 받으면 /api/fields/{code}/updates 등으로 전체 상태를 다시 읽으면 된다.
+  브로커 → 워커 연결도 같은 방식으로 제한한다.
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Set, Tuple
+
+from . import jsonio
+
+# Windows file locking
+try:
+    import msvcrt
+    HAS_MSVCRT = True
+except ImportError:
+    HAS_MSVCRT = False
+    try:
+        import fcntl
+        HAS_FCNTL = True
+    except ImportError:
+        HAS_FCNTL = False
+
+BASE_DIR = Path(__file__).resolve().parent.parent  # backend/
+RUNTIME_DIR = Path(os.getenv("DONGAM_UPLOADS_DIR") or (BASE_DIR.parent / "uploads"))
+SOCKET_PATH = Path(os.getenv("EVENT_BUS_SOCKET") or (RUNTIME_DIR / ".event_bus.sock"))
+LOCK_PATH = SOCKET_PATH.with_name(SOCKET_PATH.name + ".lock")
+USE_UNIX_SOCKET = sys.platform != "win32"
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return max(1, int(os.getenv(name, str(default))))
+    except Exception:
+        return default
+
+
+TCP_PORT = _env_int("EVENT_BUS_PORT", 8799)
+SUBSCRIBER_QUEUE = _env_int("EVENT_BUS_SUBSCRIBER_QUEUE", 256)
+CONNECTION_QUEUE = _env_int("EVENT_BUS_CONNECTION_QUEUE", 4096)
+RECONNECT_SECONDS = 0.5
+_MAX_FRAME = 1024 * 1024
+
+RESYNC = {"type": "resync"}
+
+
+def session_topic(session_code: str) -> str:
+    return f"session:{session_code}"
+
+
+def _frame(message: Dict[str, Any]) -> bytes:
+    return jsonio.dumps(message) + b"\n"
+
+
+class Subscription:
+    """한 구독자(예: SSE 연결 하나)의 제한된 이벤트 큐"""
+
+    def __init__(self, topic: str, maxsize: int = SUBSCRIBER_QUEUE):
+        self.topic = topic
+        self.queue: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue(maxsize)
+        self.dropped = 0
+
+    def deliver(self, event: Dict[str, Any]) -> None:
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # 밀린 이벤트를 버리고 전체 상태를 다시 읽으라는 표시만 남긴다
+            self.dropped += self.queue.qsize() + 1
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(dict(RESYNC))
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+# ---------- broker ----------
+
+class _BrokerConnection:
+    def __init__(self, writer: asyncio.StreamWriter):
+        self.writer = writer
+        self.topics: Set[str] = set()
+        # (topic, frame). 넘칠 때 버린 프레임의 토픽을 모두 resync하기 위해 토픽을 함께 둔다.
+        self.queue: "asyncio.Queue[Tuple[str, bytes]]" = asyncio.Queue(CONNECTION_QUEUE)
+        self.dropped = 0
+        self.lost_topics: Set[str] = set()
+
+    def send(self, topic: str, data: bytes) -> None:
+        if self.lost_topics:
+            # 이미 밀려서 resync를 예약한 상태면 이후 이벤트도 resync 하나로 합친다
+            self.lost_topics.add(topic)
+            self.dropped += 1
+            return
+        try:
+            self.queue.put_nowait((topic, data))
+        except asyncio.QueueFull:
+            lost = {topic}
+            while not self.queue.empty():
+                lost.add(self.queue.get_nowait()[0])
+                self.dropped += 1
+            self.dropped += 1
+            lost.discard("")
+            self.lost_topics = lost
+            self.queue.put_nowait(("", b""))  # pump 깨우기
+
+    async def pump(self) -> None:
+        while True:
+            _, data = await self.queue.get()
+            if data:
+                self.writer.write(data)
+            if self.lost_topics and self.queue.empty():
+                topics, self.lost_topics = sorted(self.lost_topics), set()
+                self.writer.write(_frame({"op": "resync", "topics": topics}))
+            await self.writer.drain()
+
+
+class _Broker:
+    def __init__(self):
+        self.connections: Set[_BrokerConnection] = set()
+        self.server: Optional[asyncio.AbstractServer] = None
+        self.published = 0
+
+    async def start(self) -> None:
+        if USE_UNIX_SOCKET:
+            try:
+                SOCKET_PATH.unlink()  # 잠금을 잡았으므로 남아 있는 소켓 파일은 죽은 브로커의 것
+            except FileNotFoundError:
+                pass
+            self.server = await asyncio.start_unix_server(self._handle, path=str(SOCKET_PATH), limit=_MAX_FRAME)
+        else:
+            self.server = await asyncio.start_server(self._handle, "127.0.0.1", TCP_PORT, limit=_MAX_FRAME)
+
+    async def stop(self) -> None:
+        if self.server is not None:
+            self.server.close()
+            for conn in list(self.connections):
+                conn.writer.close()
+            # 핸들러가 연결 종료를 읽고 끝날 기회를 준다
+            for _ in range(20):
+                if not self.connections:
+                    break
+                await asyncio.sleep(0.01)
+            await self.server.wait_closed()
+            self.server = None
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        conn = _BrokerConnection(writer)
+        self.connections.add(conn)
+        pump = asyncio.ensure_future(conn.pump())
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    msg = jsonio.loads(line)
+                except ValueError:
+                    continue
+                op, topic = msg.get("op"), msg.get("topic")
+                if not isinstance(topic, str):
+                    continue
+                if op == "sub":
+                    conn.topics.add(topic)
+                elif op == "unsub":
+                    conn.topics.discard(topic)
+                elif op == "pub":
+                    self.published += 1
+                    for other in self.connections:
+                        if topic in other.topics:
+                            other.send(topic, line)
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        except asyncio.CancelledError:
+            # 서버 종료 시: 3.11의 start_unix_server 콜백은 취소된 핸들러를 오류로 보고한다
+            pass
+        finally:
+            pump.cancel()
+            self.connections.discard(conn)
+            writer.close()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "connections": len(self.connections),
+            "published": self.published,
+            "connectionDropped": sum(c.dropped for c in self.connections),
+            "maxConnectionQueue": max((c.queue.qsize() for c in self.connections), default=0),
+        }
+
+
+# ---------- per-worker client ----------
+
+class EventBus:
+    """워커 하나의 이벤트 버스 클라이언트 (+ 잠금을 잡았다면 브로커)"""
+
+    def __init__(self):
+        self._subs: Dict[str, Set[Subscription]] = {}
+        self._out: "asyncio.Queue[bytes]" = asyncio.Queue(CONNECTION_QUEUE)
+        self._task: Optional[asyncio.Task] = None
+        self._connected = False
+        self._lock_file: Any = None
+        self.broker: Optional[_Broker] = None
+        self.published = 0
+        self.delivered = 0
+        self.publish_dropped = 0
+        self.reconnects = 0
+
+    # --- lifecycle ---
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._out = asyncio.Queue(CONNECTION_QUEUE)
+            self._task = asyncio.ensure_future(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._task = None
+        if self.broker is not None:
+            await self.broker.stop()
+            self.broker = None
+        self._release_broker_lock()
+        self._connected = False
+
+    def _try_broker_lock(self) -> bool:
+        if self._lock_file is not None:
+            return True
+        LOCK_PATH.parent.mkdir(parents=True, exist_ok=True)
+        f = open(LOCK_PATH, "a+")
+        try:
+            if HAS_MSVCRT:
+                msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+            elif HAS_FCNTL:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            f.close()
+            return False
+        self._lock_file = f
+        return True
+
+    def _release_broker_lock(self) -> None:
+        if self._lock_file is not None:
+            try:
+                if HAS_MSVCRT:
+                    self._lock_file.seek(0)
+                    msvcrt.locking(self._lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+                elif HAS_FCNTL:
+                    fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_UN)
+            except OSError:
+                pass
+            self._lock_file.close()
+            self._lock_file = None
+
+    async def _open(self):
+        if USE_UNIX_SOCKET:
+            return await asyncio.open_unix_connection(str(SOCKET_PATH), limit=_MAX_FRAME)
+        return await asyncio.open_connection("127.0.0.1", TCP_PORT, limit=_MAX_FRAME)
+
+    async def _run(self) -> None:
+        while True:
+            writer = None
+            try:
+                if self.broker is None and self._try_broker_lock():
+                    broker = _Broker()
+                    try:
+                        await broker.start()
+                    except OSError:
+                        self._release_broker_lock()
+                        raise
+                    self.broker = broker
+                    print(f"[INFO] Event bus broker started in worker {os.getpid()}")
+                reader, writer = await self._open()
+                # 재연결 시 현재 구독을 다시 알리고, 끊긴 동안 놓친 이벤트는 resync로 대신한다
+                for topic in list(self._subs):
+                    writer.write(_frame({"op": "sub", "topic": topic}))
+                    self._dispatch(topic, dict(RESYNC))
+                await writer.drain()
+                self._connected = True
+                sender = asyncio.ensure_future(self._send_loop(writer))
+                try:
+                    await self._read_loop(reader)
+                finally:
+                    sender.cancel()
+            except asyncio.CancelledError:
+                if writer is not None:
+                    writer.close()
+                raise
+            except OSError:
+                pass
+            except Exception as e:
+                print(f"[WARNING] Event bus connection error: {e}")
+            self._connected = False
+            if writer is not None:
+                writer.close()
+            self.reconnects += 1
+            await asyncio.sleep(RECONNECT_SECONDS)
+
+    async def _send_loop(self, writer: asyncio.StreamWriter) -> None:
+        while True:
+            writer.write(await self._out.get())
+            await writer.drain()
+
+    async def _read_loop(self, reader: asyncio.StreamReader) -> None:
+        while True:
+            line = await reader.readline()
+            if not line:
+                return
+            try:
+                msg = jsonio.loads(line)
+            except ValueError:
+                continue
+            if msg.get("op") == "pub":
+                self._dispatch(msg.get("topic"), msg.get("event") or {})
+            elif msg.get("op") == "resync":
+                for topic in msg.get("topics") or []:
+                    self._dispatch(topic, dict(RESYNC))
+
+    def _dispatch(self, topic: Any, event: Dict[str, Any]) -> None:
+        for sub in list(self._subs.get(topic, ())):
+            sub.deliver(event)
+            self.delivered += 1
+
+    def _send(self, message: Dict[str, Any]) -> bool:
+        try:
+            self._out.put_nowait(_frame(message))
+            return True
+        except asyncio.QueueFull:
+            return False
+
+    # --- public API ---
+
+    def publish(self, topic: str, event: Dict[str, Any]) -> None:
+        """이벤트를 모든 워커의 topic 구독자에게 보낸다 (이벤트 루프 스레드에서 호출)"""
+        event = {**event, "ts": event.get("ts") or int(time.time() * 1000)}
+        self.published += 1
+        if not self._connected:
+            # 브로커가 없으면 최소한 이 워커의 구독자에게는 전달
+            self._dispatch(topic, event)
+            return
+        if not self._send({"op": "pub", "topic": topic, "event": event}):
+            self.publish_dropped += 1
+            self._dispatch(topic, event)
+
+    def subscribe(self, topic: str) -> Subscription:
+        sub = Subscription(topic)
+        subs = self._subs.setdefault(topic, set())
+        if not subs and self._connected:
+            self._send({"op": "sub", "topic": topic})
+        subs.add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        subs = self._subs.get(sub.topic)
+        if not subs:
+            return
+        subs.discard(sub)
+        if not subs:
+            del self._subs[sub.topic]
+            if self._connected:
+                self._send({"op": "unsub", "topic": sub.topic})
+
+    def stats(self) -> Dict[str, Any]:
+        subs = [s for group in self._subs.values() for s in group]
+        return {
+            "pid": os.getpid(),
+            "connected": self._connected,
+            "isBroker": self.broker is not None,
+            "transport": "unix" if USE_UNIX_SOCKET else "tcp",
+            "topics": len(self._subs),
+            "subscribers": len(subs),
+            "published": self.published,
+            "delivered": self.delivered,
+            "publishDropped": self.publish_dropped,
+            "subscriberDropped": sum(s.dropped for s in subs),
+            "maxSubscriberQueue": max((s.queue.qsize() for s in subs), default=0),
+            "reconnects": self.reconnects,
+            "broker": self.broker.stats() if self.broker is not None else None,
+        }
+
+
+event_bus = EventBus()
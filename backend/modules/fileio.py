@@ -0,0 +1,55 @@
+"""
+저장소 모듈이 함께 쓰는 파일 도우미
+
+- atomic_write_text: 임시 파일에 쓰고 fsync 후 os.replace로 교체 (읽는 쪽은 이전/새 내용만 본다)
+- dir_lock: 디렉터리 단위 쓰기 잠금 (프로세스 내 스레드 잠금 + 프로세스 간 파일 잠금)
+"""
+from __future__ import annotations
+
+import os
+import threading
+import weakref
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+# Windows file locking
+try:
+    import msvcrt
+    HAS_MSVCRT = True
+except ImportError:
+    HAS_MSVCRT = False
+    try:
+        import fcntl
+        HAS_FCNTL = True
+    except ImportError:
+        HAS_FCNTL = False
+
+
+def atomic_write_text(p: Path, text: str) -> None:
+    tmp = p.with_name(f".{p.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, p)
+
+
+# 사용 중인 동안만 남는 디렉터리별 잠금 (잡고 있거나 기다리는 스레드가 없으면 자동으로 사라짐)
+_THREAD_LOCKS: "weakref.WeakValueDictionary[str, threading.Lock]" = weakref.WeakValueDictionary()
+_THREAD_LOCKS_GUARD = threading.Lock()
+
+
+@contextmanager
+def dir_lock(store_dir: Path) -> Iterator[None]:
+    """store_dir/.lock 으로 디렉터리의 쓰기 구간을 직렬화"""
+    with _THREAD_LOCKS_GUARD:
+        tlock = _THREAD_LOCKS.setdefault(str(store_dir), threading.Lock())
+    with tlock:
+        with open(store_dir / ".lock", "a+") as f:
+            if HAS_MSVCRT:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+            elif HAS_FCNTL:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            yield
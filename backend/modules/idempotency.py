@@ -0,0 +1,196 @@
+"""
+Idempotency-Key 결과 캐시
+
+불안정한 Wi-Fi에서 클라이언트가 같은 쓰기(artifact/세션/컬처맵 저장)를 다시 보내면
+처음 실행한 결과를 그대로 돌려주어 파일이 중복으로 쓰이거나 보존 개수 상한을 소모하지 않게 한다.
+
+- 키는 (경로, Idempotency-Key) 단위이며 요청 본문의 해시를 함께 저장한다.
+  같은 키로 다른 본문을 보내면 IdempotencyKeyReused (호출자는 422로 응답).
+- 같은 워커에서 동시에 들어온 같은 키의 요청은 한 번만 실행하고 나머지는 그 결과를 기다린다.
+  먼저 실행하던 요청이 취소되면 기다리던 요청 중 하나가 이어서 실행한다.
+- 완료된 결과는 워커 메모리(TTL + 개수 상한 LRU)에 두고, 재시도가 다른 워커로 가는 경우를 위해
+  shared_state의 공유 캐시에도 기록한다. 메모리에 있으면 디스크 I/O 없이 응답한다.
+- 성공한 결과만 저장한다. 실패(예외)는 기다리던 요청에 그대로 전달되고, 이후 재시도는 다시 실행된다.
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from . import jsonio
+from .io_executors import run_read, run_write
+from .shared_state import SharedBlobCache
+
+
+def _env_number(name: str, default: float) -> float:
+    try:
+        return max(1.0, float(os.getenv(name, str(default))))
+    except Exception:
+        return default
+
+
+IDEMPOTENCY_TTL_SECONDS = _env_number("IDEMPOTENCY_TTL_SECONDS", 3600)
+IDEMPOTENCY_MAX_ENTRIES = int(_env_number("IDEMPOTENCY_MAX_ENTRIES", 10000))
+IDEMPOTENCY_SHARED_CACHE_MB = _env_number("IDEMPOTENCY_SHARED_CACHE_MB", 16)
+MAX_KEY_LENGTH = 200
+
+
+class IdempotencyKeyReused(Exception):
+    """같은 Idempotency-Key로 다른 요청 본문을 보낸 경우"""
+
+
+def _cancel_requested() -> bool:
+    """현재 태스크 자체에 취소 요청이 있었는지 (Python 3.11+에서만 구분 가능)"""
+    cancelling = getattr(asyncio.current_task(), "cancelling", None)
+    return bool(cancelling and cancelling())
+
+
+def fingerprint(payload: Any) -> str:
+    return hashlib.sha256(jsonio.dumps(payload)).hexdigest()
+
+
+class IdempotencyCache:
+    """(경로, 키)별 첫 실행 결과를 TTL 동안 보관하고 동시 중복 실행을 하나로 합친다.
+
+    메모리 구조는 이벤트 루프에서만 건드리므로 잠금이 필요 없다.
+    """
+
+    def __init__(self, ttl: float = IDEMPOTENCY_TTL_SECONDS, max_entries: int = IDEMPOTENCY_MAX_ENTRIES,
+                 shared: Optional[SharedBlobCache] = None):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.shared = shared
+        # key -> (만료 시각, 본문 해시, 결과)
+        self._done: "OrderedDict[str, Tuple[float, str, Any]]" = OrderedDict()
+        self._inflight: Dict[str, Tuple[str, asyncio.Future]] = {}
+        self.executed = 0
+        self.replayed = 0
+        self.collapsed = 0
+        self.conflicts = 0
+
+    def _remember(self, key: str, expires_at: float, fp: str, result: Any) -> None:
+        self._done[key] = (expires_at, fp, result)
+        self._done.move_to_end(key)
+        while len(self._done) > self.max_entries:
+            self._done.popitem(last=False)
+
+    def _lookup(self, key: str, now: float) -> Optional[Tuple[float, str, Any]]:
+        # 가장 오래된 항목부터 만료된 것을 몇 개씩 치운다 (TTL이 같으므로 삽입 순서 ≈ 만료 순서)
+        for _ in range(8):
+            if not self._done:
+                break
+            oldest = next(iter(self._done))
+            if self._done[oldest][0] > now:
+                break
+            del self._done[oldest]
+        entry = self._done.get(key)
+        if entry is None or entry[0] <= now:
+            return None
+        return entry
+
+    def _check(self, fp: str, stored: str) -> None:
+        if fp != stored:
+            self.conflicts += 1
+            raise IdempotencyKeyReused("Idempotency-Key was already used with a different request body")
+
+    async def run(self, scope: str, key: str, payload: Any,
+                  execute: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """(결과, 이전 결과를 재사용했는지). 결과는 JSON으로 직렬화할 수 있어야 한다."""
+        if not key or len(key) > MAX_KEY_LENGTH:
+            raise ValueError(f"Idempotency-Key must be 1-{MAX_KEY_LENGTH} characters")
+        cache_key = f"{scope}|{key}"
+        fp = fingerprint(payload)
+        while True:
+            now = time.time()
+            entry = self._lookup(cache_key, now)
+            if entry is not None:
+                self._check(fp, entry[1])
+                self.replayed += 1
+                return entry[2], True
+
+            pending = self._inflight.get(cache_key)
+            if pending is None:
+                break
+            self._check(fp, pending[0])
+            self.collapsed += 1
+            try:
+                return await asyncio.shield(pending[1]), True
+            except asyncio.CancelledError:
+                if not pending[1].cancelled() or _cancel_requested():
+                    raise
+                # 먼저 실행하던 요청만 취소됨(클라이언트 연결 끊김 등) → 다시 조회하고 필요하면 직접 실행
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[cache_key] = (fp, future)
+        try:
+            # 다른 워커에서 이미 처리한 재시도
+            stored = await self._shared_get(cache_key, now)
+            if stored is not None:
+                self._check(fp, stored["fingerprint"])
+                self._remember(cache_key, stored["expiresAt"], fp, stored["result"])
+                self.replayed += 1
+                future.set_result(stored["result"])
+                return stored["result"], True
+
+            result = await execute()
+            self.executed += 1
+            expires_at = time.time() + self.ttl
+            self._remember(cache_key, expires_at, fp, result)
+            future.set_result(result)
+            await self._shared_put(cache_key, {"fingerprint": fp, "expiresAt": expires_at, "result": result})
+            return result, False
+        except BaseException as e:
+            if not future.done():
+                if isinstance(e, asyncio.CancelledError):
+                    future.cancel()
+                else:
+                    future.set_exception(e)
+                    # 기다리는 요청이 없을 때 "exception was never retrieved" 경고가 나지 않도록
+                    future.exception()
+            raise
+        finally:
+            self._inflight.pop(cache_key, None)
+
+    async def _shared_get(self, cache_key: str, now: float) -> Optional[Dict[str, Any]]:
+        if self.shared is None:
+            return None
+        try:
+            raw = await run_read(self.shared.get, cache_key)
+            stored = jsonio.loads(raw) if raw else None
+        except Exception as e:
+            print(f"[WARNING] idempotency shared lookup failed: {e}")
+            return None
+        if not stored or stored.get("expiresAt", 0) <= now:
+            return None
+        return stored
+
+    async def _shared_put(self, cache_key: str, stored: Dict[str, Any]) -> None:
+        if self.shared is None:
+            return
+        try:
+            await run_write(self.shared.put, cache_key, jsonio.dumps(stored))
+        except Exception as e:
+            # 결과는 이미 만들어졌으므로 공유 기록 실패는 요청 실패로 만들지 않는다
+            print(f"[WARNING] idempotency shared store failed: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._done),
+            "inflight": len(self._inflight),
+            "maxEntries": self.max_entries,
+            "ttlSeconds": self.ttl,
+            "executed": self.executed,
+            "replayed": self.replayed,
+            "collapsed": self.collapsed,
+            "conflicts": self.conflicts,
+            "shared": self.shared.stats() if self.shared is not None else None,
+        }
+
+
+idempotency_cache = IdempotencyCache(
+    shared=SharedBlobCache("idempotency", int(IDEMPOTENCY_SHARED_CACHE_MB * 1024 * 1024)),
+)
@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Dict, Optional
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return max(1, int(os.getenv(name, str(default))))
+    except Exception:
+        return default
+
+
+class ExecutorSaturated(Exception):
+    """대기열이 가득 차 작업을 받을 수 없을 때 (호출자는 503으로 응답)"""
+
+
+class BoundedExecutor:
+    """스레드 수와 대기열 길이가 제한된 블로킹 I/O 실행기.
+
+    읽기와 fsync가 많은 쓰기를 서로 다른 인스턴스에서 돌려, 느린 쓰기가
+    읽기 요청 앞을 막지 않게 한다. 대기/실행 중 작업 수와 대기 시간을 함께 기록한다.
+    """
+
+    def __init__(self, name: str, workers: int, max_queue: int):
+        self.name = name
+        self.workers = workers
+        self.max_queue = max_queue
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self.queued = 0
+        self.running = 0
+        self.max_queued = 0
+        self.completed = 0
+        self.rejected = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def _executor(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix=f"io-{self.name}")
+        return self._pool
+
+    def _call(self, enqueued: float, fn: Callable[[], Any]) -> Any:
+        waited = time.perf_counter() - enqueued
+        with self._lock:
+            self.queued -= 1
+            self.running += 1
+            self.total_wait += waited
+            self.max_wait = max(self.max_wait, waited)
+        try:
+            return fn()
+        finally:
+            with self._lock:
+                self.running -= 1
+                self.completed += 1
+
+    async def run(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        with self._lock:
+            if self.queued >= self.max_queue:
+                self.rejected += 1
+                raise ExecutorSaturated(f"{self.name} executor queue is full")
+            self.queued += 1
+            self.max_queued = max(self.max_queued, self.queued)
+        loop = asyncio.get_running_loop()
+        try:
+            fut = loop.run_in_executor(self._executor(), self._call, time.perf_counter(), partial(fn, *args, **kwargs))
+        except RuntimeError:
+            # 종료 중이라 제출되지 못한 경우 대기 수를 되돌린다
+            with self._lock:
+                self.queued -= 1
+            raise
+        return await fut
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "maxQueue": self.max_queue,
+                "queued": self.queued,
+                "running": self.running,
+                "maxQueued": self.max_queued,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "avgWaitMs": round(self.total_wait / self.completed * 1000, 3) if self.completed else 0.0,
+                "maxWaitMs": round(self.max_wait * 1000, 3),
+            }
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+READ_EXECUTOR = BoundedExecutor(
+    "read", _env_int("IO_READ_WORKERS", 8), _env_int("IO_READ_MAX_QUEUE", 512)
+)
+# 파일 잠금 대기, time.sleep 백오프, fsync가 있는 쓰기 전용
+WRITE_EXECUTOR = BoundedExecutor(
+    "write", _env_int("IO_WRITE_WORKERS", 4), _env_int("IO_WRITE_MAX_QUEUE", 256)
+)
+
+
+async def run_read(fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    return await READ_EXECUTOR.run(fn, *args, **kwargs)
+
+
+async def run_write(fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    return await WRITE_EXECUTOR.run(fn, *args, **kwargs)
+
+
+def executor_stats() -> Dict[str, Any]:
+    return {"read": READ_EXECUTOR.stats(), "write": WRITE_EXECUTOR.stats()}
+
+
+def shutdown_executors() -> None:
+    READ_EXECUTOR.shutdown()
+    WRITE_EXECUTOR.shutdown()
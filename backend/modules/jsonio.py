@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import json
+import math
+from typing import Any, Union
+
+try:
+    import orjson  # optional
+except ImportError:
+    orjson = None
+
+# 응답/저장 파일 모두 들여쓰기 없이 UTF-8 그대로 쓴다 (stdlib도 orjson과 같은 모양이 되도록)
+BACKEND = "orjson" if orjson is not None else "json"
+
+if orjson is not None:
+    _ORJSON_OPTS = orjson.OPT_NON_STR_KEYS
+
+
+def _finite(obj: Any) -> Any:
+    """NaN/Infinity를 None으로 바꾼 사본 (orjson과 같은 결과가 되도록)"""
+    if isinstance(obj, float):
+        return obj if math.isfinite(obj) else None
+    if isinstance(obj, dict):
+        return {k: _finite(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_finite(v) for v in obj]
+    return obj
+
+
+def _stdlib_dumps(obj: Any) -> str:
+    # NaN/Infinity는 JSON이 아니므로 그대로 쓰지 않는다 (orjson은 null로 쓴다)
+    try:
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), allow_nan=False)
+    except ValueError as e:
+        if "Out of range float" not in str(e):
+            raise
+    return json.dumps(_finite(obj), ensure_ascii=False, separators=(",", ":"), allow_nan=False)
+
+
+def dumps(obj: Any) -> bytes:
+    """JSON 직렬화 (UTF-8 bytes, 공백 없음)"""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, option=_ORJSON_OPTS)
+        except TypeError:
+            # 64비트를 넘는 정수 등 orjson이 거부하는 값은 stdlib로 처리
+            pass
+    return _stdlib_dumps(obj).encode("utf-8")
+
+
+def dumps_text(obj: Any) -> str:
+    """dumps()의 str 버전 (파일/SSE 등 텍스트로 쓰는 곳)"""
+    if orjson is not None:
+        return dumps(obj).decode("utf-8")
+    return _stdlib_dumps(obj)
+
+
+def loads(data: Union[str, bytes]) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
@@ -1,7 +1,9 @@
 from pathlib import Path
+import hashlib
 import json
+import threading
 import time
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Tuple
 
 
 def _spirits_path() -> Path:
@@ -9,35 +11,109 @@ def _spirits_path() -> Path:
 	return Path(__file__).resolve().parent / "dongam_spirit.json"
 
 
-# simple in-memory cache with TTL
-_CACHE: Dict[str, Any] = {"data": None, "ts": 0.0}
+class SpiritCatalog:
+	"""dongam_spirit.json 한 버전의 읽기 전용 스냅샷과 조회용 인덱스.
+
+	version은 파일 내용 해시라 모든 워커에서 같고, revision은 이 프로세스에서
+	카탈로그가 교체될 때마다 1씩 증가한다.
+	"""
+
+	def __init__(self, data: Dict[str, Any], version: str, signature: Optional[Tuple[int, int]], revision: int):
+		self.data = data
+		self.version = version
+		self.signature = signature
+		self.revision = revision
+		self.loaded_at = time.time()
+		self.spirits_by_id: Dict[str, Dict[str, Any]] = {}
+		# spirit id -> 정규화된 element_id -> 요소
+		self.elements_by_id: Dict[str, Dict[str, Dict[str, Any]]] = {}
+		for spirit in data.get("spirits", []):
+			sid = spirit.get("id")
+			if sid is None or sid in self.spirits_by_id:
+				continue
+			self.spirits_by_id[sid] = spirit
+			elements: Dict[str, Dict[str, Any]] = {}
+			for element in (spirit.get("tangible_elements") or []) + (spirit.get("intangible_elements") or []):
+				eid = _normalize_element_id(element.get("id", ""))
+				if eid:
+					elements.setdefault(eid, element)
+			self.elements_by_id[sid] = elements
+		# 요소 연결 그래프도 카탈로그 버전과 함께 미리 만든다
+		from .spirit_graph import SpiritGraph
+		self.graphs: Dict[str, "SpiritGraph"] = {sid: SpiritGraph(s) for sid, s in self.spirits_by_id.items()}
+
+	def get_spirit(self, spirit_id: str) -> Optional[Dict[str, Any]]:
+		return self.spirits_by_id.get(spirit_id)
+
+	def get_element(self, spirit_id: str, element_id: Any) -> Optional[Dict[str, Any]]:
+		return self.elements_by_id.get(spirit_id, {}).get(_normalize_element_id(element_id))
+
+
 import os
 
-# Allow override via environment variable for workshop tuning
+# 파일 stat 확인 최소 간격(초). 0이면 매 요청마다 mtime/size를 확인한다.
 try:
-    _TTL_SECONDS = float(os.getenv("PROMPT_CACHE_TTL_SECONDS", "60"))
+    _CHECK_INTERVAL_SECONDS = float(os.getenv("SPIRIT_CATALOG_CHECK_SECONDS", "1"))
 except Exception:
-    _TTL_SECONDS = 60.0
+    _CHECK_INTERVAL_SECONDS = 1.0
 
+_CATALOG: Optional[SpiritCatalog] = None
+_LAST_CHECK = 0.0
+_RELOAD_LOCK = threading.Lock()
 
-def load_spirits() -> Dict[str, Any]:
-	p = _spirits_path()
-	# cache hit
-	now = time.time()
-	if _CACHE.get("data") is not None and (now - float(_CACHE.get("ts", 0.0))) < _TTL_SECONDS:
-		return _CACHE["data"]
 
-	if not p.exists():
+def _file_signature(p: Path) -> Optional[Tuple[int, int]]:
+	try:
+		st = p.stat()
+	except OSError:
+		return None
+	return (st.st_mtime_ns, st.st_size)
+
+
+def _reload_catalog(current: Optional[SpiritCatalog], force: bool = False) -> SpiritCatalog:
+	p = _spirits_path()
+	sig = _file_signature(p)
+	revision = (current.revision + 1) if current else 1
+	if sig is None:
 		# Minimal default
-		data = {"spirits": []}
-		_CACHE["data"] = data
-		_CACHE["ts"] = now
-		return data
+		if current is not None and current.version == "empty" and not force:
+			return current
+		return SpiritCatalog({"spirits": []}, "empty", None, revision)
+
+	raw = p.read_bytes()
+	version = hashlib.sha1(raw).hexdigest()[:16]
+	if current is not None and current.version == version and not force:
+		# 내용이 그대로면 (touch 등) 파싱/인덱스/템플릿을 재사용
+		current.signature = sig
+		return current
+	try:
+		return SpiritCatalog(json.loads(raw.decode("utf-8")), version, sig, revision)
+	except Exception as e:
+		# 잘못된 파일로 서비스가 멈추지 않도록 마지막으로 정상이던 카탈로그를 계속 쓴다.
+		# 시그니처는 기록해 두어 파일이 다시 바뀔 때까지 매번 파싱하지 않는다.
+		print(f"[ERROR] Failed to load spirit catalog {p} (version {version}): {e}")
+		if current is not None:
+			current.signature = sig
+			return current
+		return SpiritCatalog({"spirits": []}, "empty", sig, revision)
 
-	data = json.loads(p.read_text(encoding="utf-8"))
-	_CACHE["data"] = data
-	_CACHE["ts"] = now
-	return data
+
+def get_catalog(force_reload: bool = False) -> SpiritCatalog:
+	"""현재 카탈로그. 파일의 mtime/size가 바뀐 경우에만 다시 읽고, 새 객체로 통째로 교체한다."""
+	global _CATALOG, _LAST_CHECK
+	catalog = _CATALOG
+	now = time.time()
+	if catalog is not None and not force_reload and now - _LAST_CHECK < _CHECK_INTERVAL_SECONDS:
+		return catalog
+	if catalog is not None and not force_reload and _file_signature(_spirits_path()) == catalog.signature:
+		_LAST_CHECK = now
+		return catalog
+
+	with _RELOAD_LOCK:
+		catalog = _reload_catalog(_CATALOG, force=force_reload)
+		_CATALOG = catalog  # 참조 교체는 원자적이므로 읽는 쪽은 잠금이 필요 없다
+		_LAST_CHECK = now
+	return catalog
 
 
 def _normalize_element_id(eid: Any) -> Any:
@@ -57,52 +133,41 @@ def _normalize_element_id(eid: Any) -> Any:
 	return s
 
 
-def get_spirit_by_id(data: Dict[str, Any], spirit_id: str) -> Optional[Dict[str, Any]]:
-	for s in data.get("spirits", []):
-		if s.get("id") == spirit_id:
-			return s
-	return None
+class _PromptTemplate:
+	"""정신(spirit)별로 사용자 입력과 무관한 프롬프트 구간을 미리 만들어 둔 것"""
 
+	__slots__ = (
+		"definition", "instructions_ca", "instructions_with_leader", "tail",
+		"compact_definition", "compact_tail",
+	)
 
-def build_prompt(payload: Dict[str, Any], spirit: Dict[str, Any]) -> str:
-	name = spirit.get("name", "")
-	desc = spirit.get("description", "")
+	def __init__(
+		self,
+		definition: str,
+		instructions_ca: str,
+		instructions_with_leader: str,
+		tail: str,
+		compact_definition: str,
+		compact_tail: str,
+	):
+		self.definition = definition
+		self.instructions_ca = instructions_ca
+		self.instructions_with_leader = instructions_with_leader
+		self.tail = tail
+		# compact 모드: 요소 목록은 ID와 함께 한 번만, 예시 JSON 대신 최소 스키마
+		self.compact_definition = compact_definition
+		self.compact_tail = compact_tail
 
-	activity_name = payload.get("activityName", "").strip()
-	core_text = (payload.get("coreText") or "").strip()
-	team_leader_observation = (payload.get("teamLeaderObservation") or "").strip()
-	outcomes = (payload.get("outcomes") or "").strip()
-	outputs = (payload.get("outputs") or "").strip()
-	factors = (payload.get("factors") or "").strip()
-	key_learning = (payload.get("keyLearning") or "").strip()
 
-	is_detailed = any([outcomes, outputs, factors, key_learning])
-	has_leader_observation = bool(team_leader_observation)
+# (spirit id, 카탈로그 버전) -> 템플릿. 카탈로그가 바뀌면 통째로 비운다.
+_TEMPLATES: Dict[Tuple[str, str], _PromptTemplate] = {}
+_TEMPLATES_LOCK = threading.Lock()
 
-	lines = []
-	lines.append("[목표] Change Agent 활동과 팀장 활동을 동암정신의 유형/무형 요소 구현 기여 관점에서 분석하고 JSON으로만 결과를 반환")
-	lines.append("")
-
-	lines.append("[분석 대상 활동]")
-	if activity_name:
-		lines.append(f"활동명: {activity_name}")
-	lines.append(f"Change Agent 본인 활동: {core_text}")
-	if has_leader_observation:
-		lines.append(f"팀장 활동 목격담: {team_leader_observation}")
-	lines.append("")
-
-	if is_detailed:
-		lines.append("[Change Agent 활동 상세 정보]")
-		if outcomes:
-			lines.append(f"Outcomes(목표): {outcomes}")
-		if outputs:
-			lines.append(f"Outputs(실행/결과): {outputs}")
-		if factors:
-			lines.append(f"Enabler/Blocker(성공/실패 요인): {factors}")
-		if key_learning:
-			lines.append(f"Key Learning(핵심 교훈/향후 계획): {key_learning}")
-		lines.append("")
 
+def _definition_lines(spirit: Dict[str, Any]) -> List[str]:
+	name = spirit.get("name", "")
+	desc = spirit.get("description", "")
+	lines: List[str] = []
 	lines.append("[동암정신 정의]")
 	lines.append(f"이름: {name}")
 	lines.append(f"설명: {desc}")
@@ -149,7 +214,11 @@ def build_prompt(payload: Dict[str, Any], spirit: Dict[str, Any]) -> str:
 		lines.append("- 경청과 질문 문화 (건설적 소통을 통한 상호 이해)")
 	
 	lines.append("")
+	return lines
 
+
+def _instruction_lines(has_leader_observation: bool) -> List[str]:
+	lines: List[str] = []
 	lines.append("[분석 지시사항]")
 	lines.append("1. Change Agent 활동 분석:")
 	lines.append("   - Change Agent가 수행한 활동이 어떤 유형/무형 요소의 실제 구현에 기여했는지 분석")
@@ -165,15 +234,12 @@ def build_prompt(payload: Dict[str, Any], spirit: Dict[str, Any]) -> str:
 	lines.append("   - **중요**: 제공된 활동 내용에 실제로 존재하는 사실만 인정하고, 없는 내용은 절대 꾸며내지 말 것")
 	lines.append("   - 활동이 부족하거나 해당 이론에 맞는 행동이 없다면 무리하게 칭찬하지 말고 실제 있었던 내용만 인정")
 	lines.append("")
+	return lines
 
-	lines.append("[출력 형식]")
-	lines.append("- 반드시 아래 JSON 스키마에 맞는 순수 JSON만 출력")
-	lines.append("- element_id는 실제 존재하는 유형/무형 요소 ID를 사용 (예: 유형_1, 무형_3)")
-	lines.append("- '유형3', '무형-2', '유형 4' 등은 금지. 반드시 '유형_3', '무형_2'처럼 언더스코어 형식을 사용할 것")
-	lines.append("")
 
-	lines.append("[JSON 스키마 - 정확한 element_id 매핑 필수]")
-	lines.append("현재 시스템에서 사용하는 정확한 element_id 매핑:")
+def _element_id_lines(spirit: Dict[str, Any]) -> List[str]:
+	"""'element_id: 요소 이름' 목록 (유형 → 무형 순)"""
+	lines: List[str] = []
 	
 	# 동적으로 element_id 매핑 생성
 	if spirit.get("tangible_elements"):
@@ -208,6 +274,20 @@ def build_prompt(payload: Dict[str, Any], spirit: Dict[str, Any]) -> str:
 		lines.append("무형_7: 각자 역할분담을 명확하고 공정하게 하는 것이 당연하다.")
 		lines.append("무형_8: 우린 어떤 행동이든 우리를 위한 일임을 모두가 믿는다")
 		lines.append("무형_9: 공감하고 이해한다 서로 살아온 환경이 다르기에 모두 각자의 사정을 안고 살아간다는 믿음")
+	return lines
+
+
+def _tail_lines(spirit: Dict[str, Any]) -> List[str]:
+	lines: List[str] = []
+	lines.append("[출력 형식]")
+	lines.append("- 반드시 아래 JSON 스키마에 맞는 순수 JSON만 출력")
+	lines.append("- element_id는 실제 존재하는 유형/무형 요소 ID를 사용 (예: 유형_1, 무형_3)")
+	lines.append("- '유형3', '무형-2', '유형 4' 등은 금지. 반드시 '유형_3', '무형_2'처럼 언더스코어 형식을 사용할 것")
+	lines.append("")
+
+	lines.append("[JSON 스키마 - 정확한 element_id 매핑 필수]")
+	lines.append("현재 시스템에서 사용하는 정확한 element_id 매핑:")
+	lines.extend(_element_id_lines(spirit))
 	lines.append("")
 	lines.append("[JSON 스키마]")
 	lines.append(
@@ -260,5 +340,144 @@ def build_prompt(payload: Dict[str, Any], spirit: Dict[str, Any]) -> str:
 		""".strip()
 	)
 
+	return lines
+
+
+_COMPACT_SCHEMA = (
+	'{"affected_elements":[{"element_id":"유형_1","element_name":"요소 이름",'
+	'"contribution_level":"high|medium|low","activity_source":"ca|leader","evidence":"근거"}],'
+	'"analysis":{"ca_activity_value":"","leader_impact":"","overall_effects":"","efficacy_support":""}}'
+)
+
+
+def _compact_definition_lines(spirit: Dict[str, Any]) -> List[str]:
+	lines: List[str] = []
+	lines.append("[동암정신 정의]")
+	lines.append(f"이름: {spirit.get('name', '')}")
+	lines.append(f"설명: {spirit.get('description', '')}")
+	lines.append("")
+	lines.append("[분석 대상 요소] element_id: 이름 (유형=구체적 시스템과 방식, 무형=근본적 믿음과 가치관)")
+	lines.extend(_element_id_lines(spirit))
+	lines.append("")
+	return lines
+
+
+def _compact_tail_lines() -> List[str]:
+	lines: List[str] = []
+	lines.append("[출력 형식]")
+	lines.append("- 아래 스키마의 순수 JSON만 출력. element_id는 위 목록의 ID를 그대로 사용 (예: 유형_3, 무형_2)")
+	lines.append("- activity_source: ca=Change Agent, leader=팀장. analysis 각 항목은 마크다운 문단 문자열")
+	lines.append("- efficacy_support: CA님/팀장님께 드리는 인정과 격려 (실제 활동 사실만 근거로)")
+	lines.append("")
+	lines.append("[JSON 스키마]")
+	lines.append(_COMPACT_SCHEMA)
+	return lines
+
+
+def _compile_template(spirit: Dict[str, Any]) -> _PromptTemplate:
+	def block(lines: List[str]) -> str:
+		return "\n".join(lines)
+
+	return _PromptTemplate(
+		definition=block(_definition_lines(spirit)),
+		instructions_ca=block(_instruction_lines(False)),
+		instructions_with_leader=block(_instruction_lines(True)),
+		tail=block(_tail_lines(spirit)),
+		compact_definition=block(_compact_definition_lines(spirit)),
+		compact_tail=block(_compact_tail_lines()),
+	)
+
+
+def get_prompt_template(spirit: Dict[str, Any], catalog_version: Optional[str] = None) -> _PromptTemplate:
+	"""spirit의 정적 프롬프트 구간. catalog_version이 있으면 (id, 버전)으로 캐시한다."""
+	if catalog_version is None or not spirit.get("id"):
+		return _compile_template(spirit)
+	key = (str(spirit["id"]), catalog_version)
+	tpl = _TEMPLATES.get(key)
+	if tpl is not None:
+		return tpl
+	tpl = _compile_template(spirit)
+	with _TEMPLATES_LOCK:
+		# 다른 버전의 템플릿은 더 이상 쓰이지 않으므로 정리
+		for stale in [k for k in _TEMPLATES if k[1] != catalog_version]:
+			del _TEMPLATES[stale]
+		_TEMPLATES[key] = tpl
+	return tpl
+
+
+def make_prompt_payload(fields: Dict[str, Any]) -> Dict[str, Any]:
+	"""요청 필드를 build_prompt 입력으로 정리. 하위 호환으로 text를 coreText로 사용한다."""
+	core = (fields.get("coreText") or fields.get("text") or "").strip()
+	if not core:
+		raise ValueError("coreText is required")
+	return {
+		"activityName": fields.get("activityName") or "",
+		"coreText": core,
+		"teamLeaderObservation": fields.get("teamLeaderObservation"),
+		"outcomes": fields.get("outcomes"),
+		"outputs": fields.get("outputs"),
+		"factors": fields.get("factors"),
+		"keyLearning": fields.get("keyLearning"),
+	}
+
+
+def build_prompt(
+	payload: Dict[str, Any],
+	spirit: Dict[str, Any],
+	catalog_version: Optional[str] = None,
+	compact: bool = False,
+) -> str:
+	"""분석 프롬프트 생성. compact=True면 요소 목록 중복과 긴 예시 JSON을 뺀 축약본을 만든다."""
+	tpl = get_prompt_template(spirit, catalog_version)
+
+	activity_name = payload.get("activityName", "").strip()
+	core_text = (payload.get("coreText") or "").strip()
+	team_leader_observation = (payload.get("teamLeaderObservation") or "").strip()
+	outcomes = (payload.get("outcomes") or "").strip()
+	outputs = (payload.get("outputs") or "").strip()
+	factors = (payload.get("factors") or "").strip()
+	key_learning = (payload.get("keyLearning") or "").strip()
+
+	is_detailed = any([outcomes, outputs, factors, key_learning])
+	has_leader_observation = bool(team_leader_observation)
+
+	lines = []
+	lines.append("[목표] Change Agent 활동과 팀장 활동을 동암정신의 유형/무형 요소 구현 기여 관점에서 분석하고 JSON으로만 결과를 반환")
+	lines.append("")
+
+	lines.append("[분석 대상 활동]")
+	if activity_name:
+		lines.append(f"활동명: {activity_name}")
+	lines.append(f"Change Agent 본인 활동: {core_text}")
+	if has_leader_observation:
+		lines.append(f"팀장 활동 목격담: {team_leader_observation}")
+	lines.append("")
+
+	if is_detailed:
+		lines.append("[Change Agent 활동 상세 정보]")
+		if outcomes:
+			lines.append(f"Outcomes(목표): {outcomes}")
+		if outputs:
+			lines.append(f"Outputs(실행/결과): {outputs}")
+		if factors:
+			lines.append(f"Enabler/Blocker(성공/실패 요인): {factors}")
+		if key_learning:
+			lines.append(f"Key Learning(핵심 교훈/향후 계획): {key_learning}")
+		lines.append("")
+
+	# 정적 구간은 미리 만든 템플릿을 그대로 이어 붙인다
+	lines.append(tpl.compact_definition if compact else tpl.definition)
+	lines.append(tpl.instructions_with_leader if has_leader_observation else tpl.instructions_ca)
+	lines.append(tpl.compact_tail if compact else tpl.tail)
+
 	return "\n".join(lines)
 
+
+def estimate_tokens(text: str) -> int:
+	"""토크나이저 없이 쓰는 대략적인 토큰 수: 한글 등 비ASCII는 글자당 1, ASCII는 4글자당 1"""
+	ascii_chars = sum(1 for ch in text if ord(ch) < 128)
+	return (len(text) - ascii_chars) + (ascii_chars + 3) // 4
+
+
+def prompt_size(text: str) -> Dict[str, int]:
+	return {"chars": len(text), "estimatedTokens": estimate_tokens(text)}
@@ -1,10 +1,10 @@
 from __future__ import annotations
 
-import json
 import time
 import os
 from pathlib import Path
 from typing import Dict, Any, Optional, List
+from . import jsonio
 from .session_manager import get_session_dir
 
 # Windows file locking
@@ -62,28 +62,33 @@ def _with_file_lock(func):
     return wrapper
 
 
+def _empty_field_states() -> Dict[str, Any]:
+    # 상태가 없으면 활동도 없었던 것으로 본다 (lastUpdate 0 → 폴링 간격 제안에서 유휴)
+    return {"fields": {}, "lastUpdate": 0}
+
+
 def load_field_states(session_code: str) -> Dict[str, Any]:
     """세션의 필드 상태 로드 (파일 잠금 사용)"""
     state_path = get_field_state_path(session_code)
     if not state_path:
-        return {"fields": {}, "lastUpdate": int(time.time())}
+        return _empty_field_states()
     
     if not state_path.exists():
         # 파일이 없으면 기본값 반환
-        return {"fields": {}, "lastUpdate": int(time.time())}
+        return _empty_field_states()
     
     @_with_file_lock
     def _load_from_file(f):
         content = f.read()
         if not content.strip():
-            return {"fields": {}, "lastUpdate": int(time.time())}
-        return json.loads(content)
+            return _empty_field_states()
+        return jsonio.loads(content)
     
     try:
         return _load_from_file(state_path)
     except Exception as e:
         print(f"[ERROR] Failed to load field states: {e}")
-        return {"fields": {}, "lastUpdate": int(time.time())}
+        return _empty_field_states()
 
 
 def save_field_states(session_code: str, states: Dict[str, Any]) -> None:
@@ -98,7 +103,7 @@ def save_field_states(session_code: str, states: Dict[str, Any]) -> None:
     def _save_to_file(f, states_data):
         f.seek(0)
         f.truncate()
-        json.dump(states_data, f, ensure_ascii=False, indent=2)
+        f.write(jsonio.dumps_text(states_data))
         f.flush()
         os.fsync(f.fileno())  # 강제로 디스크에 쓰기
     
@@ -200,7 +205,6 @@ def update_field_value(session_code: str, field_id: str, value: str, user_id: st
 def get_field_updates(session_code: str, since: int = 0) -> Dict[str, Any]:
     """지정된 시간 이후 업데이트된 필드들 조회 - 단순화된 버전"""
     states = load_field_states(session_code)
-    current_time = int(time.time())
     
     print(f"[DEBUG] get_field_updates - session: {session_code}, since: {since}")
     print(f"[DEBUG] Current field states: {states.get('fields', {})}")
@@ -208,7 +212,7 @@ def get_field_updates(session_code: str, since: int = 0) -> Dict[str, Any]:
     result = {
         "fields": states.get("fields", {}),  # 모든 활성 필드 상태 전송
         "values": {},
-        "lastUpdate": states.get("lastUpdate", current_time)
+        "lastUpdate": states.get("lastUpdate", 0)
     }
     
     # 업데이트된 값들만 전송
@@ -226,9 +230,7 @@ def get_field_updates(session_code: str, since: int = 0) -> Dict[str, Any]:
     return result
 
 
-def cleanup_expired_locks(session_code: str) -> None:
-    """만료된 잠금들 정리"""
-    states = load_field_states(session_code)
+def _expired_lock_ids(states: Dict[str, Any]) -> List[str]:
     current_time = int(time.time())
     
     fields_to_remove = []
@@ -237,9 +239,21 @@ def cleanup_expired_locks(session_code: str) -> None:
         is_active = field_state.get("isActive", False)
         locked_by = field_state.get("lockedBy")
         
-        # 만료되었거나 비활성화된 잠금 제거
+        # 만료되었거나 비활성화된 잠금
         if (current_time - lock_time > 300) or (not is_active) or (not locked_by):
             fields_to_remove.append(field_id)
+    return fields_to_remove
+
+
+def has_expired_locks(session_code: str) -> bool:
+    """정리할 잠금이 있는지 (읽기만 한다)"""
+    return bool(_expired_lock_ids(load_field_states(session_code)))
+
+
+def cleanup_expired_locks(session_code: str) -> None:
+    """만료된 잠금들 정리"""
+    states = load_field_states(session_code)
+    fields_to_remove = _expired_lock_ids(states)
     
     # 만료된 잠금들을 완전히 제거 (unlock_field와 동일한 방식)
     for field_id in fields_to_remove:
@@ -0,0 +1,207 @@
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from . import jsonio
+from .shared_state import SharedBlobCache
+
+
+class ByteLRUCache:
+    """직렬화된 응답 바이트를 보관하는 LRU 캐시 (전체 바이트 수 기준으로 제거)"""
+
+    def __init__(self, max_bytes: int, max_entries: int = 10000):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._items: "OrderedDict[str, bytes]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            value = self._items.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: str, value: bytes) -> None:
+        if len(value) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old)
+            self._items[key] = value
+            self._bytes += len(value)
+            while self._items and (self._bytes > self.max_bytes or len(self._items) > self.max_entries):
+                _, evicted = self._items.popitem(last=False)
+                self._bytes -= len(evicted)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._items),
+                "bytes": self._bytes,
+                "maxBytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+def request_key(payload: Dict[str, Any], *parts: Any) -> str:
+    """정규화된 요청(키 정렬 JSON)과 추가 구성요소(spirit id, 카탈로그 버전 등)의 해시"""
+    h = hashlib.sha256()
+    h.update(json.dumps(payload, ensure_ascii=False, sort_keys=True, separators=(",", ":")).encode("utf-8"))
+    for part in parts:
+        h.update(b"\x00")
+        h.update(str(part).encode("utf-8"))
+    return h.hexdigest()
+
+
+def etag_for(key: str) -> str:
+    return f'"{key[:32]}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [t.strip() for t in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+
+class TieredCache:
+    """워커 로컬 LRU(1차) + 워커 간 공유 캐시(2차).
+
+    1차 조회는 메모리만 보므로 이벤트 루프에서 바로 호출하고, 디스크를 읽는
+    get_shared/put은 io 실행기에서 호출한다.
+    """
+
+    def __init__(self, local: ByteLRUCache, shared: Any):
+        self.local = local
+        self.shared = shared
+
+    def peek(self, key: str) -> Optional[bytes]:
+        return self.local.get(key)
+
+    def get_shared(self, key: str) -> Optional[bytes]:
+        value = self.shared.get(key)
+        if value is not None:
+            self.local.put(key, value)
+        return value
+
+    def put(self, key: str, value: bytes) -> None:
+        self.local.put(key, value)
+        self.shared.put(key, value)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"local": self.local.stats(), "shared": self.shared.stats()}
+
+
+def _env_mb(name: str, default: float) -> int:
+    try:
+        return int(float(os.getenv(name, str(default))) * 1024 * 1024)
+    except Exception:
+        return int(default * 1024 * 1024)
+
+
+# /api/generate-prompt 응답 캐시 (키에 카탈로그 버전이 포함되므로 카탈로그 변경 시 자연히 무효화)
+prompt_response_cache = TieredCache(
+    ByteLRUCache(_env_mb("PROMPT_RESPONSE_CACHE_MB", 32)),
+    SharedBlobCache("prompt", _env_mb("PROMPT_SHARED_CACHE_MB", 128)),
+)
+
+
+# ---------- 미리 압축한 정적 응답 ----------
+
+try:
+    import brotli  # optional
+except ImportError:
+    brotli = None
+
+
+class EncodedBody:
+    """한 번 직렬화한 JSON 본문과 그 gzip/brotli 압축본"""
+
+    __slots__ = ("etag", "identity", "gzip", "br")
+
+    def __init__(self, content: bytes, etag: str):
+        self.etag = etag
+        self.identity = content
+        self.gzip = gzip.compress(content, compresslevel=9, mtime=0)
+        self.br = brotli.compress(content, quality=11) if brotli is not None else None
+
+    def select(self, accept_encoding: Optional[str]) -> Tuple[bytes, Optional[str]]:
+        """Accept-Encoding에 맞는 (본문, Content-Encoding)"""
+        accepted = _accepted_encodings(accept_encoding)
+        if self.br is not None and "br" in accepted:
+            return self.br, "br"
+        if "gzip" in accepted:
+            return self.gzip, "gzip"
+        return self.identity, None
+
+
+def _accepted_encodings(header: Optional[str]) -> set:
+    out = set()
+    for part in (header or "").split(","):
+        token, _, params = part.strip().partition(";")
+        q = params.strip()
+        if q.startswith("q="):
+            try:
+                if float(q[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        if token:
+            out.add(token.strip().lower())
+    return out
+
+
+def encode_json_body(obj: Any, version: str) -> EncodedBody:
+    content = jsonio.dumps(obj)
+    return EncodedBody(content, f'"{version}-{hashlib.sha1(content).hexdigest()[:12]}"')
+
+
+class VersionedBodies:
+    """버전별로 한 번만 만드는 EncodedBody 모음. 새 버전이 들어오면 이전 버전 것은 버린다."""
+
+    def __init__(self):
+        self._version: Optional[str] = None
+        self._bodies: Dict[Any, EncodedBody] = {}
+        self._lock = threading.Lock()
+
+    def peek(self, version: str, key: Any) -> Optional[EncodedBody]:
+        """이미 만든 본문만 돌려준다 (없으면 None, 만들지 않음)"""
+        if self._version == version:
+            return self._bodies.get(key)
+        return None
+
+    def get(self, version: str, key: Any, build: Callable[[], Any]) -> EncodedBody:
+        body = self.peek(version, key)
+        if body is not None:
+            return body
+        body = encode_json_body(build(), version)
+        with self._lock:
+            if self._version != version:
+                self._version = version
+                self._bodies = {}
+            self._bodies[key] = body
+        return body
+
+
+# /api/spirits, /api/spirits/{id} 본문 (카탈로그 버전별)
+catalog_bodies = VersionedBodies()
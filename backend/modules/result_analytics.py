@@ -0,0 +1,194 @@
+from __future__ import annotations
+
+import threading
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+
+from .prompt_generator import SpiritCatalog, get_catalog
+from .result_store import ACTIVITY_SOURCES, CONTRIBUTION_LEVELS, RESULTS_DIR, read_columns, store_stats
+
+
+# 집계 행렬의 축: [요소, activity_source, contribution_level]
+DIMS = ("element", "source", "level")
+
+Scope = Tuple[str, ...]  # ("global",) | ("session", code) | ("team", name) | ("session_team", code, name)
+
+
+def _meta_signature(store_dir: Path) -> Optional[Tuple[int, int]]:
+    try:
+        st = (store_dir / "meta.json").stat()
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+class ContributionAggregates:
+    """결과 저장소의 spirit × element 기여도 집계를 읽은 행 위치(watermark)부터 이어서 갱신한다.
+
+    요소 축은 카탈로그 순서(spirit별 유형 → 무형)로 잡고, 카탈로그에 없는 element_id는
+    처음 나올 때 뒤에 붙인다. 카탈로그 버전이 바뀌거나 저장소가 줄어들면 처음부터 다시 만든다.
+    """
+
+    def __init__(self, store_dir: Path = RESULTS_DIR):
+        self.store_dir = store_dir
+        self._lock = threading.Lock()
+        self._reset(None)
+
+    def _reset(self, catalog: Optional[SpiritCatalog]) -> None:
+        self.catalog_version = catalog.version if catalog is not None else None
+        self.watermark = 0
+        self._signature: Optional[Tuple[int, int]] = None
+        self._axis: List[Tuple[str, str]] = []
+        self._axis_index: Dict[Tuple[str, str], int] = {}
+        self._scopes: Dict[Scope, np.ndarray] = {}
+        if catalog is not None:
+            for sid, elements in catalog.elements_by_id.items():
+                for eid in elements:
+                    self._axis_index[(sid, eid)] = len(self._axis)
+                    self._axis.append((sid, eid))
+
+    def _grow(self) -> None:
+        n = len(self._axis)
+        for key, mat in self._scopes.items():
+            if mat.shape[0] < n:
+                grown = np.zeros((n, len(ACTIVITY_SOURCES), len(CONTRIBUTION_LEVELS)), dtype=np.int64)
+                grown[: mat.shape[0]] = mat
+                self._scopes[key] = grown
+
+    def _matrix(self, scope: Scope) -> np.ndarray:
+        mat = self._scopes.get(scope)
+        if mat is None:
+            mat = self._scopes[scope] = np.zeros(
+                (len(self._axis), len(ACTIVITY_SOURCES), len(CONTRIBUTION_LEVELS)), dtype=np.int64
+            )
+        return mat
+
+    def _consume(self) -> int:
+        cols, dicts, rows = read_columns(self.store_dir, self.watermark)
+        count = rows - self.watermark
+        if count <= 0:
+            return 0
+
+        spirit = np.frombuffer(cols["spirit"], dtype=np.uint32).astype(np.int64)
+        element = np.frombuffer(cols["element_id"], dtype=np.uint32).astype(np.int64)
+        # (spirit 코드, element 코드) 쌍을 요소 축 위치로 변환
+        pair = spirit << 32 | element
+        uniq, inverse = np.unique(pair, return_inverse=True)
+        axis_pos = np.empty(len(uniq), dtype=np.int64)
+        for i, key in enumerate(uniq.tolist()):
+            ax = (dicts["spirit"][key >> 32], dicts["element_id"][key & 0xFFFFFFFF])
+            pos = self._axis_index.get(ax)
+            if pos is None:
+                pos = self._axis_index[ax] = len(self._axis)
+                self._axis.append(ax)
+            axis_pos[i] = pos
+        self._grow()
+        elem_idx = axis_pos[inverse]
+
+        def codes_to_index(col: str, values: Tuple[str, ...]) -> np.ndarray:
+            table = np.array([values.index(v) if v in values else 0 for v in dicts[col]] or [0], dtype=np.int64)
+            return table[np.frombuffer(cols[col], dtype=np.uint32)]
+
+        source_idx = codes_to_index("activity_source", ACTIVITY_SOURCES)
+        level_idx = codes_to_index("contribution_level", CONTRIBUTION_LEVELS)
+        sessions = np.frombuffer(cols["session"], dtype=np.uint32)
+        teams = np.frombuffer(cols["team"], dtype=np.uint32)
+
+        def add(scope: Scope, mask: Optional[np.ndarray]) -> None:
+            mat = self._matrix(scope)
+            if mask is None:
+                np.add.at(mat, (elem_idx, source_idx, level_idx), 1)
+            else:
+                np.add.at(mat, (elem_idx[mask], source_idx[mask], level_idx[mask]), 1)
+
+        add(("global",), None)
+        for code in np.unique(sessions).tolist():
+            if dicts["session"][code]:
+                add(("session", dicts["session"][code]), sessions == code)
+        for code in np.unique(teams).tolist():
+            if dicts["team"][code]:
+                add(("team", dicts["team"][code]), teams == code)
+        pairs = np.unique(sessions.astype(np.int64) << 32 | teams)
+        for key in pairs.tolist():
+            s, t = dicts["session"][key >> 32], dicts["team"][key & 0xFFFFFFFF]
+            if s and t:
+                add(("session_team", s, t), (sessions == key >> 32) & (teams == key & 0xFFFFFFFF))
+
+        self.watermark = rows
+        return count
+
+    def refresh(self, catalog: Optional[SpiritCatalog] = None) -> int:
+        """새로 커밋된 행만 반영하고 반영한 행 수를 반환"""
+        catalog = catalog or get_catalog()
+        with self._lock:
+            sig = _meta_signature(self.store_dir)
+            if catalog.version != self.catalog_version:
+                self._reset(catalog)
+            elif sig == self._signature:
+                return 0
+            if store_stats(self.store_dir)["rows"] < self.watermark:
+                # 저장소가 비워졌거나 교체된 경우
+                self._reset(catalog)
+            consumed = self._consume()
+            self._signature = sig
+            return consumed
+
+    def rebuild(self, catalog: Optional[SpiritCatalog] = None) -> Dict[str, Any]:
+        """처음부터 다시 집계하고, 기존 증분 결과와 일치했는지 함께 반환"""
+        catalog = catalog or get_catalog()
+        with self._lock:
+            before = {k: self._export_raw(k) for k in self._scopes} if self.catalog_version == catalog.version else None
+            self._reset(catalog)
+            self._consume()
+            self._signature = _meta_signature(self.store_dir)
+            after = {k: self._export_raw(k) for k in self._scopes}
+            mismatched = None if before is None else sorted(
+                "/".join(k) for k in set(before) | set(after) if before.get(k) != after.get(k)
+            )
+            return {
+                "rows": self.watermark,
+                "scopes": len(self._scopes),
+                "consistent": None if mismatched is None else not mismatched,
+                "mismatchedScopes": mismatched or [],
+            }
+
+    def _export_raw(self, scope: Scope) -> Dict[Tuple[str, str], List[List[int]]]:
+        mat = self._scopes[scope]
+        return {self._axis[i]: mat[i].tolist() for i in np.flatnonzero(mat.reshape(mat.shape[0], -1).any(axis=1))}
+
+    def matrix(self, scope: Scope, spirit_id: Optional[str] = None) -> Dict[str, Any]:
+        """scope의 spirit별 [요소, source, level] 기여 횟수"""
+        with self._lock:
+            mat = self._scopes.get(scope)
+            spirits: Dict[str, Dict[str, Any]] = {}
+            for i, (sid, eid) in enumerate(self._axis):
+                if spirit_id is not None and sid != spirit_id:
+                    continue
+                entry = spirits.setdefault(sid, {"elements": [], "counts": []})
+                entry["elements"].append(eid)
+                entry["counts"].append(mat[i].tolist() if mat is not None and i < mat.shape[0] else
+                                       [[0] * len(CONTRIBUTION_LEVELS) for _ in ACTIVITY_SOURCES])
+            return {
+                "scope": list(scope),
+                "rows": self.watermark,
+                "catalogVersion": self.catalog_version,
+                "dims": list(DIMS),
+                "sources": list(ACTIVITY_SOURCES),
+                "levels": list(CONTRIBUTION_LEVELS),
+                "spirits": spirits,
+            }
+
+
+contribution_aggregates = ContributionAggregates()
+
+
+def scope_for(session_code: Optional[str], team: Optional[str]) -> Scope:
+    if session_code and team:
+        return ("session_team", session_code, team)
+    if session_code:
+        return ("session", session_code)
+    if team:
+        return ("team", team)
+    return ("global",)
@@ -0,0 +1,225 @@
+from __future__ import annotations
+
+import os
+import sys
+import time
+from array import array
+from pathlib import Path
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+
+from . import jsonio
+from .fileio import atomic_write_text, dir_lock
+from .prompt_generator import SpiritCatalog, _normalize_element_id
+
+
+BASE_DIR = Path(__file__).resolve().parent.parent  # backend/
+UPLOADS_DIR = Path(os.getenv("DONGAM_UPLOADS_DIR") or (BASE_DIR.parent / "uploads"))  # project/uploads
+RESULTS_DIR = UPLOADS_DIR / "results"  # project/uploads/results
+RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+
+# 분석 결과(affected_elements) 한 항목 = 한 행. 열마다 파일 하나에 고정 폭 값을 이어 붙인다.
+#   meta.json          {"rows", "results", "byteorder", "dicts": {열: [값, ...]}} - 커밋 지점
+#   <열>.col           array 바이트 (문자열 열은 dicts의 위치를 가리키는 uint32 코드)
+# meta.json의 rows까지만 유효하며, 그 뒤에 남은 바이트는 중단된 쓰기이므로 다음 쓰기 때 잘라낸다.
+DICT_COLUMNS = ("session", "team", "spirit", "element_id", "contribution_level", "activity_source")
+INT_COLUMNS = ("result", "timestamp")
+COLUMNS = DICT_COLUMNS + INT_COLUMNS
+_TYPECODES = {**{c: "I" for c in DICT_COLUMNS}, **{c: "q" for c in INT_COLUMNS}}
+
+CONTRIBUTION_LEVELS = ("high", "medium", "low")
+ACTIVITY_SOURCES = ("ca", "leader")
+
+
+class ResultValidationError(ValueError):
+    pass
+
+
+def _strip_fences(text: str) -> str:
+    """LLM 응답에 붙는 ```json 코드 블록이나 앞뒤 설명 문장을 걷어낸다"""
+    s = text.strip()
+    if s.startswith("```"):
+        s = s.split("\n", 1)[1] if "\n" in s else ""
+        if s.rstrip().endswith("```"):
+            s = s.rstrip()[:-3]
+    start, end = s.find("{"), s.rfind("}")
+    if start == -1 or end < start:
+        raise ResultValidationError("result does not contain a JSON object")
+    return s[start:end + 1]
+
+
+def parse_result(result: Any) -> Dict[str, Any]:
+    """붙여넣은 결과(JSON 문자열 또는 객체)를 검증하고 element_id 등을 정규화"""
+    if isinstance(result, str):
+        text = _strip_fences(result)
+        try:
+            result = jsonio.loads(text)
+        except ValueError as e:
+            raise ResultValidationError(f"invalid JSON: {e}")
+    if not isinstance(result, dict):
+        raise ResultValidationError("result must be a JSON object")
+    elements = result.get("affected_elements")
+    if not isinstance(elements, list):
+        raise ResultValidationError("affected_elements must be a list")
+
+    normalized: List[Dict[str, Any]] = []
+    for i, el in enumerate(elements):
+        if not isinstance(el, dict):
+            raise ResultValidationError(f"affected_elements[{i}] must be an object")
+        eid = _normalize_element_id(el.get("element_id"))
+        if not isinstance(eid, str) or not eid:
+            raise ResultValidationError(f"affected_elements[{i}].element_id is required")
+        level = str(el.get("contribution_level") or "").strip().lower()
+        if level not in CONTRIBUTION_LEVELS:
+            raise ResultValidationError(
+                f"affected_elements[{i}].contribution_level must be one of {', '.join(CONTRIBUTION_LEVELS)}"
+            )
+        source = str(el.get("activity_source") or "ca").strip().lower()
+        if source not in ACTIVITY_SOURCES:
+            raise ResultValidationError(
+                f"affected_elements[{i}].activity_source must be one of {', '.join(ACTIVITY_SOURCES)}"
+            )
+        normalized.append({**el, "element_id": eid, "contribution_level": level, "activity_source": source})
+
+    analysis = result.get("analysis")
+    if analysis is not None and not isinstance(analysis, dict):
+        raise ResultValidationError("analysis must be an object")
+    return {"affected_elements": normalized, "analysis": analysis or {}}
+
+
+# ---------- columnar store ----------
+
+def _read_meta(store_dir: Path) -> Dict[str, Any]:
+    try:
+        meta = jsonio.loads((store_dir / "meta.json").read_bytes())
+    except FileNotFoundError:
+        meta = {}
+    meta.setdefault("rows", 0)
+    meta.setdefault("results", 0)
+    meta.setdefault("byteorder", sys.byteorder)
+    dicts = meta.setdefault("dicts", {})
+    for col in DICT_COLUMNS:
+        dicts.setdefault(col, [])
+    return meta
+
+
+def append_rows(rows: List[Dict[str, Any]], store_dir: Path = RESULTS_DIR, results: int = 0) -> Dict[str, int]:
+    """행들을 열 파일에 덧붙이고 meta.json을 갱신. 반환: {"firstRow", "rows", "results"}
+
+    result가 비어 있는 행에는 잠금 안에서 다음 결과 번호를 채운다.
+    """
+    with dir_lock(store_dir):
+        meta = _read_meta(store_dir)
+        start = int(meta["rows"])
+        next_result = int(meta["results"]) + 1
+        dicts: Dict[str, List[str]] = meta["dicts"]
+        lookups = {col: {v: i for i, v in enumerate(dicts[col])} for col in DICT_COLUMNS}
+
+        arrays: Dict[str, array] = {col: array(_TYPECODES[col]) for col in COLUMNS}
+        for row in rows:
+            for col in DICT_COLUMNS:
+                value = "" if row.get(col) is None else str(row[col])
+                code = lookups[col].get(value)
+                if code is None:
+                    code = lookups[col][value] = len(dicts[col])
+                    dicts[col].append(value)
+                arrays[col].append(code)
+            arrays["result"].append(next_result if row.get("result") is None else int(row["result"]))
+            arrays["timestamp"].append(int(row.get("timestamp") or 0))
+
+        for col, arr in arrays.items():
+            p = store_dir / f"{col}.col"
+            with open(p, "r+b" if p.exists() else "wb") as f:
+                f.truncate(start * arr.itemsize)
+                f.seek(0, os.SEEK_END)
+                f.write(arr.tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+
+        meta["rows"] = start + len(rows)
+        meta["results"] = int(meta["results"]) + results
+        atomic_write_text(store_dir / "meta.json", jsonio.dumps_text(meta))
+        return {"firstRow": start, "rows": len(rows), "results": int(meta["results"])}
+
+
+def read_columns(
+    store_dir: Path = RESULTS_DIR,
+    start: int = 0,
+    columns: Optional[List[str]] = None,
+) -> Tuple[Dict[str, array], Dict[str, List[str]], int]:
+    """start 행부터 커밋된 마지막 행까지의 열 배열, 문자열 사전, 전체 행 수를 반환"""
+    meta = _read_meta(store_dir)
+    rows = int(meta["rows"])
+    start = max(0, min(start, rows))
+    out: Dict[str, array] = {}
+    for col in columns or COLUMNS:
+        arr = array(_TYPECODES[col])
+        if rows > start:
+            with open(store_dir / f"{col}.col", "rb") as f:
+                f.seek(start * arr.itemsize)
+                arr.frombytes(f.read((rows - start) * arr.itemsize))
+            if meta["byteorder"] != sys.byteorder:
+                arr.byteswap()
+        out[col] = arr
+    return out, meta["dicts"], rows
+
+
+def iter_rows(store_dir: Path = RESULTS_DIR, start: int = 0) -> Iterator[Dict[str, Any]]:
+    cols, dicts, _ = read_columns(store_dir, start)
+    for i in range(len(cols["result"])):
+        row: Dict[str, Any] = {col: dicts[col][cols[col][i]] for col in DICT_COLUMNS}
+        for col in INT_COLUMNS:
+            row[col] = cols[col][i]
+        yield row
+
+
+def store_stats(store_dir: Path = RESULTS_DIR) -> Dict[str, Any]:
+    meta = _read_meta(store_dir)
+    return {
+        "rows": int(meta["rows"]),
+        "results": int(meta["results"]),
+        "distinct": {col: len(meta["dicts"][col]) for col in DICT_COLUMNS},
+    }
+
+
+def ingest_result(
+    result: Any,
+    *,
+    session_code: Optional[str],
+    team: Optional[str],
+    spirit_id: Optional[str],
+    catalog: Optional[SpiritCatalog] = None,
+    timestamp: Optional[int] = None,
+    store_dir: Path = RESULTS_DIR,
+) -> Dict[str, Any]:
+    """LLM 결과 하나를 검증해 요소별 행으로 저장"""
+    parsed = parse_result(result)
+    now = int(time.time()) if timestamp is None else int(timestamp)
+
+    unknown: List[str] = []
+    if catalog is not None and spirit_id:
+        known = catalog.elements_by_id.get(spirit_id)
+        if known is not None:
+            unknown = sorted({el["element_id"] for el in parsed["affected_elements"]} - set(known))
+
+    rows = [
+        {
+            "session": session_code,
+            "team": team,
+            "spirit": spirit_id,
+            "element_id": el["element_id"],
+            "contribution_level": el["contribution_level"],
+            "activity_source": el["activity_source"],
+            "result": None,
+            "timestamp": now,
+        }
+        for el in parsed["affected_elements"]
+    ]
+    info = append_rows(rows, store_dir, results=1)
+    return {
+        "resultId": info["results"],
+        "rows": info["rows"],
+        "firstRow": info["firstRow"],
+        "unknownElementIds": unknown,
+        "analysis": parsed["analysis"],
+    }
+
@@ -0,0 +1,213 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+from .artifact_index import ArtifactIndex, IndexReadError, index_write_lock, load_index, save_index
+
+# Windows file locking
+try:
+    import msvcrt
+    HAS_MSVCRT = True
+except ImportError:
+    HAS_MSVCRT = False
+    try:
+        import fcntl
+        HAS_FCNTL = True
+    except ImportError:
+        HAS_FCNTL = False
+
+
+def _env_number(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, str(default)))
+    except Exception:
+        return default
+
+
+@dataclass(frozen=True)
+class RetentionPolicy:
+    """artifact 저장소 보존 정책 (0은 제한 없음)"""
+    max_count: int = 1000
+    max_bytes: int = 0
+    max_age_seconds: int = 0
+
+    @classmethod
+    def from_env(cls, prefix: str, default_count: int = 1000) -> "RetentionPolicy":
+        return cls(
+            max_count=int(_env_number(f"{prefix}_MAX_COUNT", default_count)),
+            max_bytes=int(_env_number(f"{prefix}_MAX_BYTES", 0)),
+            max_age_seconds=int(_env_number(f"{prefix}_MAX_AGE_DAYS", 0) * 86400),
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "maxCount": self.max_count,
+            "maxBytes": self.max_bytes,
+            "maxAgeSeconds": self.max_age_seconds,
+        }
+
+
+# 전역 저장소(uploads/workshop)와 세션별 저장소(uploads/sessions/<code>/artifacts)
+STORE_POLICY = RetentionPolicy.from_env("ARTIFACT")
+SESSION_POLICY = RetentionPolicy.from_env("SESSION_ARTIFACT")
+
+# 인덱스에 아직 등록되지 않은 막 쓰여진 파일을 지우지 않도록 유예 시간을 둔다
+ORPHAN_GRACE_SECONDS = int(_env_number("ARTIFACT_GC_GRACE_SECONDS", 300))
+GC_INTERVAL_SECONDS = _env_number("ARTIFACT_GC_INTERVAL_SECONDS", 60)
+GC_STORES_PER_TICK = int(_env_number("ARTIFACT_GC_STORES_PER_TICK", 20))
+GC_FILES_PER_TICK = int(_env_number("ARTIFACT_GC_FILES_PER_TICK", 500))
+
+
+def enforce_policy(index: ArtifactIndex, policy: RetentionPolicy, now: Optional[int] = None) -> List[Dict[str, Any]]:
+    """정책을 초과한 가장 오래된 항목들을 인덱스에서 제거하고 반환 (파일 삭제는 호출자 몫)"""
+    now = int(time.time()) if now is None else now
+    dropped: List[Dict[str, Any]] = []
+    while len(index):
+        oldest = index.oldest()
+        too_old = policy.max_age_seconds > 0 and now - int(oldest.get("createdAt") or 0) > policy.max_age_seconds
+        too_many = policy.max_count > 0 and len(index) > policy.max_count
+        too_big = policy.max_bytes > 0 and index.total_bytes > policy.max_bytes and len(index) > 1
+        if not (too_old or too_many or too_big):
+            break
+        dropped.append(index.remove(oldest["id"]))
+    return dropped
+
+
+def remove_artifact_files(store_dir: Path, items: List[Dict[str, Any]]) -> int:
+    removed = 0
+    for it in items:
+        filename = it.get("filename")
+        if not filename:
+            continue
+        try:
+            (store_dir / filename).unlink()
+            removed += 1
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"[WARNING] Failed to remove artifact file {filename}: {e}")
+    return removed
+
+
+def reconcile_store(store_dir: Path, policy: RetentionPolicy, file_budget: int = GC_FILES_PER_TICK) -> Dict[str, int]:
+    """인덱스와 디스크 파일을 맞춘다: 정책 적용, 파일 없는 항목 제거, 고아 파일 삭제"""
+    stats = {"evicted": 0, "missing": 0, "orphans": 0}
+    p = store_dir / "index.json"
+    now = int(time.time())
+
+    with index_write_lock(p):
+        # 인덱스를 실제로 읽었을 때만 목록에 없는 파일을 고아로 본다.
+        # 파일이 없거나 읽을 수 없으면 일시적인 실패를 영구 삭제로 만들지 않도록 정리를 건너뛴다.
+        if not p.is_file():
+            return stats
+        try:
+            index = load_index(p)
+        except IndexReadError as e:
+            print(f"[WARNING] Skipping artifact GC for {store_dir}: {e}")
+            return stats
+        evicted = enforce_policy(index, policy, now)
+        missing = [it for it in index.items_ascending() if not (store_dir / it.get("filename", "")).exists()]
+        for it in missing:
+            index.remove(it["id"])
+        if evicted or missing:
+            save_index(p, index)
+        known = {it.get("filename") for it in index.items_ascending()}
+
+    stats["evicted"] = remove_artifact_files(store_dir, evicted)
+    stats["missing"] = len(missing)
+
+    try:
+        entries = os.scandir(store_dir)
+    except OSError:
+        return stats
+    with entries:
+        for entry in entries:
+            if stats["orphans"] >= file_budget:
+                break
+            if not entry.name.endswith(".txt") or entry.name in known:
+                continue
+            try:
+                if time.time() - entry.stat().st_mtime < ORPHAN_GRACE_SECONDS:
+                    continue
+                os.unlink(entry.path)
+                stats["orphans"] += 1
+            except OSError:
+                continue
+    return stats
+
+
+class ArtifactGarbageCollector:
+    """보존 정책과 고아 파일 정리를 백그라운드에서 조금씩 수행하는 수집기.
+
+    한 번의 tick에서 최대 GC_STORES_PER_TICK개의 저장소만 처리하고 다음 tick에
+    이어서 진행하므로, 저장소가 많아도 요청 처리를 오래 막지 않는다.
+    """
+
+    def __init__(self, workshop_dir: Path, sessions_dir: Path, lock_path: Path):
+        self.workshop_dir = workshop_dir
+        self.sessions_dir = sessions_dir
+        self.lock_path = lock_path
+        self._pending: List[Path] = []
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.last_run: Dict[str, Any] = {}
+
+    def _next_stores(self, budget: int) -> List[Path]:
+        if not self._pending:
+            self._pending = [self.workshop_dir]
+            try:
+                self._pending += [d / "artifacts" for d in self.sessions_dir.iterdir() if (d / "artifacts").is_dir()]
+            except OSError:
+                pass
+        batch, self._pending = self._pending[:budget], self._pending[budget:]
+        return batch
+
+    def run_once(self, store_budget: int = GC_STORES_PER_TICK) -> Dict[str, Any]:
+        totals = {"stores": 0, "evicted": 0, "missing": 0, "orphans": 0}
+        # 여러 워커가 동시에 같은 저장소를 정리하지 않도록 호스트 단위 잠금을 사용
+        with open(self.lock_path, "a+") as lock_file:
+            try:
+                if HAS_MSVCRT:
+                    msvcrt.locking(lock_file.fileno(), msvcrt.LK_NBLCK, 1)
+                elif HAS_FCNTL:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                return {**totals, "skipped": True}
+
+            for store_dir in self._next_stores(store_budget):
+                if not store_dir.is_dir():
+                    continue
+                policy = STORE_POLICY if store_dir == self.workshop_dir else SESSION_POLICY
+                try:
+                    stats = reconcile_store(store_dir, policy)
+                except Exception as e:
+                    print(f"[ERROR] Artifact GC failed for {store_dir}: {e}")
+                    continue
+                totals["stores"] += 1
+                for k, v in stats.items():
+                    totals[k] += v
+
+        self.last_run = {**totals, "at": int(time.time())}
+        return totals
+
+    def _loop(self) -> None:
+        while not self._stop.wait(GC_INTERVAL_SECONDS):
+            try:
+                self.run_once()
+            except Exception as e:
+                print(f"[ERROR] Artifact GC tick failed: {e}")
+
+    def start(self) -> None:
+        if GC_INTERVAL_SECONDS <= 0 or (self._thread and self._thread.is_alive()):
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="artifact-gc", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
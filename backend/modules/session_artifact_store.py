@@ -6,6 +6,9 @@ import uuid
 from pathlib import Path
 from typing import Dict, Any, List, Optional
 from .session_manager import get_session_dir
+from . import culture_map_store
+from .artifact_index import index_lock, index_write_lock, load_index, save_index
+from .retention import SESSION_POLICY, enforce_policy, remove_artifact_files
 
 
 def _get_session_store_dir(session_code: str) -> Optional[Path]:
@@ -27,25 +30,6 @@ def _session_index_path(session_code: str) -> Optional[Path]:
     return store_dir / "index.json"
 
 
-def _load_session_index(session_code: str) -> Dict[str, Any]:
-    """세션별 artifact 인덱스 로드"""
-    p = _session_index_path(session_code)
-    if not p or not p.exists():
-        return {"items": []}
-    try:
-        return json.loads(p.read_text(encoding="utf-8"))
-    except Exception:
-        return {"items": []}
-
-
-def _save_session_index(session_code: str, data: Dict[str, Any]) -> None:
-    """세션별 artifact 인덱스 저장"""
-    p = _session_index_path(session_code)
-    if not p:
-        return
-    p.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
-
-
 def save_session_artifact(*, session_code: str, content: str, team: Optional[str], 
                          label: Optional[str], type_: Optional[str]) -> Optional[Dict[str, Any]]:
     """세션별 artifact 저장"""
@@ -70,20 +54,48 @@ def save_session_artifact(*, session_code: str, content: str, team: Optional[str
         "createdAt": now,
     }
 
-    idx = _load_session_index(session_code)
-    idx_items: List[Dict[str, Any]] = idx.get("items", [])
-    idx_items.append(meta)
-    idx["items"] = idx_items[-1000:]  # keep last 1000
-    _save_session_index(session_code, idx)
+    p = store_dir / "index.json"
+    with index_write_lock(p):
+        index = load_index(p)
+        index.add(meta)
+        evicted = enforce_policy(index, SESSION_POLICY)
+        save_index(p, index)
+    remove_artifact_files(store_dir, evicted)
     return meta
 
 
+def query_session_artifacts(
+    session_code: str,
+    *,
+    type_: Optional[str] = None,
+    team: Optional[str] = None,
+    label_prefix: Optional[str] = None,
+    created_from: Optional[int] = None,
+    created_to: Optional[int] = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+) -> Dict[str, Any]:
+    """세션별 artifact 필터/페이지 조회 (최신순) -> { items, nextCursor }"""
+    p = _session_index_path(session_code)
+    if not p:
+        return {"items": [], "nextCursor": None}
+    with index_lock(p):
+        items, next_cursor = load_index(p).query(
+            type_=type_,
+            team=team,
+            label_prefix=label_prefix,
+            created_from=created_from,
+            created_to=created_to,
+            limit=limit,
+            cursor=cursor,
+        )
+    return {"items": items, "nextCursor": next_cursor}
+
+
 def list_session_artifacts(session_code: str) -> List[Dict[str, Any]]:
     """세션별 artifact 목록 조회"""
-    idx = _load_session_index(session_code)
-    items: List[Dict[str, Any]] = idx.get("items", [])
     # newest first
-    return sorted(items, key=lambda x: x.get("createdAt", 0), reverse=True)
+    return query_session_artifacts(session_code)["items"]
 
 
 def get_session_artifact(session_code: str, artifact_id: str) -> Optional[Dict[str, Any]]:
@@ -92,15 +104,15 @@ def get_session_artifact(session_code: str, artifact_id: str) -> Optional[Dict[s
     if not store_dir:
         return None
     
-    items = list_session_artifacts(session_code)
-    for it in items:
-        if it.get("id") == artifact_id:
-            p = store_dir / it["filename"]
-            content = p.read_text(encoding="utf-8") if p.exists() else ""
-            out = dict(it)
-            out["content"] = content
-            return out
-    return None
+    p = store_dir / "index.json"
+    with index_lock(p):
+        it = load_index(p).get(artifact_id)
+        if it is None:
+            return None
+        out = dict(it)
+    f = store_dir / out["filename"]
+    out["content"] = f.read_text(encoding="utf-8") if f.exists() else ""
+    return out
 
 
 def delete_session_artifact(session_code: str, artifact_id: str) -> bool:
@@ -109,62 +121,79 @@ def delete_session_artifact(session_code: str, artifact_id: str) -> bool:
     if not store_dir:
         return False
     
-    idx = _load_session_index(session_code)
-    items: List[Dict[str, Any]] = idx.get("items", [])
-    kept: List[Dict[str, Any]] = []
-    deleted = False
-    
-    for it in items:
-        if it.get("id") == artifact_id:
-            p = store_dir / it.get("filename", "")
-            try:
-                if p.exists():
-                    p.unlink()
-            except Exception:
-                pass
-            deleted = True
-            continue
-        kept.append(it)
-    
-    if deleted:
-        idx["items"] = kept
-        _save_session_index(session_code, idx)
+    p = store_dir / "index.json"
+    with index_write_lock(p):
+        index = load_index(p)
+        it = index.remove(artifact_id)
+        if it is None:
+            return False
+        save_index(p, index)
     
-    return deleted
+    f = store_dir / it.get("filename", "")
+    try:
+        if f.exists():
+            f.unlink()
+    except Exception:
+        pass
+    return True
 
 
 def save_culture_map_data(session_code: str, *, notes: List[Dict], connections: List[Dict], 
                          layer_state: Dict) -> Optional[Dict[str, Any]]:
-    """컬처맵 데이터를 세션별로 저장"""
-    culture_map_data = {
+    """컬처맵 데이터를 세션별 버전 저장소에 저장"""
+    return culture_map_store.save_snapshot(session_code, {
         "notes": notes,
         "connections": connections,
         "layerState": layer_state,
-        "timestamp": int(time.time())
-    }
-    
-    content = json.dumps(culture_map_data, ensure_ascii=False, indent=2)
-    return save_session_artifact(
-        session_code=session_code,
-        content=content,
-        team=None,
-        label="Culture Map Data",
-        type_="culture_map"
-    )
+    })
 
 
-def get_latest_culture_map_data(session_code: str) -> Optional[Dict[str, Any]]:
-    """세션의 최신 컬처맵 데이터 조회"""
-    artifacts = list_session_artifacts(session_code)
-    
-    # culture_map 타입의 가장 최신 artifact 찾기
+def _get_legacy_culture_map_data(session_code: str) -> Optional[Dict[str, Any]]:
+    """버전 저장소 도입 이전에 artifact로 저장된 컬처맵 조회 (최신부터, 깨진 artifact는 건너뜀)"""
+    artifacts = query_session_artifacts(session_code, type_="culture_map")["items"]
     for artifact in artifacts:
-        if artifact.get("type") == "culture_map":
-            full_artifact = get_session_artifact(session_code, artifact["id"])
-            if full_artifact and full_artifact.get("content"):
-                try:
-                    return json.loads(full_artifact["content"])
-                except Exception:
-                    continue
+        full_artifact = get_session_artifact(session_code, artifact["id"])
+        if full_artifact and full_artifact.get("content"):
+            try:
+                return json.loads(full_artifact["content"])
+            except Exception:
+                continue
     
-    return None
\ No newline at end of file
+    return None
+
+
+def _legacy_snapshot(legacy: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "notes": legacy.get("notes") or [],
+        "connections": legacy.get("connections") or [],
+        "layerState": legacy.get("layerState"),
+    }
+
+
+def get_latest_culture_map_data(session_code: str) -> Optional[Dict[str, Any]]:
+    """세션의 최신 컬처맵 데이터 조회 (읽기만 한다)
+
+    이전 형식 데이터는 version 0으로 돌려주고, 버전 저장소로 옮기는 것은
+    그 위에 첫 변경분을 저장할 때(apply_culture_map_delta) 한다.
+    """
+    data = culture_map_store.get_latest(session_code)
+    if data is not None:
+        return data
+    legacy = _get_legacy_culture_map_data(session_code)
+    if legacy is None:
+        return None
+    data = _legacy_snapshot(legacy)
+    data["timestamp"] = legacy.get("timestamp")
+    data["version"] = 0
+    return data
+
+
+def apply_culture_map_delta(session_code: str, base_version: int, ops: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """컬처맵 변경분 저장. version 0(이전 형식 데이터) 기준 변경분이면 그 데이터를 먼저 버전 1로 옮긴다."""
+    if base_version == 0 and culture_map_store.get_latest_version(session_code) == 0:
+        legacy = _get_legacy_culture_map_data(session_code)
+        if legacy is not None:
+            # 그 사이 다른 요청이 먼저 저장했다면 CultureMapConflict
+            culture_map_store.save_snapshot(session_code, _legacy_snapshot(legacy), expected_version=0)
+            base_version = 1
+    return culture_map_store.apply_delta(session_code, base_version, ops)
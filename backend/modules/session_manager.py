@@ -1,6 +1,5 @@
 from __future__ import annotations
 
-import json
 import time
 import uuid
 import random
@@ -9,6 +8,8 @@ import os
 from pathlib import Path
 from typing import Dict, Any, List, Optional
 
+from . import jsonio
+
 # Windows file locking
 try:
     import msvcrt
@@ -23,9 +24,22 @@ except ImportError:
 
 
 BASE_DIR = Path(__file__).resolve().parent.parent  # backend/
-SESSIONS_DIR = BASE_DIR.parent / "uploads" / "sessions"  # project/uploads/sessions
+UPLOADS_DIR = Path(os.getenv("DONGAM_UPLOADS_DIR") or (BASE_DIR.parent / "uploads"))  # project/uploads
+SESSIONS_DIR = UPLOADS_DIR / "sessions"  # project/uploads/sessions
 SESSIONS_DIR.mkdir(parents=True, exist_ok=True)
 
+# 접근 시간은 이 간격(초)보다 오래되었을 때만 다시 기록한다 (조회마다 파일을 다시 쓰지 않도록)
+try:
+    ACCESS_TIME_RESOLUTION = max(0, int(os.getenv("SESSION_ACCESS_TIME_RESOLUTION", "60")))
+except Exception:
+    ACCESS_TIME_RESOLUTION = 60
+
+
+def access_time_stale(session_data: Dict[str, Any], now: Optional[int] = None) -> bool:
+    """lastAccessedAt을 다시 기록할 때가 되었는지"""
+    now = int(time.time()) if now is None else now
+    return now - int(session_data.get("lastAccessedAt") or 0) >= ACCESS_TIME_RESOLUTION
+
 
 def _sessions_index_path() -> Path:
     return SESSIONS_DIR / "sessions_index.json"
@@ -36,14 +50,14 @@ def _load_sessions_index() -> Dict[str, Any]:
     if not p.exists():
         return {"sessions": []}
     try:
-        return json.loads(p.read_text(encoding="utf-8"))
+        return jsonio.loads(p.read_bytes())
     except Exception:
         return {"sessions": []}
 
 
 def _save_sessions_index(data: Dict[str, Any]) -> None:
     p = _sessions_index_path()
-    p.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
+    p.write_text(jsonio.dumps_text(data), encoding="utf-8")
 
 
 def generate_session_code() -> str:
@@ -78,7 +92,7 @@ def create_session(*, name: str, description: Optional[str] = None) -> Dict[str,
     # 세션 메타데이터 저장
     session_meta_path = session_dir / "session_meta.json"
     session_meta_path.write_text(
-        json.dumps(session_data, ensure_ascii=False, indent=2), 
+        jsonio.dumps_text(session_data), 
         encoding="utf-8"
     )
     
@@ -141,13 +155,13 @@ def get_session(session_code: str, update_access_time: bool = True) -> Optional[
         if not content.strip():
             return None
         
-        session_data = json.loads(content)
+        session_data = jsonio.loads(content)
         
-        if update_time:
+        if update_time and access_time_stale(session_data):
             session_data["lastAccessedAt"] = int(time.time())
             f.seek(0)
             f.truncate()
-            json.dump(session_data, f, ensure_ascii=False, indent=2)
+            f.write(jsonio.dumps_text(session_data))
             f.flush()
             os.fsync(f.fileno())
         
@@ -253,13 +267,13 @@ def increment_participant_count(session_code: str) -> None:
         if not content.strip():
             return None
         
-        session_data = json.loads(content)
+        session_data = jsonio.loads(content)
         session_data["participantCount"] = session_data.get("participantCount", 0) + 1
         session_data["lastAccessedAt"] = int(time.time())
         
         f.seek(0)
         f.truncate()
-        json.dump(session_data, f, ensure_ascii=False, indent=2)
+        f.write(jsonio.dumps_text(session_data))
         f.flush()
         os.fsync(f.fileno())
         
@@ -297,14 +311,14 @@ def decrement_participant_count(session_code: str) -> None:
         if not content.strip():
             return None
         
-        session_data = json.loads(content)
+        session_data = jsonio.loads(content)
         current_count = session_data.get("participantCount", 0)
         session_data["participantCount"] = max(0, current_count - 1)  # 0 미만으로 가지 않도록
         session_data["lastAccessedAt"] = int(time.time())
         
         f.seek(0)
         f.truncate()
-        json.dump(session_data, f, ensure_ascii=False, indent=2)
+        f.write(jsonio.dumps_text(session_data))
         f.flush()
         os.fsync(f.fileno())
         
@@ -0,0 +1,192 @@
+"""
+uvicorn --workers N 로 띄운 여러 워커 프로세스가 함께 보는 상태 저장소 (SQLite, WAL).
+
+프로세스 전역 dict에 두면 워커마다 따로 갖게 되는 값만 여기에 둔다.
+- gw_* 게이트웨이 토큰과 만료 시각
+- /api/generate-prompt 응답 바이트 (워커 로컬 LRU 뒤의 2차 캐시)
+
+연결은 스레드마다 하나씩 열고(io 실행기 스레드 포함), 잠금 경합은 busy_timeout으로 기다린다.
+"""
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+BASE_DIR = Path(__file__).resolve().parent.parent  # backend/
+UPLOADS_DIR = Path(os.getenv("DONGAM_UPLOADS_DIR") or (BASE_DIR.parent / "uploads"))
+SHARED_STATE_PATH = Path(os.getenv("SHARED_STATE_PATH") or (UPLOADS_DIR / ".shared_state.sqlite3"))
+
+try:
+    _BUSY_TIMEOUT_MS = max(100, int(os.getenv("SHARED_STATE_BUSY_TIMEOUT_MS", "5000")))
+except Exception:
+    _BUSY_TIMEOUT_MS = 5000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS gw_tokens (
+    token TEXT PRIMARY KEY,
+    expires_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS gw_tokens_expires ON gw_tokens (expires_at);
+CREATE TABLE IF NOT EXISTS blob_cache (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    body BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    last_used REAL NOT NULL,
+    PRIMARY KEY (namespace, key)
+);
+CREATE INDEX IF NOT EXISTS blob_cache_lru ON blob_cache (namespace, last_used);
+"""
+
+_local = threading.local()
+_init_lock = threading.Lock()
+_initialized: set[str] = set()
+
+
+def _connect(path: Path = SHARED_STATE_PATH) -> sqlite3.Connection:
+    conns: Dict[str, sqlite3.Connection] = getattr(_local, "conns", None) or {}
+    _local.conns = conns
+    conn = conns.get(str(path))
+    if conn is not None:
+        return conn
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(path), timeout=_BUSY_TIMEOUT_MS / 1000)
+    conn.execute(f"PRAGMA busy_timeout = {_BUSY_TIMEOUT_MS}")
+    with _init_lock:
+        if str(path) not in _initialized:
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.executescript(_SCHEMA)
+            _initialized.add(str(path))
+    # WAL에서는 NORMAL로도 커밋 순서가 보장된다 (전원 장애 시 마지막 커밋만 잃을 수 있음)
+    conn.execute("PRAGMA synchronous = NORMAL")
+    conns[str(path)] = conn
+    return conn
+
+
+# ---------- gw_* tokens ----------
+
+def issue_token(token: str, expires_at: float, max_tokens: int = 0, path: Path = SHARED_STATE_PATH) -> None:
+    """토큰을 등록하고 만료된 토큰을 지운다. max_tokens를 넘으면 가장 먼저 만료될 토큰부터 지운다."""
+    conn = _connect(path)
+    with conn:
+        conn.execute("DELETE FROM gw_tokens WHERE expires_at <= ?", (time.time(),))
+        conn.execute("INSERT OR REPLACE INTO gw_tokens (token, expires_at) VALUES (?, ?)", (token, expires_at))
+        if max_tokens > 0:
+            conn.execute(
+                "DELETE FROM gw_tokens WHERE token IN (SELECT token FROM gw_tokens ORDER BY expires_at"
+                " LIMIT max(0, (SELECT COUNT(*) FROM gw_tokens) - ?))",
+                (max_tokens,),
+            )
+
+
+def token_expiry(token: str, path: Path = SHARED_STATE_PATH) -> Optional[float]:
+    row = _connect(path).execute("SELECT expires_at FROM gw_tokens WHERE token = ?", (token,)).fetchone()
+    return row[0] if row else None
+
+
+def revoke_token(token: str, path: Path = SHARED_STATE_PATH) -> bool:
+    conn = _connect(path)
+    with conn:
+        return conn.execute("DELETE FROM gw_tokens WHERE token = ?", (token,)).rowcount > 0
+
+
+# ---------- shared blob cache ----------
+
+class SharedBlobCache:
+    """워커 간에 공유되는 바이트 캐시 (namespace별 전체 바이트 수 기준 LRU).
+
+    조회 때마다 last_used를 쓰면 읽기도 쓰기 잠금을 잡게 되므로 touch_interval보다
+    오래된 항목만 갱신한다. SQLite 오류는 캐시 미스로 취급한다.
+    """
+
+    def __init__(self, namespace: str, max_bytes: int, path: Path = SHARED_STATE_PATH, touch_interval: float = 60.0):
+        self.namespace = namespace
+        self.max_bytes = max_bytes
+        self.path = path
+        self.touch_interval = touch_interval
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    def _count(self, attr: str) -> None:
+        with self._lock:
+            setattr(self, attr, getattr(self, attr) + 1)
+
+    def get(self, key: str) -> Optional[bytes]:
+        try:
+            conn = _connect(self.path)
+            row = conn.execute(
+                "SELECT body, last_used FROM blob_cache WHERE namespace = ? AND key = ?", (self.namespace, key)
+            ).fetchone()
+            if row is None:
+                self._count("misses")
+                return None
+            now = time.time()
+            if now - row[1] > self.touch_interval:
+                with conn:
+                    conn.execute(
+                        "UPDATE blob_cache SET last_used = ? WHERE namespace = ? AND key = ?",
+                        (now, self.namespace, key),
+                    )
+            self._count("hits")
+            return bytes(row[0])
+        except sqlite3.Error as e:
+            print(f"[WARNING] shared cache read failed ({self.namespace}): {e}")
+            self._count("errors")
+            return None
+
+    def put(self, key: str, value: bytes) -> None:
+        if len(value) > self.max_bytes:
+            return
+        try:
+            conn = _connect(self.path)
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO blob_cache (namespace, key, body, size, last_used) VALUES (?, ?, ?, ?, ?)",
+                    (self.namespace, key, sqlite3.Binary(value), len(value), time.time()),
+                )
+                total = conn.execute(
+                    "SELECT COALESCE(SUM(size), 0) FROM blob_cache WHERE namespace = ?", (self.namespace,)
+                ).fetchone()[0]
+                while total > self.max_bytes:
+                    victims = conn.execute(
+                        "SELECT key, size FROM blob_cache WHERE namespace = ? ORDER BY last_used LIMIT 32",
+                        (self.namespace,),
+                    ).fetchall()
+                    if not victims:
+                        break
+                    for vkey, size in victims:
+                        conn.execute("DELETE FROM blob_cache WHERE namespace = ? AND key = ?", (self.namespace, vkey))
+                        total -= size
+                        if total <= self.max_bytes:
+                            break
+        except sqlite3.Error as e:
+            print(f"[WARNING] shared cache write failed ({self.namespace}): {e}")
+            self._count("errors")
+
+    def clear(self) -> None:
+        conn = _connect(self.path)
+        with conn:
+            conn.execute("DELETE FROM blob_cache WHERE namespace = ?", (self.namespace,))
+
+    def stats(self) -> Dict[str, Any]:
+        try:
+            entries, size = _connect(self.path).execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM blob_cache WHERE namespace = ?", (self.namespace,)
+            ).fetchone()
+        except sqlite3.Error:
+            entries, size = None, None
+        with self._lock:
+            return {
+                "entries": entries,
+                "bytes": size,
+                "maxBytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "errors": self.errors,
+            }
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+from collections import deque
+from typing import Dict, Any, List, Optional, Tuple
+
+from .prompt_generator import _normalize_element_id
+
+
+# 카탈로그 구간 -> 노드 종류 (행동 → 유형 → 무형 순으로 connected_elements가 이어진다)
+_SECTIONS = (("behaviors", "behavior"), ("tangible_elements", "tangible"), ("intangible_elements", "intangible"))
+
+
+class SpiritGraph:
+    """한 spirit의 요소 연결 그래프 (element_id 정규화, 인접 목록 + 역방향 목록).
+
+    카탈로그 버전마다 새로 만들어지므로 도달 범위 계산 결과는 인스턴스에 그대로 보관한다.
+    """
+
+    def __init__(self, spirit: Dict[str, Any]):
+        self.spirit_id = spirit.get("id")
+        self.nodes: Dict[str, Dict[str, Any]] = {}
+        self.out_edges: Dict[str, List[str]] = {}
+        self.in_edges: Dict[str, List[str]] = {}
+        self._closures: Dict[Tuple[str, str], Tuple[Tuple[str, int], ...]] = {}
+
+        for section, kind in _SECTIONS:
+            for element in spirit.get(section) or []:
+                eid = _normalize_element_id(element.get("id", ""))
+                if not eid or eid in self.nodes:
+                    continue
+                self.nodes[eid] = {"id": eid, "name": element.get("name", ""), "kind": kind}
+                self.out_edges.setdefault(eid, [])
+                self.in_edges.setdefault(eid, [])
+        for section, _ in _SECTIONS:
+            for element in spirit.get(section) or []:
+                src = _normalize_element_id(element.get("id", ""))
+                if src not in self.nodes:
+                    continue
+                for target in element.get("connected_elements") or []:
+                    dst = _normalize_element_id(target)
+                    # 자기 자신을 가리키는 연결(행동1 → 행동1 등)과 중복은 건너뛴다
+                    if not isinstance(dst, str) or not dst or dst == src or dst in self.out_edges[src]:
+                        continue
+                    if dst not in self.nodes:
+                        self.nodes[dst] = {"id": dst, "name": "", "kind": "unknown"}
+                        self.out_edges[dst] = []
+                        self.in_edges[dst] = []
+                    self.out_edges[src].append(dst)
+                    self.in_edges[dst].append(src)
+
+    def __contains__(self, eid: str) -> bool:
+        return eid in self.nodes
+
+    def neighbors(self, eid: str) -> Dict[str, List[str]]:
+        return {"downstream": list(self.out_edges.get(eid, [])), "upstream": list(self.in_edges.get(eid, []))}
+
+    def _closure(self, eid: str, direction: str) -> Tuple[Tuple[str, int], ...]:
+        key = (eid, direction)
+        cached = self._closures.get(key)
+        if cached is not None:
+            return cached
+        edges = self.out_edges if direction == "downstream" else self.in_edges
+        seen = {eid}
+        order: List[Tuple[str, int]] = []
+        queue = deque([(eid, 0)])
+        while queue:
+            node, depth = queue.popleft()
+            for nxt in edges.get(node, []):
+                if nxt in seen:
+                    continue
+                seen.add(nxt)
+                order.append((nxt, depth + 1))
+                queue.append((nxt, depth + 1))
+        result = tuple(order)
+        self._closures[key] = result
+        return result
+
+    def closure(self, eid: str, direction: str) -> List[Dict[str, Any]]:
+        """eid에서 direction(downstream/upstream)으로 도달 가능한 노드 (가까운 순)"""
+        if direction not in ("downstream", "upstream"):
+            raise ValueError("direction must be 'downstream' or 'upstream'")
+        return [{**self.nodes[n], "depth": d} for n, d in self._closure(eid, direction)]
+
+    def behaviors_reaching(self, eid: str) -> List[Dict[str, Any]]:
+        """eid(주로 무형 요소)에 연결 경로가 있는 행동 요소"""
+        return [n for n in self.closure(eid, "upstream") if n["kind"] == "behavior"]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "spiritId": self.spirit_id,
+            "nodes": list(self.nodes.values()),
+            "edges": [[src, dst] for src, targets in self.out_edges.items() for dst in targets],
+        }
+
+
+def resolve_node(graph: SpiritGraph, element_id: str) -> Optional[str]:
+    eid = _normalize_element_id(element_id)
+    return eid if eid in graph else None
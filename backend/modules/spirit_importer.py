@@ -0,0 +1,392 @@
+"""
+Excel (동암정신 7개요소.xlsx) -> dongam_spirit.json 가져오기
+
+- 시트(정신)마다 행동/유형/무형 요소와 연결요소를 읽어 해당 spirit에 덮어쓴다.
+- openpyxl read-only 모드로 행 값만 스트리밍하고, 시트는 작업자 프로세스에서 병렬로 파싱한다.
+- 시트 내용 해시를 기록해 두고 지난 가져오기 이후 바뀌지 않은 시트는 건너뛴다.
+- 병합 결과는 마지막에 한 번만, 원자적으로(임시 파일 → os.replace) 기록한다.
+"""
+from __future__ import annotations
+
+import hashlib
+import io
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+from .fileio import atomic_write_text
+
+
+JSON_PATH = Path(__file__).with_name("dongam_spirit.json")
+# 시트별 내용 해시 (dongam_spirit.json이 다른 경로로 바뀐 경우에는 무시된다)
+STATE_PATH = Path(__file__).with_name(".spirit_import_state.json")
+
+try:
+    IMPORT_WORKERS = max(1, int(os.getenv("SPIRIT_IMPORT_WORKERS", str(min(4, os.cpu_count() or 1)))))
+except Exception:
+    IMPORT_WORKERS = 1
+
+_MAX_HEADER_COLUMNS = 19
+
+# 시트명 → spirit_id 매핑 휴리스틱
+SHEET_SPIRIT_IDS = {
+    '불우재': 'spirit_01',
+    '숭조위선': 'spirit_02',
+    '불굴의 도전정신과 개척정신': 'spirit_03',
+    '미래를 예측하는 통찰': 'spirit_04',
+    '미풍양속의 계승': 'spirit_05',
+    '상생적 공존공영의 인화정신': 'spirit_06',
+    '환경을 중시하는 사회적 책임경영': 'spirit_07',
+}
+
+Rows = List[Tuple[Any, ...]]
+Source = Union[str, Path, bytes]
+
+
+# ---------- Helpers ----------
+
+def normalize_element_id(raw: str) -> str:
+    if not raw:
+        return raw
+    raw = str(raw).strip()
+    # 허용 입력: '유형1', '유형 1', '유형_1' 등 → '유형_1'
+    #            '무형3', '무형-3', '무형_3' 등 → '무형_3'
+    if raw.startswith("유형"):
+        digits = ''.join(ch for ch in raw if ch.isdigit())
+        return f"유형_{digits}" if digits else raw
+    if raw.startswith("무형"):
+        digits = ''.join(ch for ch in raw if ch.isdigit())
+        return f"무형_{digits}" if digits else raw
+    return raw
+
+
+def split_ids(cell: Any) -> List[str]:
+    if cell is None:
+        return []
+    s = str(cell).strip()
+    if not s:
+        return []
+    # 쉼표/공백 구분 혼용 가정
+    parts = [p for p in [x.strip() for x in s.replace(' ', ',').replace('　', ',').split(',')] if p]
+    return [normalize_element_id(p) for p in parts]
+
+
+def _element(eid: str, name: str, conn: List[str]) -> Dict[str, Any]:
+    d: Dict[str, Any] = {"id": eid, "name": name}
+    if conn:
+        d["connected_elements"] = conn
+    return d
+
+
+def _cell(rows: Rows, r: int, c: int) -> Any:
+    """1부터 시작하는 (행, 열) 값. 범위를 벗어나면 None"""
+    if r - 1 >= len(rows):
+        return None
+    row = rows[r - 1]
+    return row[c - 1] if c - 1 < len(row) else None
+
+
+# ---------- Core Parsing ----------
+
+def parse_rows(rows: Rows) -> Dict[str, List[Dict[str, Any]]]:
+    """시트의 행 값(values_only)에서 행동/유형/무형을 추출.
+
+    - 첫 두 컬럼: [유형/행동 구분, 내용]
+    - 오른쪽 컬럼들: 연결요소(헤더가 '연결요소' 또는 '행동'으로 시작)
+    """
+    # 헤더 탐지 (1~10행 탐색)
+    header_row_idx = 1
+    for r in range(1, 11):
+        row_vals = [_cell(rows, r, c) for c in range(1, _MAX_HEADER_COLUMNS + 1)]
+        joined = ''.join([str(x) for x in row_vals if x])
+        if '연결요소' in joined or '행동' in joined:
+            header_row_idx = r
+            break
+    headers = [str(_cell(rows, header_row_idx, c) or '').strip() for c in range(1, _MAX_HEADER_COLUMNS + 1)]
+    conn_cols = [idx for idx, h in enumerate(headers, start=1) if h.startswith('연결요소') or h.startswith('행동')]
+
+    behaviors: List[Dict[str, Any]] = []
+    tangible: List[Dict[str, Any]] = []
+    intangible: List[Dict[str, Any]] = []
+
+    ridx = header_row_idx + 1
+    behavior_counter = id_counter_t = id_counter_i = 0
+    while True:
+        kind = _cell(rows, ridx, 1)
+        name = _cell(rows, ridx, 2)
+        if kind is None and name is None:
+            # 빈 행 연속 3개를 만나면 종료
+            empty = sum(
+                1 for look_ahead in range(ridx, ridx + 3)
+                if all(_cell(rows, look_ahead, cc) in (None, '') for cc in range(1, 6))
+            )
+            if empty >= 3:
+                break
+        kind_s = str(kind or '').strip()
+        name_s = str(name or '').strip()
+        if not kind_s and not name_s:
+            ridx += 1
+            continue
+
+        conn: List[str] = []
+        for cc in conn_cols:
+            conn += split_ids(_cell(rows, ridx, cc))
+        conn = list(dict.fromkeys([x for x in conn if x]))  # uniq
+
+        # 분류 규칙: '행동', '유형', '무형' 키워드로 판단
+        if kind_s.startswith('행동') or kind_s.startswith('결과'):
+            behavior_counter += 1
+            behaviors.append(_element(f"행동{behavior_counter}", name_s or f"행동 {behavior_counter}", conn))
+        elif kind_s.startswith('유형'):
+            id_counter_t += 1
+            eid = normalize_element_id(kind_s)
+            if not eid or eid == '유형_':
+                eid = f'유형_{id_counter_t}'
+            tangible.append(_element(eid, name_s, conn))
+        elif kind_s.startswith('무형'):
+            id_counter_i += 1
+            eid = normalize_element_id(kind_s)
+            if not eid or eid == '무형_':
+                eid = f'무형_{id_counter_i}'
+            intangible.append(_element(eid, name_s, conn))
+        ridx += 1
+
+    return {"behaviors": behaviors, "tangible_elements": tangible, "intangible_elements": intangible}
+
+
+def rows_hash(rows: Rows) -> str:
+    h = hashlib.sha256()
+    for row in rows:
+        h.update(json.dumps(row, ensure_ascii=False, default=str).encode("utf-8"))
+        h.update(b"\n")
+    return h.hexdigest()
+
+
+def _open_workbook(source: Source):
+    from openpyxl import load_workbook  # optional: only needed for imports
+
+    if isinstance(source, (bytes, bytearray)):
+        return load_workbook(io.BytesIO(source), read_only=True, data_only=True)
+    return load_workbook(str(source), read_only=True, data_only=True)
+
+
+def sheet_names(source: Source) -> List[str]:
+    wb = _open_workbook(source)
+    try:
+        return list(wb.sheetnames)
+    finally:
+        wb.close()
+
+
+def _parse_sheets(source: Source, titles: Sequence[str], known_hashes: Dict[str, str]) -> List[Dict[str, Any]]:
+    """작업자 프로세스에서 실행: 시트 몇 개를 스트리밍으로 읽어 해시를 비교하고 바뀐 시트만 파싱"""
+    wb = _open_workbook(source)
+    out: List[Dict[str, Any]] = []
+    try:
+        for title in titles:
+            try:
+                rows: Rows = list(wb[title].iter_rows(values_only=True))
+                digest = rows_hash(rows)
+                if known_hashes.get(title) == digest:
+                    out.append({"title": title, "hash": digest, "skipped": True})
+                    continue
+                out.append({"title": title, "hash": digest, "parsed": parse_rows(rows)})
+            except Exception as e:
+                out.append({"title": title, "error": str(e)})
+    finally:
+        wb.close()
+    return out
+
+
+def match_spirit(data: Dict[str, Any], sheet_name: str) -> Optional[Dict[str, Any]]:
+    target_id = None
+    for k, v in SHEET_SPIRIT_IDS.items():
+        if k in sheet_name:
+            target_id = v
+            break
+    if target_id is None and sheet_name.startswith('spirit_'):
+        # sheet_name이 id로 직접 되어 있으면 그대로 사용
+        target_id = sheet_name
+    spirits = data.get('spirits', [])
+    if target_id is not None:
+        return next((s for s in spirits if s.get('id') == target_id), None)
+    # 매핑에 없으면 정신 이름에 시트명이 포함되는지로 찾는다
+    title = sheet_name.strip()
+    return next((s for s in spirits if s.get('name') and title in s['name']), None)
+
+
+def _merge(spirit: Dict[str, Any], parsed: Dict[str, List[Dict[str, Any]]]) -> None:
+    # 덮어쓰기 기준: 파싱된 구간만 통째로 갱신
+    for key in ("behaviors", "tangible_elements", "intangible_elements"):
+        if parsed.get(key):
+            spirit[key] = parsed[key]
+
+
+def _load_state(json_path: Path, json_text: str) -> Dict[str, str]:
+    try:
+        state = json.loads(STATE_PATH.read_text(encoding="utf-8"))
+    except Exception:
+        return {}
+    # 마지막 가져오기 이후 JSON이 직접 수정됐다면 시트 해시를 믿을 수 없다
+    if state.get("json") != str(json_path) or state.get("jsonHash") != hashlib.sha256(json_text.encode("utf-8")).hexdigest():
+        return {}
+    return dict(state.get("sheets") or {})
+
+
+def _save_state(json_path: Path, json_text: str, sheets: Dict[str, str]) -> None:
+    state = {
+        "json": str(json_path),
+        "jsonHash": hashlib.sha256(json_text.encode("utf-8")).hexdigest(),
+        "sheets": sheets,
+    }
+    try:
+        atomic_write_text(STATE_PATH, json.dumps(state, ensure_ascii=False, indent=2))
+    except Exception as e:
+        print(f"[WARNING] Failed to save spirit import state: {e}")
+
+
+def import_workbook(
+    source: Source,
+    json_path: Path = JSON_PATH,
+    *,
+    write: bool = True,
+    force: bool = False,
+    workers: Optional[int] = None,
+) -> Dict[str, Any]:
+    """엑셀의 모든 시트를 병합한 카탈로그를 만들고 write=True면 json_path에 한 번 기록한다.
+
+    반환: {"updated", "skipped", "unmatched", "failed", "written", "data"}
+    """
+    json_path = Path(json_path).resolve()
+    json_text = json_path.read_text(encoding="utf-8")
+    data = json.loads(json_text)
+    known = {} if force else _load_state(json_path, json_text)
+
+    titles = sheet_names(source)
+    workers = max(1, min(workers or IMPORT_WORKERS, len(titles) or 1))
+    chunks = [titles[i::workers] for i in range(workers)]
+    if workers == 1:
+        results = _parse_sheets(source, titles, known)
+    else:
+        # 워크북은 프로세스 간에 넘길 수 없으므로 각 작업자가 직접 열고 자기 몫의 시트만 읽는다
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_parse_sheets, source, chunk, known) for chunk in chunks]
+            results = [r for fut in futures for r in fut.result()]
+    order = {t: i for i, t in enumerate(titles)}
+    results.sort(key=lambda r: order[r["title"]])
+
+    report: Dict[str, Any] = {"updated": [], "skipped": [], "unmatched": [], "failed": {}}
+    hashes: Dict[str, str] = {}
+    for r in results:
+        title = r["title"]
+        if "error" in r:
+            report["failed"][title] = r["error"]
+            continue
+        if r.get("skipped"):
+            report["skipped"].append(title)
+            hashes[title] = r["hash"]
+            continue
+        spirit = match_spirit(data, title)
+        if spirit is None:
+            report["unmatched"].append(title)
+            continue
+        _merge(spirit, r["parsed"])
+        report["updated"].append(title)
+        hashes[title] = r["hash"]
+
+    report["hashes"] = hashes
+    report["data"] = data
+    report["written"] = write_catalog(data, hashes, json_path) if write else False
+    return report
+
+
+def write_catalog(data: Dict[str, Any], hashes: Dict[str, str], json_path: Path = JSON_PATH) -> bool:
+    """병합된 카탈로그를 원자적으로 기록하고 시트 해시를 저장. 내용이 같으면 파일은 건드리지 않는다."""
+    json_path = Path(json_path).resolve()
+    out_text = json.dumps(data, ensure_ascii=False, indent=2)
+    try:
+        current = json_path.read_text(encoding="utf-8")
+    except FileNotFoundError:
+        current = None
+    written = out_text != current
+    if written:
+        atomic_write_text(json_path, out_text)
+    _save_state(json_path, out_text, hashes)
+    return written
+
+
+# ---------- 검증 / 비교 ----------
+
+_SECTIONS = ("behaviors", "tangible_elements", "intangible_elements")
+
+
+def validate_catalog(data: Dict[str, Any]) -> Tuple[List[str], List[str]]:
+    """(errors, warnings). errors가 있으면 카탈로그로 쓸 수 없다."""
+    errors: List[str] = []
+    warnings: List[str] = []
+    spirits = data.get("spirits") if isinstance(data, dict) else None
+    if not isinstance(spirits, list) or not spirits:
+        return ["catalog has no spirits"], warnings
+    seen_spirits = set()
+    for i, spirit in enumerate(spirits):
+        sid = spirit.get("id") if isinstance(spirit, dict) else None
+        if not sid:
+            errors.append(f"spirits[{i}] has no id")
+            continue
+        if sid in seen_spirits:
+            errors.append(f"duplicate spirit id {sid}")
+        seen_spirits.add(sid)
+        if not spirit.get("name"):
+            errors.append(f"{sid}: name is empty")
+        ids = set()
+        for section in _SECTIONS:
+            for j, element in enumerate(spirit.get(section) or []):
+                eid = element.get("id") if isinstance(element, dict) else None
+                if not eid:
+                    errors.append(f"{sid}.{section}[{j}] has no id")
+                    continue
+                if eid in ids:
+                    errors.append(f"{sid}: duplicate element id {eid}")
+                ids.add(eid)
+                if not str(element.get("name") or "").strip():
+                    warnings.append(f"{sid}: {eid} has an empty name")
+        if not spirit.get("tangible_elements") and not spirit.get("intangible_elements"):
+            warnings.append(f"{sid}: no tangible/intangible elements")
+        for section in _SECTIONS:
+            for element in spirit.get(section) or []:
+                for target in (element.get("connected_elements") or []) if isinstance(element, dict) else []:
+                    if target not in ids:
+                        warnings.append(f"{sid}: {element.get('id')} connects to unknown element {target}")
+    return errors, warnings
+
+
+def diff_catalogs(old: Dict[str, Any], new: Dict[str, Any]) -> Dict[str, Any]:
+    """spirit/요소 단위 변경 요약"""
+    old_spirits = {s.get("id"): s for s in old.get("spirits", [])}
+    new_spirits = {s.get("id"): s for s in new.get("spirits", [])}
+    changed: Dict[str, Any] = {}
+    for sid in new_spirits.keys() & old_spirits.keys():
+        a, b = old_spirits[sid], new_spirits[sid]
+        entry: Dict[str, Any] = {}
+        for field in ("name", "description"):
+            if a.get(field) != b.get(field):
+                entry.setdefault("fields", []).append(field)
+        for section in _SECTIONS:
+            before = {e.get("id"): e for e in a.get(section) or []}
+            after = {e.get("id"): e for e in b.get(section) or []}
+            section_diff = {
+                "added": [k for k in after if k not in before],
+                "removed": [k for k in before if k not in after],
+                "changed": [k for k in after if k in before and after[k] != before[k]],
+            }
+            if any(section_diff.values()):
+                entry[section] = section_diff
+        if entry:
+            changed[sid] = entry
+    return {
+        "addedSpirits": [k for k in new_spirits if k not in old_spirits],
+        "removedSpirits": [k for k in old_spirits if k not in new_spirits],
+        "changedSpirits": changed,
+    }
@@ -0,0 +1,119 @@
+"""
+저장소 계층의 async API.
+
+각 함수는 같은 이름의 동기 함수를 읽기/쓰기 전용 실행기(io_executors)에서 실행한다.
+파일 잠금 대기·백오프·fsync가 있는 쓰기는 WRITE, 나머지 조회는 READ 실행기를 쓴다.
+"""
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+from . import artifact_store, culture_map_store, realtime_sync, result_store, session_artifact_store, session_manager
+from .io_executors import ExecutorSaturated, run_read, run_write
+
+# 세션별 만료 잠금 확인 간격(초). 잠금 만료는 5분 단위라 몇 초 늦게 치워도 된다.
+try:
+    LOCK_CLEANUP_INTERVAL = max(0.0, float(os.getenv("LOCK_CLEANUP_INTERVAL", "10")))
+except Exception:
+    LOCK_CLEANUP_INTERVAL = 10.0
+_LOCK_CLEANUP_TRACKED = 4096
+
+
+def _reader(fn: Callable[..., Any]) -> Callable[..., Any]:
+    async def wrapper(*args: Any, **kwargs: Any) -> Any:
+        return await run_read(fn, *args, **kwargs)
+    wrapper.__name__ = fn.__name__
+    wrapper.__doc__ = fn.__doc__
+    return wrapper
+
+
+def _writer(fn: Callable[..., Any]) -> Callable[..., Any]:
+    async def wrapper(*args: Any, **kwargs: Any) -> Any:
+        return await run_write(fn, *args, **kwargs)
+    wrapper.__name__ = fn.__name__
+    wrapper.__doc__ = fn.__doc__
+    return wrapper
+
+
+# ---------- workshop artifacts ----------
+save_artifact = _writer(artifact_store.save_artifact)
+delete_artifact = _writer(artifact_store.delete_artifact)
+query_artifacts = _reader(artifact_store.query_artifacts)
+get_artifact = _reader(artifact_store.get_artifact)
+
+# ---------- sessions ----------
+create_session = _writer(session_manager.create_session)
+delete_session = _writer(session_manager.delete_session)
+increment_participant_count = _writer(session_manager.increment_participant_count)
+decrement_participant_count = _writer(session_manager.decrement_participant_count)
+list_sessions = _reader(session_manager.list_sessions)
+
+
+async def get_session(session_code: str, update_access_time: bool = True) -> Optional[Dict[str, Any]]:
+    """세션 조회는 읽기 실행기에서 한다.
+
+    접근 시간이 ACCESS_TIME_RESOLUTION보다 오래된 경우에만 쓰기 실행기로 다시 기록하고,
+    쓰기 대기열이 가득 차 있으면 기록을 건너뛴다 (접근 시간 때문에 조회가 실패하지 않도록).
+    """
+    session = await run_read(session_manager.get_session, session_code, update_access_time=False)
+    if session is None or not update_access_time or not session_manager.access_time_stale(session):
+        return session
+    try:
+        return await run_write(session_manager.get_session, session_code, update_access_time=True) or session
+    except ExecutorSaturated:
+        return session
+
+
+# ---------- session artifacts / culture map ----------
+save_session_artifact = _writer(session_artifact_store.save_session_artifact)
+delete_session_artifact = _writer(session_artifact_store.delete_session_artifact)
+query_session_artifacts = _reader(session_artifact_store.query_session_artifacts)
+list_session_artifacts = _reader(session_artifact_store.list_session_artifacts)
+get_session_artifact = _reader(session_artifact_store.get_session_artifact)
+save_culture_map_data = _writer(session_artifact_store.save_culture_map_data)
+get_latest_culture_map_data = _reader(session_artifact_store.get_latest_culture_map_data)
+apply_culture_map_delta = _writer(session_artifact_store.apply_culture_map_delta)
+list_culture_map_versions = _reader(culture_map_store.list_versions)
+get_culture_map_version = _reader(culture_map_store.get_version)
+culture_map_version_at = _reader(culture_map_store.version_at)
+diff_culture_map_versions = _reader(culture_map_store.diff_versions)
+
+# ---------- realtime field sync ----------
+lock_field = _writer(realtime_sync.lock_field)
+unlock_field = _writer(realtime_sync.unlock_field)
+update_field_value = _writer(realtime_sync.update_field_value)
+cleanup_all_stale_locks = _writer(realtime_sync.cleanup_all_stale_locks)
+get_field_updates = _reader(realtime_sync.get_field_updates)
+
+# session_code -> 마지막 확인 시각 (monotonic). 최근 세션만 LRU로 기억한다.
+_LAST_LOCK_CLEANUP: "OrderedDict[str, float]" = OrderedDict()
+_LOCK_CLEANUP_GUARD = threading.Lock()
+
+
+async def cleanup_expired_locks(session_code: str) -> None:
+    """만료 잠금 정리. 세션마다 LOCK_CLEANUP_INTERVAL에 한 번만 읽기로 확인하고,
+    치울 잠금이 있을 때만 쓰기 실행기를 쓴다 (폴링마다 쓰기 대기열에 들어가지 않도록)."""
+    now = time.monotonic()
+    with _LOCK_CLEANUP_GUARD:
+        last = _LAST_LOCK_CLEANUP.get(session_code)
+        if last is not None and now - last < LOCK_CLEANUP_INTERVAL:
+            return
+        _LAST_LOCK_CLEANUP[session_code] = now
+        _LAST_LOCK_CLEANUP.move_to_end(session_code)
+        while len(_LAST_LOCK_CLEANUP) > _LOCK_CLEANUP_TRACKED:
+            _LAST_LOCK_CLEANUP.popitem(last=False)
+    if await run_read(realtime_sync.has_expired_locks, session_code):
+        try:
+            await run_write(realtime_sync.cleanup_expired_locks, session_code)
+        except ExecutorSaturated:
+            # 폴링 응답은 막지 않고 다음 폴링에서 다시 시도한다
+            with _LOCK_CLEANUP_GUARD:
+                _LAST_LOCK_CLEANUP.pop(session_code, None)
+
+# ---------- results ----------
+ingest_result = _writer(result_store.ingest_result)
+result_store_stats = _reader(result_store.store_stats)
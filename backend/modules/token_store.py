@@ -0,0 +1,141 @@
+"""
+만료 시각이 있는 게이트웨이(gw_*) 토큰 저장소
+
+- 메모리: token -> 만료 시각 dict(LRU 순서) + 만료 시각 min-heap.
+  조회/발급 때마다 heap 앞쪽의 만료된 토큰을 조금씩 치우고(분할 상환),
+  개수가 상한을 넘으면 가장 오래 쓰이지 않은 토큰부터 메모리에서 내보낸다.
+- 영속: shared_state(gw_tokens 테이블)에 바로 기록하므로 재시작 후에도,
+  다른 워커에서 발급한 토큰도 메모리에 없으면 SQLite에서 한 번 읽어 온다.
+
+조회는 dict 한 번(메모리 적중) 또는 기본 키 조회 한 번(미적중)이며,
+만료된 토큰은 거부한다. 파일 I/O가 있을 수 있으므로 라우트에서는 run_read/run_write로 호출한다.
+"""
+from __future__ import annotations
+
+import heapq
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from . import shared_state
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return max(1, int(os.getenv(name, str(default))))
+    except Exception:
+        return default
+
+
+GW_TOKEN_TTL_SECONDS = _env_int("GW_TOKEN_TTL_SECONDS", 24 * 3600)
+GW_TOKEN_MAX = _env_int("GW_TOKEN_MAX", 10000)
+# 조회 한 번에 치우는 만료 토큰 수 상한 (한 요청이 정리 비용을 몰아서 내지 않도록)
+_EVICT_BUDGET = 32
+
+
+class ExpiringTokenStore:
+    """만료 min-heap + dict + LRU 상한으로 메모리를 제한하는 토큰 저장소"""
+
+    def __init__(self, max_tokens: int = GW_TOKEN_MAX, path: Optional[Path] = None, persist: bool = True):
+        self.max_tokens = max_tokens
+        self.path = path or shared_state.SHARED_STATE_PATH
+        self.persist = persist
+        self._tokens: "OrderedDict[str, float]" = OrderedDict()
+        self._heap: List[Tuple[float, str]] = []
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.loads = 0
+        self.rejected = 0
+        self.expired = 0
+        self.evicted = 0
+
+    # ----- 메모리 -----
+
+    def _remember(self, token: str, expires_at: float) -> None:
+        self._tokens[token] = expires_at
+        self._tokens.move_to_end(token)
+        heapq.heappush(self._heap, (expires_at, token))
+        while len(self._tokens) > self.max_tokens:
+            self._tokens.popitem(last=False)
+            self.evicted += 1
+        # 교체/삭제/LRU로 남은 heap 항목이 실제 토큰 수보다 너무 많아지면 다시 만든다
+        if len(self._heap) > 2 * len(self._tokens) + 64:
+            self._heap = [(exp, tok) for tok, exp in self._tokens.items()]
+            heapq.heapify(self._heap)
+
+    def _evict_expired(self, now: float, budget: int = _EVICT_BUDGET) -> None:
+        heap = self._heap
+        while heap and heap[0][0] <= now and budget > 0:
+            exp, token = heapq.heappop(heap)
+            budget -= 1
+            # 같은 토큰이 다른 만료 시각으로 다시 들어온 경우는 heap 항목만 버린다
+            if self._tokens.get(token) == exp:
+                del self._tokens[token]
+                self.expired += 1
+
+    # ----- 공개 API -----
+
+    def issue(self, token: str, expires_at: Optional[float] = None) -> float:
+        """토큰을 등록하고 만료 시각을 돌려준다"""
+        now = time.time()
+        expires_at = now + GW_TOKEN_TTL_SECONDS if expires_at is None else expires_at
+        if self.persist:
+            shared_state.issue_token(token, expires_at, self.max_tokens, path=self.path)
+        with self._lock:
+            self._evict_expired(now)
+            self._remember(token, expires_at)
+        return expires_at
+
+    def expiry(self, token: str) -> Optional[float]:
+        """유효한 토큰의 만료 시각. 모르는 토큰이나 만료된 토큰은 None."""
+        now = time.time()
+        with self._lock:
+            self._evict_expired(now)
+            exp = self._tokens.get(token)
+            if exp is not None:
+                if exp > now:
+                    self._tokens.move_to_end(token)
+                    self.hits += 1
+                    return exp
+                del self._tokens[token]
+                self.expired += 1
+        if self.persist:
+            # 재시작 전이나 다른 워커에서 발급된 토큰
+            exp = shared_state.token_expiry(token, path=self.path)
+            if exp is not None and exp > now:
+                with self._lock:
+                    self.loads += 1
+                    self._remember(token, exp)
+                return exp
+        with self._lock:
+            self.rejected += 1
+        return None
+
+    def is_valid(self, token: str) -> bool:
+        return self.expiry(token) is not None
+
+    def revoke(self, token: str) -> bool:
+        with self._lock:
+            found = self._tokens.pop(token, None) is not None
+        if self.persist:
+            found = shared_state.revoke_token(token, path=self.path) or found
+        return found
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "tokens": len(self._tokens),
+                "heap": len(self._heap),
+                "maxTokens": self.max_tokens,
+                "hits": self.hits,
+                "loads": self.loads,
+                "rejected": self.rejected,
+                "expired": self.expired,
+                "evicted": self.evicted,
+            }
+
+
+gateway_tokens = ExpiringTokenStore()
@@ -0,0 +1,502 @@
+"""
+워크숍 규모 부하 테스트 하네스
+
+임시 uploads/ 디렉터리(DONGAM_UPLOADS_DIR)를 만들어 앱을 띄우고, 세션 × 참가자 트래픽을 흉내 낸다.
+  * 진행자(세션당 1명): 세션 생성, 컬처맵 자동 저장(POST /api/culture-map)
+  * 참가자: 세션 참가 → useRealtimeSync와 같은 주기의 폴링
+    (변경이 있으면 500ms, 없으면 500ms씩 늘려 최대 5s, 지터 0~200ms)
+    + 필드 잠금 → 200ms 디바운스 간격의 키 입력 업데이트 → 잠금 해제
+    + 가끔 프롬프트 생성 후 세션 artifact 저장
+  * 엔드포인트별 처리량, p50/p95/p99, 오류율과 디스크 쓰기 횟수(/proc/<pid>/io, Linux)를 보고한다.
+
+실행 모드
+  * 기본: 같은 프로세스에서 ASGI로 직접 호출 (네트워크를 뺀 앱 자체 지연)
+  * --workers N: 임시 uploads/로 uvicorn을 N 워커로 띄워 HTTP로 호출
+  * --url: 이미 떠 있는 서버에 호출 (임시 uploads/와 디스크 집계는 적용되지 않음)
+
+--sessions/--participants에 쉼표로 여러 값을 주면 조합마다 새 uploads/로 실행하고 요약표를 출력한다.
+
+사용 예시:
+  python -m backend.modules.tools.loadtest --sessions 10 --participants 8 --duration 60
+  python -m backend.modules.tools.loadtest --sessions 5,10,20 --participants 10 --workers 4 --json load.json
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+BACKEND_DIR = Path(__file__).resolve().parents[2]  # backend/
+
+# useRealtimeSync.js의 폴링 간격
+POLL_MIN = 0.5
+POLL_MAX = 5.0
+POLL_STEP = 0.5
+POLL_JITTER = 0.2
+POLL_SERVER_MAX = 10.0
+# RealtimeInput.jsx의 입력 디바운스
+KEYSTROKE_DEBOUNCE = 0.2
+
+
+# ---------- 측정 ----------
+
+def _percentile(values: List[float], p: float) -> float:
+    if not values:
+        return 0.0
+    return values[max(0, math.ceil(p / 100 * len(values)) - 1)]
+
+
+class Recorder:
+    def __init__(self):
+        self.samples: Dict[str, List[float]] = {}
+        self.errors: Dict[str, int] = {}
+        self.statuses: Dict[str, Dict[str, int]] = {}
+        self.counters: Dict[str, int] = {}
+
+    def add(self, name: str, seconds: float, status: Optional[int]) -> None:
+        self.samples.setdefault(name, []).append(seconds)
+        key = str(status) if status is not None else "exception"
+        by_status = self.statuses.setdefault(name, {})
+        by_status[key] = by_status.get(key, 0) + 1
+        if status is None or status >= 400:
+            self.errors[name] = self.errors.get(name, 0) + 1
+
+    def count(self, name: str) -> None:
+        self.counters[name] = self.counters.get(name, 0) + 1
+
+    def report(self, elapsed: float) -> Dict[str, Any]:
+        endpoints: Dict[str, Any] = {}
+        everything: List[float] = []
+        for name in sorted(self.samples):
+            values = sorted(self.samples[name])
+            everything.extend(values)
+            errors = self.errors.get(name, 0)
+            endpoints[name] = {
+                "count": len(values),
+                "errors": errors,
+                "errorRate": round(errors / len(values), 4),
+                "rps": round(len(values) / elapsed, 2) if elapsed else 0.0,
+                "p50Ms": round(_percentile(values, 50) * 1000, 2),
+                "p95Ms": round(_percentile(values, 95) * 1000, 2),
+                "p99Ms": round(_percentile(values, 99) * 1000, 2),
+                "maxMs": round(values[-1] * 1000, 2),
+                "statuses": self.statuses.get(name, {}),
+            }
+        everything.sort()
+        total_errors = sum(self.errors.values())
+        return {
+            "elapsedSeconds": round(elapsed, 2),
+            "requests": len(everything),
+            "rps": round(len(everything) / elapsed, 2) if elapsed else 0.0,
+            "errors": total_errors,
+            "errorRate": round(total_errors / len(everything), 4) if everything else 0.0,
+            "p50Ms": round(_percentile(everything, 50) * 1000, 2),
+            "p95Ms": round(_percentile(everything, 95) * 1000, 2),
+            "p99Ms": round(_percentile(everything, 99) * 1000, 2),
+            "counters": dict(self.counters),
+            "endpoints": endpoints,
+        }
+
+
+def _proc_io(pid: int) -> Optional[Dict[str, int]]:
+    try:
+        with open(f"/proc/{pid}/io") as f:
+            return {k: int(v) for k, v in (line.split(": ") for line in f.read().splitlines())}
+    except (OSError, ValueError):
+        return None
+
+
+def _process_tree(pid: int) -> List[int]:
+    pids = [pid]
+    try:
+        for task in os.listdir(f"/proc/{pid}/task"):
+            with open(f"/proc/{pid}/task/{task}/children") as f:
+                for child in f.read().split():
+                    pids.extend(_process_tree(int(child)))
+    except OSError:
+        pass
+    return pids
+
+
+def _disk_io(root_pid: Optional[int]) -> Optional[Dict[str, int]]:
+    """root_pid와 자식 프로세스의 누적 쓰기 (syscw: write 호출 수, write_bytes: 실제 디스크 쓰기)"""
+    if root_pid is None:
+        return None
+    total = {"writeSyscalls": 0, "writeChars": 0, "writeBytes": 0}
+    found = False
+    for pid in _process_tree(root_pid):
+        io = _proc_io(pid)
+        if io is None:
+            continue
+        found = True
+        total["writeSyscalls"] += io.get("syscw", 0)
+        total["writeChars"] += io.get("wchar", 0)
+        total["writeBytes"] += io.get("write_bytes", 0)
+    return total if found else None
+
+
+def _dir_usage(root: Path) -> Dict[str, int]:
+    files = size = 0
+    for dirpath, _, names in os.walk(root):
+        for name in names:
+            try:
+                size += os.path.getsize(os.path.join(dirpath, name))
+                files += 1
+            except OSError:
+                pass
+    return {"files": files, "bytes": size}
+
+
+# ---------- 트래픽 모델 ----------
+
+class Scenario:
+    def __init__(self, args: argparse.Namespace, sessions: int, participants: int):
+        self.sessions = sessions
+        self.participants = participants
+        self.duration = args.duration
+        self.ramp = args.ramp
+        self.fields = args.fields
+        self.think = args.think
+        self.burst = (args.burst_min, max(args.burst_min, args.burst_max))
+        self.prompt_every = args.prompt_every
+        self.autosave_every = args.autosave_every
+        self.seed = args.seed
+
+
+class _Caller:
+    def __init__(self, http: httpx.AsyncClient, recorder: Recorder, client_id: Optional[str] = None):
+        self.http = http
+        self.recorder = recorder
+        # 브라우저 클라이언트처럼 X-Client-Id를 보내 같은 IP의 요청 수 제한 예산을 참가자별로 나눈다
+        self.headers = {"X-Client-Id": client_id} if client_id else None
+
+    async def call(self, name: str, method: str, url: str, **kwargs: Any) -> Optional[httpx.Response]:
+        started = time.perf_counter()
+        try:
+            response = await self.http.request(method, url, headers=self.headers, **kwargs)
+        except Exception:
+            self.recorder.add(name, time.perf_counter() - started, None)
+            return None
+        self.recorder.add(name, time.perf_counter() - started, response.status_code)
+        return response
+
+
+def _json(response: Optional[httpx.Response]) -> Dict[str, Any]:
+    if response is None or response.status_code >= 400:
+        return {}
+    try:
+        data = response.json()
+    except ValueError:
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+async def _pause(seconds: float, stop_at: float) -> bool:
+    """최대 seconds 동안 기다리되 시나리오 종료 시각은 넘기지 않는다. 계속 진행할지 반환."""
+    remaining = stop_at - time.monotonic()
+    if remaining <= 0:
+        return False
+    await asyncio.sleep(min(seconds, remaining))
+    return time.monotonic() < stop_at
+
+
+async def _poll_loop(c: _Caller, code: str, stop_at: float, rng: random.Random) -> None:
+    since = 0
+    delay = POLL_MIN
+    while time.monotonic() < stop_at:
+        r = await c.call("GET /api/fields/{code}/updates", "GET", f"/api/fields/{code}/updates", params={"since": since})
+        if r is not None and r.status_code == 200:
+            data = _json(r)
+            last = int(data.get("lastUpdate") or 0)
+            if last > since:
+                since = last
+                delay = POLL_MIN
+            else:
+                delay = min(delay + POLL_STEP, POLL_MAX)
+            # useRealtimeSync처럼 서버가 제안한 간격을 따른다
+            if data.get("nextPollMs"):
+                delay = min(max(data["nextPollMs"] / 1000, POLL_MIN), POLL_SERVER_MAX)
+        elif r is not None and r.status_code == 429:
+            c.recorder.count("rateLimited")
+            delay = min(float(r.headers.get("retry-after") or POLL_MAX), POLL_SERVER_MAX)
+        else:
+            delay = min(max(delay, 2.0), POLL_MAX)
+        await _pause(delay + rng.random() * POLL_JITTER, stop_at)
+
+
+async def _typing_loop(c: _Caller, code: str, user: str, sc: Scenario, stop_at: float, rng: random.Random) -> None:
+    while True:
+        if not await _pause(rng.expovariate(1 / sc.think), stop_at):
+            return
+        field = f"field_{rng.randrange(sc.fields)}"
+        body = {"sessionCode": code, "fieldId": field, "userId": user}
+        if not _json(await c.call("POST /api/fields/lock", "POST", "/api/fields/lock", json=body)).get("success"):
+            c.recorder.count("lockDenied")
+            continue
+        text = ""
+        for _ in range(rng.randint(*sc.burst)):
+            await asyncio.sleep(KEYSTROKE_DEBOUNCE + rng.random() * KEYSTROKE_DEBOUNCE)
+            text += rng.choice("가나다라마바사아자차카타파하 ")
+            await c.call("POST /api/fields/update", "POST", "/api/fields/update", json={**body, "value": text})
+        await c.call("POST /api/fields/unlock", "POST", "/api/fields/unlock", json=body)
+
+
+async def _prompt_loop(c: _Caller, code: str, user: str, spirit_ids: List[str], sc: Scenario,
+                       stop_at: float, rng: random.Random) -> None:
+    n = 0
+    while True:
+        if not await _pause(rng.expovariate(1 / sc.prompt_every), stop_at) or not spirit_ids:
+            return
+        n += 1
+        r = await c.call("POST /api/generate-prompt", "POST", "/api/generate-prompt", json={
+            "spiritId": rng.choice(spirit_ids),
+            "activityName": f"{user} 활동 {n}",
+            "coreText": f"{user}의 {n}번째 활동 내용과 느낀 점 " * rng.randint(1, 5),
+        })
+        prompt = _json(r).get("prompt")
+        if prompt:
+            await c.call("POST /api/session-artifacts", "POST", "/api/session-artifacts", json={
+                "sessionCode": code, "team": user, "label": f"prompt {n}", "type": "prompt", "content": prompt,
+            })
+
+
+async def _participant(c: _Caller, code: str, index: int, spirit_ids: List[str], sc: Scenario,
+                       stop_at: float, rng: random.Random) -> None:
+    user = f"{code}_u{index}"
+    c = _Caller(c.http, c.recorder, client_id=user)
+    if not await _pause(rng.random() * sc.ramp, stop_at):
+        return
+    await c.call("POST /api/sessions/{code}/join", "POST", f"/api/sessions/{code}/join")
+    await asyncio.gather(
+        _poll_loop(c, code, stop_at, rng),
+        _typing_loop(c, code, user, sc, stop_at, rng),
+        _prompt_loop(c, code, user, spirit_ids, sc, stop_at, rng),
+    )
+    await c.call("POST /api/sessions/{code}/leave", "POST", f"/api/sessions/{code}/leave")
+
+
+async def _facilitator(c: _Caller, code: str, sc: Scenario, stop_at: float, rng: random.Random) -> None:
+    notes: List[Dict[str, Any]] = []
+    connections: List[Dict[str, Any]] = []
+    while True:
+        if not await _pause(sc.autosave_every * (0.8 + rng.random() * 0.4), stop_at):
+            return
+        for _ in range(rng.randint(1, 3)):
+            notes.append({"id": f"n{len(notes)}", "text": f"노트 {len(notes)}", "x": rng.randint(0, 1200),
+                          "y": rng.randint(0, 800), "layer": rng.randint(1, 4)})
+        if len(notes) > 1:
+            connections.append({"id": f"c{len(connections)}", "from": notes[-2]["id"], "to": notes[-1]["id"]})
+        await c.call("POST /api/culture-map", "POST", "/api/culture-map", json={
+            "sessionCode": code, "notes": notes, "connections": connections, "layerState": {"visible": [1, 2, 3, 4]},
+        })
+
+
+async def _drive(http: httpx.AsyncClient, sc: Scenario) -> Tuple[Recorder, float]:
+    recorder = Recorder()
+    c = _Caller(http, recorder)
+    rng = random.Random(sc.seed)
+
+    spirits = _json(await c.call("GET /api/spirits", "GET", "/api/spirits"))
+    spirit_ids = [s.get("id") for s in spirits.get("spirits") or [] if s.get("id")]
+    codes = []
+    for i in range(sc.sessions):
+        code = _json(await c.call("POST /api/sessions", "POST", "/api/sessions",
+                                  json={"name": f"부하 테스트 {i + 1}"})).get("code")
+        if code:
+            codes.append(code)
+    if not codes:
+        raise RuntimeError("could not create any session")
+
+    started = time.monotonic()
+    stop_at = started + sc.duration
+    tasks = []
+    for code in codes:
+        tasks.append(_facilitator(_Caller(http, recorder, client_id=f"{code}_host"), code, sc, stop_at,
+                                  random.Random(rng.random())))
+        for p in range(sc.participants):
+            tasks.append(_participant(c, code, p, spirit_ids, sc, stop_at, random.Random(rng.random())))
+    await asyncio.gather(*tasks)
+    return recorder, time.monotonic() - started
+
+
+def _limits(sc: Scenario) -> httpx.Limits:
+    # 참가자마다 폴링/입력/프롬프트가 동시에 나갈 수 있다
+    n = sc.sessions * (sc.participants * 3 + 1) + 10
+    return httpx.Limits(max_connections=n, max_keepalive_connections=n)
+
+
+async def _run_in_process(sc: Scenario) -> Tuple[Recorder, float]:
+    sys.path.insert(0, str(BACKEND_DIR))
+    from app import app  # DONGAM_UPLOADS_DIR을 설정한 뒤에 import해야 임시 디렉터리를 쓴다
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", limits=_limits(sc),
+                                     timeout=60) as http:
+            return await _drive(http, sc)
+
+
+async def _run_http(sc: Scenario, base_url: str) -> Tuple[Recorder, float]:
+    async with httpx.AsyncClient(base_url=base_url, limits=_limits(sc), timeout=60) as http:
+        return await _drive(http, sc)
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _spawn_server(workers: int, uploads: Path) -> Tuple[subprocess.Popen, str]:
+    port = _free_port()
+    env = {**os.environ, "DONGAM_UPLOADS_DIR": str(uploads)}
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app:app", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning"],
+        cwd=str(BACKEND_DIR), env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"uvicorn exited with code {proc.returncode}")
+        try:
+            if httpx.get(f"{base_url}/healthz", timeout=1).status_code == 200:
+                return proc, base_url
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    proc.terminate()
+    raise RuntimeError("uvicorn did not become healthy within 30s")
+
+
+def run_scenario(args: argparse.Namespace, sessions: int, participants: int) -> Dict[str, Any]:
+    sc = Scenario(args, sessions, participants)
+    uploads = Path(tempfile.mkdtemp(prefix="dongam-load-"))
+    proc = None
+    try:
+        if args.url:
+            io_pid = None
+            recorder, elapsed = asyncio.run(_run_http(sc, args.url.rstrip("/")))
+        elif args.workers:
+            proc, base_url = _spawn_server(args.workers, uploads)
+            io_pid = proc.pid
+            before = _disk_io(io_pid)
+            recorder, elapsed = asyncio.run(_run_http(sc, base_url))
+        else:
+            os.environ["DONGAM_UPLOADS_DIR"] = str(uploads)
+            io_pid = os.getpid()
+            before = _disk_io(io_pid)
+            recorder, elapsed = asyncio.run(_run_in_process(sc))
+        report = recorder.report(elapsed)
+        after = _disk_io(io_pid)
+        disk: Dict[str, Any] = {}
+        if after is not None and before is not None:
+            disk.update({k: after[k] - before[k] for k in after})
+        if not args.url:
+            disk.update(_dir_usage(uploads))
+        report.update({
+            "scenario": {"sessions": sessions, "participantsPerSession": participants, "duration": sc.duration,
+                         "mode": "url" if args.url else (f"uvicorn x{args.workers}" if args.workers else "in-process")},
+            "disk": disk or None,
+        })
+        return report
+    finally:
+        if proc is not None:
+            proc.terminate()
+            try:
+                proc.wait(10)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+        if not args.keep_uploads:
+            shutil.rmtree(uploads, ignore_errors=True)
+        else:
+            print(f"[INFO] uploads kept at {uploads}")
+
+
+# ---------- 출력 ----------
+
+def print_report(report: Dict[str, Any]) -> None:
+    s = report["scenario"]
+    print(f"\n== {s['sessions']} sessions x {s['participantsPerSession']} participants, "
+          f"{s['duration']}s, {s['mode']}")
+    print(f"{'endpoint':<40}{'count':>8}{'err%':>7}{'rps':>8}{'p50':>9}{'p95':>9}{'p99':>9}{'max':>9}  (ms)")
+    for name, e in report["endpoints"].items():
+        print(f"{name:<40}{e['count']:>8}{e['errorRate'] * 100:>7.2f}{e['rps']:>8.1f}"
+              f"{e['p50Ms']:>9.1f}{e['p95Ms']:>9.1f}{e['p99Ms']:>9.1f}{e['maxMs']:>9.1f}")
+    print(f"{'TOTAL':<40}{report['requests']:>8}{report['errorRate'] * 100:>7.2f}{report['rps']:>8.1f}"
+          f"{report['p50Ms']:>9.1f}{report['p95Ms']:>9.1f}{report['p99Ms']:>9.1f}")
+    if report["counters"]:
+        print("counters:", ", ".join(f"{k}={v}" for k, v in report["counters"].items()))
+    if report["disk"]:
+        print("disk:", ", ".join(f"{k}={v}" for k, v in report["disk"].items()))
+
+
+def print_summary(reports: List[Dict[str, Any]]) -> None:
+    print(f"\n{'sessions':>9}{'per session':>12}{'users':>7}{'rps':>9}{'err%':>7}{'p50':>9}{'p95':>9}{'p99':>9}  (ms)")
+    for r in reports:
+        s = r["scenario"]
+        print(f"{s['sessions']:>9}{s['participantsPerSession']:>12}{s['sessions'] * s['participantsPerSession']:>7}"
+              f"{r['rps']:>9.1f}{r['errorRate'] * 100:>7.2f}{r['p50Ms']:>9.1f}{r['p95Ms']:>9.1f}{r['p99Ms']:>9.1f}")
+
+
+# ---------- CLI ----------
+
+def _int_list(value: str) -> List[int]:
+    return [int(v) for v in value.split(",") if v.strip()]
+
+
+def main():
+    ap = argparse.ArgumentParser(description="워크숍 트래픽 부하 테스트")
+    ap.add_argument('--sessions', type=_int_list, default=[5], help='동시 세션 수 (쉼표로 여러 값)')
+    ap.add_argument('--participants', type=_int_list, default=[8], help='세션당 참가자 수 (쉼표로 여러 값)')
+    ap.add_argument('--duration', type=float, default=30, help='시나리오 길이(초)')
+    ap.add_argument('--ramp', type=float, default=5, help='참가자 입장을 분산시키는 시간(초)')
+    ap.add_argument('--fields', type=int, default=12, help='세션당 입력 필드 수')
+    ap.add_argument('--think', type=float, default=4, help='입력 묶음 사이 평균 대기(초)')
+    ap.add_argument('--burst-min', type=int, default=3, help='한 번 잠금 동안의 최소 키 입력 업데이트 수')
+    ap.add_argument('--burst-max', type=int, default=15, help='한 번 잠금 동안의 최대 키 입력 업데이트 수')
+    ap.add_argument('--prompt-every', type=float, default=60, help='참가자별 프롬프트 생성 평균 간격(초)')
+    ap.add_argument('--autosave-every', type=float, default=10, help='세션별 컬처맵 자동 저장 간격(초)')
+    ap.add_argument('--seed', type=int, default=1, help='난수 시드')
+    ap.add_argument('--workers', type=int, default=0, help='uvicorn 워커 수 (0이면 같은 프로세스에서 ASGI 호출)')
+    ap.add_argument('--url', default=None, help='이미 떠 있는 서버 주소 (예: http://127.0.0.1:8000)')
+    ap.add_argument('--keep-uploads', action='store_true', help='임시 uploads/ 디렉터리를 지우지 않음')
+    ap.add_argument('--json', default=None, help='보고서를 JSON으로 저장할 경로')
+    args = ap.parse_args()
+
+    if args.url:
+        print("[WARNING] --url 모드는 서버의 실제 uploads/에 쓰며 디스크 쓰기 집계를 하지 않습니다.")
+    combos = [(s, p) for s in args.sessions for p in args.participants]
+    if len(combos) > 1 and not args.workers and not args.url:
+        # 같은 프로세스에서는 앱 모듈이 첫 uploads/ 경로로 고정되므로 조합마다 서버를 새로 띄운다
+        args.workers = 1
+        print("[INFO] 여러 조합을 실행하므로 조합마다 uvicorn(워커 1개)을 새로 띄웁니다.")
+
+    reports = []
+    for sessions, participants in combos:
+        report = run_scenario(args, sessions, participants)
+        print_report(report)
+        reports.append(report)
+    if len(reports) > 1:
+        print_summary(reports)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(reports if len(reports) > 1 else reports[0], f, ensure_ascii=False, indent=2)
+        print(f"[OK] Report written to {args.json}")
+
+
+if __name__ == '__main__':
+    main()
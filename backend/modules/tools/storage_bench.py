@@ -0,0 +1,341 @@
+"""
+저장소 모듈 마이크로 벤치마크
+
+규모 N마다 새 임시 uploads/(DONGAM_UPLOADS_DIR)에 합성 데이터를 만들고, 별도 프로세스에서
+저장소 함수를 직접 호출해 연산별 지연을 잰다. N이 커질 때 지연이 어떻게 늘어나는지
+(로그-로그 기울기: 0이면 N과 무관, 1이면 N에 비례)를 함께 출력해 인덱스 전체 스캔 같은
+확장성 회귀가 숫자로 드러나게 한다.
+
+합성 데이터 (규모 N)
+  * 세션 N개 (세션 디렉터리 + session_meta.json + sessions_index.json)
+  * 전역 artifact N개, 대상 세션의 artifact N개 (파일 + index.json)
+  * 대상 세션의 컬처맵 이력 min(N, 500)개 버전, 실시간 필드 min(N, 5000)개
+  * 보존 정책에 잘리지 않도록 ARTIFACT_MAX_COUNT / SESSION_ARTIFACT_MAX_COUNT는 0(무제한)으로 둔다.
+
+사용 예시:
+  python -m backend.modules.tools.storage_bench --sizes 10,100,1000,10000 --json bench.json
+  python -m backend.modules.tools.storage_bench --sizes 10,1000,100000 --repeat 20 --compare bench.json
+"""
+from __future__ import annotations
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import shutil
+import string
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+OPERATIONS = (
+    "create_session",
+    "get_session",
+    "get_session(readonly)",
+    "list_sessions",
+    "save_artifact",
+    "get_artifact",
+    "save_session_artifact",
+    "get_latest_culture_map_data",
+    "lock_field",
+    "get_field_updates",
+)
+
+MAX_MAP_VERSIONS = 500
+MAX_FIELDS = 5000
+
+
+# ---------- 합성 데이터 생성 ----------
+
+def _write_json(p: Path, data: Any) -> None:
+    p.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
+
+
+def _artifact_items(store_dir: Path, n: int, rng: random.Random, now: int,
+                    session_code: Optional[str] = None) -> List[Dict[str, Any]]:
+    items = []
+    for i in range(n):
+        created = now - (n - i) * 7
+        art_id = uuid.UUID(int=rng.getrandbits(128)).hex[:10]
+        filename = f"{created}_{art_id}.txt"
+        content = f"synthetic artifact {i} " * rng.randint(2, 20)
+        (store_dir / filename).write_text(content, encoding="utf-8")
+        meta = {
+            "id": art_id,
+            "team": f"team{rng.randint(1, 10)}",
+            "label": f"label {i % 97}",
+            "type": rng.choice(("prompt", "result")),
+            "filename": filename,
+            "size": len(content.encode("utf-8")),
+            "createdAt": created,
+        }
+        if session_code is not None:
+            meta = {"id": art_id, "sessionCode": session_code, **{k: v for k, v in meta.items() if k != "id"}}
+        items.append(meta)
+    return items
+
+
+def populate(uploads: Path, n: int, seed: int = 1) -> Dict[str, Any]:
+    """uploads/ 아래에 규모 n의 합성 데이터를 저장 형식 그대로 직접 쓴다 (API 호출보다 훨씬 빠름)"""
+    rng = random.Random(seed)
+    now = int(time.time())
+    sessions_dir = uploads / "sessions"
+    workshop_dir = uploads / "workshop"
+    sessions_dir.mkdir(parents=True, exist_ok=True)
+    workshop_dir.mkdir(parents=True, exist_ok=True)
+
+    codes: List[str] = []
+    seen = set()
+    while len(codes) < n:
+        code = "".join(rng.choices(string.ascii_uppercase + string.digits, k=6))
+        if code not in seen:
+            seen.add(code)
+            codes.append(code)
+    sessions = []
+    for i, code in enumerate(codes):
+        created = now - (n - i) * 60
+        data = {
+            "code": code,
+            "name": f"세션 {i}",
+            "description": "",
+            "createdAt": created,
+            "lastAccessedAt": created,
+            "participantCount": rng.randint(1, 12),
+        }
+        (sessions_dir / code).mkdir()
+        _write_json(sessions_dir / code / "session_meta.json", data)
+        sessions.append(data)
+    _write_json(sessions_dir / "sessions_index.json", {"sessions": sessions})
+
+    items = _artifact_items(workshop_dir, n, rng, now)
+    _write_json(workshop_dir / "index.json", {"items": items})
+
+    target = codes[-1]
+    session_store = sessions_dir / target / "artifacts"
+    session_store.mkdir()
+    session_items = _artifact_items(session_store, n, rng, now, session_code=target)
+    _write_json(session_store / "index.json", {"items": session_items})
+
+    fields = min(n, MAX_FIELDS)
+    _write_json(sessions_dir / target / "field_states.json", {
+        "fields": {f"field_{i}": {"lockedBy": f"user_{i}", "lockTime": now, "isActive": True}
+                   for i in range(0, fields, 3)},
+        "values": {f"field_{i}": {"value": f"값 {i}", "updatedBy": f"user_{i}", "updateTime": now - i}
+                   for i in range(fields)},
+        "lastUpdate": now,
+    })
+    return {
+        "sessions": codes,
+        "target": target,
+        "artifactIds": [it["id"] for it in items],
+        "fields": fields,
+    }
+
+
+def _populate_culture_map(target: str, versions: int) -> None:
+    from .. import culture_map_store
+
+    base = culture_map_store.save_snapshot(target, {"notes": [], "connections": [], "layerState": {}})
+    version = base["version"] if base else 1
+    for i in range(versions - 1):
+        result = culture_map_store.apply_delta(target, version, {
+            "notes": {"added": [{"id": f"n{i}", "text": f"노트 {i}", "x": i % 1200, "y": i % 800}]},
+        })
+        version = result["version"]
+
+
+# ---------- 측정 ----------
+
+def _percentile(values: List[float], p: float) -> float:
+    return values[max(0, math.ceil(p / 100 * len(values)) - 1)] if values else 0.0
+
+
+def _measure(fn: Callable[[int], Any], repeat: int, budget: float) -> Dict[str, Any]:
+    started = time.perf_counter()
+    fn(0)
+    first = time.perf_counter() - started
+    samples = []
+    deadline = time.perf_counter() + budget
+    for i in range(1, repeat + 1):
+        t = time.perf_counter()
+        fn(i)
+        samples.append(time.perf_counter() - t)
+        if time.perf_counter() > deadline and len(samples) >= 3:
+            break
+    samples.sort()
+    return {
+        "firstUs": round(first * 1e6, 1),
+        "medianUs": round(_percentile(samples, 50) * 1e6, 1),
+        "p95Us": round(_percentile(samples, 95) * 1e6, 1),
+        "meanUs": round(sum(samples) / len(samples) * 1e6, 1),
+        "samples": len(samples),
+    }
+
+
+def run_size(n: int, repeat: int, budget: float, seed: int) -> Dict[str, Any]:
+    """DONGAM_UPLOADS_DIR이 가리키는 빈 디렉터리에서 규모 n 측정 (자식 프로세스에서 실행)"""
+    from .. import artifact_store, realtime_sync, session_artifact_store, session_manager
+
+    uploads = Path(os.environ["DONGAM_UPLOADS_DIR"])
+    t = time.perf_counter()
+    data = populate(uploads, n, seed)
+    _populate_culture_map(data["target"], min(n, MAX_MAP_VERSIONS))
+    populate_seconds = time.perf_counter() - t
+
+    rng = random.Random(seed)
+    codes, target = data["sessions"], data["target"]
+    ids = data["artifactIds"]
+    ops: Dict[str, Callable[[int], Any]] = {
+        "create_session": lambda i: session_manager.create_session(name=f"bench {i}"),
+        "get_session": lambda i: session_manager.get_session(rng.choice(codes)),
+        "get_session(readonly)": lambda i: session_manager.get_session(rng.choice(codes), update_access_time=False),
+        "list_sessions": lambda i: session_manager.list_sessions(),
+        "save_artifact": lambda i: artifact_store.save_artifact(
+            content=f"bench {i}", team="bench", label=f"bench {i}", type_="prompt"),
+        "get_artifact": lambda i: artifact_store.get_artifact(rng.choice(ids)),
+        "save_session_artifact": lambda i: session_artifact_store.save_session_artifact(
+            session_code=target, content=f"bench {i}", team="bench", label=f"bench {i}", type_="prompt"),
+        "get_latest_culture_map_data": lambda i: session_artifact_store.get_latest_culture_map_data(target),
+        "lock_field": lambda i: realtime_sync.lock_field(target, f"bench_field_{i}", "bench"),
+        "get_field_updates": lambda i: realtime_sync.get_field_updates(target, 0),
+    }
+    results = {}
+    for name in OPERATIONS:
+        results[name] = _measure(ops[name], repeat, budget)
+    return {"n": n, "populateSeconds": round(populate_seconds, 2), "operations": results}
+
+
+def _child(n: int, repeat: int, budget: float, seed: int, out: str) -> None:
+    result = run_size(n, repeat, budget, seed)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(result, f)
+
+
+def _run_child(n: int, args: argparse.Namespace) -> Dict[str, Any]:
+    uploads = Path(tempfile.mkdtemp(prefix=f"dongam-bench-{n}-"))
+    out = uploads.parent / f"{uploads.name}.json"
+    env = {
+        **os.environ,
+        "DONGAM_UPLOADS_DIR": str(uploads),
+        "ARTIFACT_MAX_COUNT": "0",
+        "SESSION_ARTIFACT_MAX_COUNT": "0",
+    }
+    try:
+        subprocess.run(
+            [sys.executable, "-m", __spec__.name, "--_child", str(n), "--repeat", str(args.repeat),
+             "--budget", str(args.budget), "--seed", str(args.seed), "--_out", str(out)],
+            env=env, check=True, stdout=subprocess.DEVNULL,
+        )
+        return json.loads(out.read_text(encoding="utf-8"))
+    finally:
+        shutil.rmtree(uploads, ignore_errors=True)
+        try:
+            out.unlink()
+        except OSError:
+            pass
+
+
+def scaling(sizes: List[Dict[str, Any]]) -> Dict[str, Optional[float]]:
+    """연산별 log(median) / log(N) 기울기 (가장 작은 N과 가장 큰 N 기준)"""
+    if len(sizes) < 2:
+        return {name: None for name in OPERATIONS}
+    lo, hi = sizes[0], sizes[-1]
+    out: Dict[str, Optional[float]] = {}
+    for name in OPERATIONS:
+        a = lo["operations"][name]["medianUs"]
+        b = hi["operations"][name]["medianUs"]
+        out[name] = round(math.log(b / a) / math.log(hi["n"] / lo["n"]), 2) if a > 0 and b > 0 else None
+    return out
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """같은 N에서 중앙값이 baseline의 tolerance배를 넘거나 기울기가 0.25 이상 커진 연산"""
+    regressions = []
+    base_sizes = {s["n"]: s for s in baseline.get("sizes", [])}
+    for size in report["sizes"]:
+        base = base_sizes.get(size["n"])
+        if not base:
+            continue
+        for name, stats in size["operations"].items():
+            ref = base["operations"].get(name, {}).get("medianUs")
+            if ref and stats["medianUs"] > ref * tolerance:
+                regressions.append(f"{name} @ N={size['n']}: {ref}us -> {stats['medianUs']}us")
+    for name, slope in report["scaling"].items():
+        ref = baseline.get("scaling", {}).get(name)
+        if slope is not None and ref is not None and slope - ref >= 0.25:
+            regressions.append(f"{name} scaling slope {ref} -> {slope}")
+    return regressions
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    sizes = report["sizes"]
+    header = f"{'operation (median us)':<30}" + "".join(f"{'N=' + str(s['n']):>12}" for s in sizes) + f"{'slope':>8}"
+    print(header)
+    for name in OPERATIONS:
+        row = f"{name:<30}" + "".join(f"{s['operations'][name]['medianUs']:>12.1f}" for s in sizes)
+        slope = report["scaling"][name]
+        print(row + (f"{slope:>8.2f}" if slope is not None else f"{'-':>8}"))
+    print("populate (s)".ljust(30) + "".join(f"{s['populateSeconds']:>12.2f}" for s in sizes))
+
+
+# ---------- CLI ----------
+
+def main():
+    ap = argparse.ArgumentParser(description="저장소 모듈 마이크로 벤치마크")
+    ap.add_argument('--sizes', default='10,100,1000,10000', help='세션/artifact 규모 N (쉼표로 구분, 10~100000)')
+    ap.add_argument('--repeat', type=int, default=50, help='연산별 최대 반복 횟수')
+    ap.add_argument('--budget', type=float, default=5.0, help='연산별 최대 측정 시간(초)')
+    ap.add_argument('--seed', type=int, default=1, help='합성 데이터 난수 시드')
+    ap.add_argument('--json', default=None, help='결과를 JSON으로 저장할 경로')
+    ap.add_argument('--compare', default=None, help='이전 결과(JSON)와 비교해 회귀가 있으면 종료 코드 1')
+    ap.add_argument('--tolerance', type=float, default=1.5, help='--compare 시 허용 배수 (중앙값 기준)')
+    ap.add_argument('--_child', type=int, default=None, help=argparse.SUPPRESS)
+    ap.add_argument('--_out', default=None, help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args._child is not None:
+        _child(args._child, args.repeat, args.budget, args.seed, args._out)
+        return
+
+    sizes = sorted({int(s) for s in args.sizes.split(",") if s.strip()})
+    if not sizes or sizes[0] < 1:
+        ap.error("--sizes must be positive integers")
+    results = []
+    for n in sizes:
+        print(f"[INFO] N={n} ...", flush=True)
+        results.append(_run_child(n, args))
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeat": args.repeat,
+            "budgetSeconds": args.budget,
+            "seed": args.seed,
+            "at": int(time.time()),
+        },
+        "sizes": results,
+        "scaling": scaling(results),
+    }
+    print_report(report)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"[OK] Results written to {args.json}")
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.tolerance)
+        for line in regressions:
+            print(f"[REGRESSION] {line}")
+        if regressions:
+            sys.exit(1)
+        print("[OK] No regressions against baseline")
+
+
+if __name__ == '__main__':
+    main()
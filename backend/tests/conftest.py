@@ -0,0 +1,16 @@
+"""
+백엔드 테스트 공통 설정
+
+저장소 모듈들은 import 시점에 DONGAM_UPLOADS_DIR로 저장 위치를 정하므로,
+모듈을 가져오기 전에 임시 디렉터리를 지정해 실제 uploads/를 건드리지 않게 한다.
+"""
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+os.environ["DONGAM_UPLOADS_DIR"] = tempfile.mkdtemp(prefix="dongam-test-uploads-")
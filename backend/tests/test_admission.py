@@ -0,0 +1,28 @@
+from modules.admission import TokenBucketLimiter
+
+
+def _admitted(limiter: TokenBucketLimiter, host: str, ids) -> int:
+    return sum(1 for client_id in ids if limiter.acquire(host, client_id) == 0)
+
+
+def test_rotating_client_ids_do_not_get_fresh_bursts():
+    limiter = TokenBucketLimiter(rate=0.001, burst=2, host_rate=0.001, host_burst=10, max_ids_per_host=64)
+    # 요청마다 id를 바꿔도 IP 전체 한도를 넘지 못한다
+    assert _admitted(limiter, "10.0.0.1", (f"id-{i}" for i in range(100))) == 10
+
+
+def test_client_ids_split_a_host_budget_up_to_the_cap():
+    limiter = TokenBucketLimiter(rate=0.001, burst=2, max_ids_per_host=3)
+    assert _admitted(limiter, "10.0.0.1", ["a"] * 5) == 2
+    assert _admitted(limiter, "10.0.0.1", ["b", "b", "c", "c"]) == 4
+    # 한도를 넘는 새 id들은 하나의 공용 버킷을 함께 쓴다
+    assert _admitted(limiter, "10.0.0.1", [f"x{i}" for i in range(10)]) == 2
+
+
+def test_rotating_ids_do_not_evict_other_hosts():
+    limiter = TokenBucketLimiter(rate=0.001, burst=1, max_clients=2, max_ids_per_host=2)
+    assert limiter.acquire("10.0.0.1", "victim") == 0
+    for i in range(50):
+        limiter.acquire("10.0.0.2", f"id-{i}")
+    # 피해자 버킷이 밀려나 새 버킷으로 다시 만들어지지 않는다
+    assert limiter.acquire("10.0.0.1", "victim") > 0
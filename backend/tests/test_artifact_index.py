@@ -0,0 +1,52 @@
+import os
+import time
+
+import pytest
+
+from modules import artifact_index, retention, session_artifact_store
+from modules.session_manager import create_session
+
+
+def _save(code: str, label: str) -> dict:
+    return session_artifact_store.save_session_artifact(
+        session_code=code, content=label, team="t", label=label, type_="prompt"
+    )
+
+
+def test_unreadable_index_is_not_replaced_by_an_empty_one(monkeypatch):
+    monkeypatch.setattr(artifact_index, "INDEX_READ_RETRY_SECONDS", 0)
+    code = create_session(name="index test")["code"]
+    _save(code, "first")
+    p = session_artifact_store._session_index_path(code)
+    good = p.read_bytes()
+    p.write_bytes(good[: len(good) // 2])  # 쓰다 만 파일
+
+    with pytest.raises(artifact_index.IndexReadError):
+        artifact_index.load_index(p)
+    with pytest.raises(artifact_index.IndexReadError):
+        _save(code, "second")
+    # 실패한 저장이 기존 인덱스를 빈 목록으로 덮어쓰지 않는다
+    assert p.read_bytes() == good[: len(good) // 2]
+
+    p.write_bytes(good)
+    labels = [it["label"] for it in session_artifact_store.list_session_artifacts(code)]
+    assert labels == ["first"]
+
+
+def test_gc_keeps_files_when_index_is_unreadable(monkeypatch):
+    monkeypatch.setattr(artifact_index, "INDEX_READ_RETRY_SECONDS", 0)
+    code = create_session(name="gc test")["code"]
+    meta = _save(code, "kept")
+    p = session_artifact_store._session_index_path(code)
+    store_dir = p.parent
+    old = time.time() - retention.ORPHAN_GRACE_SECONDS - 60
+    os.utime(store_dir / meta["filename"], (old, old))
+
+    p.write_text("{", encoding="utf-8")
+    stats = retention.reconcile_store(store_dir, retention.SESSION_POLICY)
+    assert stats["orphans"] == 0
+    assert (store_dir / meta["filename"]).exists()
+
+    p.unlink()
+    retention.reconcile_store(store_dir, retention.SESSION_POLICY)
+    assert (store_dir / meta["filename"]).exists()
@@ -0,0 +1,28 @@
+import json
+
+import pytest
+
+from modules.batch_prompts import parse_rows
+
+
+def test_json_upload_is_an_array_of_objects():
+    content = json.dumps([
+        {"spiritId": "s1", "activityName": "a", "coreText": "x"},
+        "not an object",
+        {"spiritId": "s2", "activityName": "b", "coreText": "y"},
+    ]).encode("utf-8")
+    rows = parse_rows("batch.json", content)
+    assert [r["_row"] for r in rows] == [1, 2, 3]
+    assert rows[0]["activityName"] == "a" and rows[2]["activityName"] == "b"
+    assert "_error" in rows[1]
+
+
+@pytest.mark.parametrize("content", [b'{"spiritId": "s1"}', b"[{", b'{"a": 1}\n{"a": 2}\n'])
+def test_json_upload_that_is_not_an_array_is_rejected(content):
+    with pytest.raises(ValueError):
+        parse_rows("batch.json", content)
+
+
+def test_jsonl_upload_still_reads_one_object_per_line():
+    rows = parse_rows("batch.jsonl", b'{"activityName": "a"}\n\n{"activityName": "b"}\n')
+    assert [(r["activityName"], r["_row"]) for r in rows] == [("a", 1), ("b", 3)]
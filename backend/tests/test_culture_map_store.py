@@ -0,0 +1,79 @@
+import json
+
+import pytest
+
+from modules import culture_map_store as store
+from modules import session_artifact_store
+from modules.session_manager import create_session
+
+
+def _new_session() -> str:
+    return create_session(name="culture map test")["code"]
+
+
+def _note(note_id: str, text: str = "") -> dict:
+    return {"id": note_id, "text": text}
+
+
+def test_delta_updating_removed_note_is_rejected_without_writing():
+    code = _new_session()
+    store.save_snapshot(code, {"notes": [_note("a", "first")], "connections": [], "layerState": {}})
+    assert store.get_latest_version(code) == 1
+
+    with pytest.raises(ValueError):
+        store.apply_delta(code, 1, {"notes": {"removed": ["a"], "updated": [_note("a", "changed")]}})
+
+    # 거부된 델타는 기록되지 않고 맵도 그대로다
+    assert store.get_latest_version(code) == 1
+    latest = store.get_latest(code)
+    assert [n["id"] for n in latest["notes"]] == ["a"]
+
+    # 이후 정상 델타도 계속 적용된다
+    result = store.apply_delta(code, 1, {"notes": {"updated": [_note("a", "changed")]}})
+    assert result["version"] == 2
+    assert store.get_latest(code)["notes"] == [_note("a", "changed")]
+
+
+def test_failed_apply_leaves_cached_state_untouched(monkeypatch):
+    code = _new_session()
+    store.save_snapshot(code, {"notes": [_note("a")], "connections": [], "layerState": {}})
+    before = store.get_latest(code)
+
+    def broken_apply(self, ops, version, timestamp):
+        raise RuntimeError("apply failed")
+
+    monkeypatch.setattr(store._MapState, "_apply", broken_apply)
+    with pytest.raises(RuntimeError):
+        store.apply_delta(code, 1, {"notes": {"added": [_note("b")]}})
+    monkeypatch.undo()
+
+    assert store.get_latest_version(code) == 1
+    assert store.get_latest(code) == before
+    assert len(store.list_versions(code)) == 1
+
+
+def _save_legacy(monkeypatch, code: str, content: str, created_at: int) -> None:
+    monkeypatch.setattr(session_artifact_store.time, "time", lambda: created_at)
+    session_artifact_store.save_session_artifact(
+        session_code=code, content=content, team=None, label=None, type_="culture_map"
+    )
+    monkeypatch.undo()
+
+
+def test_legacy_map_is_read_without_writing_and_migrated_on_first_delta(monkeypatch):
+    code = _new_session()
+    legacy = {"notes": [_note("old")], "connections": [], "layerState": {"layer": 1}}
+    _save_legacy(monkeypatch, code, json.dumps(legacy), 1000)
+    # 최신 artifact가 깨져 있으면 그 이전 artifact로 대신한다
+    _save_legacy(monkeypatch, code, "{not json", 2000)
+
+    data = session_artifact_store.get_latest_culture_map_data(code)
+    assert data["version"] == 0
+    assert data["notes"] == [_note("old")]
+    assert store.get_latest_version(code) == 0
+
+    result = session_artifact_store.apply_culture_map_delta(code, 0, {"notes": {"added": [_note("new")]}})
+    assert result["version"] == 2
+    latest = store.get_latest(code)
+    assert [n["id"] for n in latest["notes"]] == ["old", "new"]
+    assert latest["layerState"] == {"layer": 1}
@@ -0,0 +1,81 @@
+import asyncio
+
+from modules import event_bus as bus_module
+from modules.event_bus import RESYNC, EventBus, Subscription, session_topic
+
+
+async def _wait_for(condition, timeout: float = 5.0) -> None:
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline, "timed out"
+        await asyncio.sleep(0.01)
+
+
+def _broker_knows(bus: EventBus, topic: str):
+    return lambda: any(topic in c.topics for c in bus.broker.connections)
+
+
+def test_publish_reaches_subscribers_in_other_workers():
+    async def scenario():
+        # 같은 프로세스 안의 두 클라이언트로 두 워커를 흉내 낸다 (먼저 시작한 쪽이 브로커)
+        first, second = EventBus(), EventBus()
+        await first.start()
+        await _wait_for(lambda: first.stats()["connected"] and first.broker is not None)
+        await second.start()
+        await _wait_for(lambda: second.stats()["connected"])
+        try:
+            topic = session_topic("ABC123")
+            sub = first.subscribe(topic)
+            other = first.subscribe(session_topic("OTHER"))
+            await _wait_for(_broker_knows(first, topic))
+
+            second.publish(topic, {"type": "field.updated", "fieldId": "f1"})
+            event = await sub.get(timeout=5)
+            assert event["type"] == "field.updated" and event["fieldId"] == "f1"
+            assert await other.get(timeout=0.1) is None
+            assert second.broker is None
+        finally:
+            await second.stop()
+            await first.stop()
+
+    asyncio.run(scenario())
+
+
+def test_subscriber_overflow_leaves_single_resync():
+    async def scenario():
+        sub = Subscription("session:X", maxsize=3)
+        for i in range(4):
+            sub.deliver({"type": "field.updated", "n": i})
+        assert sub.queue.qsize() == 1
+        assert await sub.get(timeout=1) == RESYNC
+        assert sub.dropped == 4
+
+    asyncio.run(scenario())
+
+
+class _Writer:
+    def __init__(self):
+        self.frames = []
+
+    def write(self, data: bytes) -> None:
+        self.frames.append(data)
+
+    async def drain(self) -> None:
+        pass
+
+
+def test_broker_connection_overflow_sends_one_resync_for_lost_topics(monkeypatch):
+    monkeypatch.setattr(bus_module, "CONNECTION_QUEUE", 2)
+
+    async def scenario():
+        writer = _Writer()
+        conn = bus_module._BrokerConnection(writer)
+        for i, topic in enumerate(["a", "b", "c", "a", "d"]):
+            conn.send(topic, b"pub-%d\n" % i)
+        pump = asyncio.ensure_future(conn.pump())
+        await asyncio.sleep(0.01)
+        pump.cancel()
+        return writer.frames
+
+    frames = asyncio.run(scenario())
+    assert frames == [bus_module._frame({"op": "resync", "topics": ["a", "b", "c", "d"]})]
@@ -0,0 +1,111 @@
+import asyncio
+import time
+
+import pytest
+
+from modules.idempotency import IdempotencyCache, IdempotencyKeyReused
+
+
+class _Counter:
+    """실행 횟수를 세는 쓰기 작업 (gate가 있으면 열릴 때까지 기다린다)"""
+
+    def __init__(self, gate: "asyncio.Event | None" = None):
+        self.calls = 0
+        self.gate = gate
+
+    async def __call__(self):
+        self.calls += 1
+        if self.gate is not None:
+            await self.gate.wait()
+        return {"id": f"a{self.calls}"}
+
+
+def test_retry_replays_first_result():
+    async def scenario():
+        cache = IdempotencyCache(shared=None)
+        write = _Counter()
+        first = await cache.run("/api/artifacts", "k1", {"content": "x"}, write)
+        again = await cache.run("/api/artifacts", "k1", {"content": "x"}, write)
+        return first, again, write.calls
+
+    first, again, calls = asyncio.run(scenario())
+    assert first == ({"id": "a1"}, False)
+    assert again == ({"id": "a1"}, True)
+    assert calls == 1
+
+
+def test_same_key_with_different_body_is_rejected():
+    async def scenario():
+        cache = IdempotencyCache(shared=None)
+        await cache.run("/api/artifacts", "k1", {"content": "x"}, _Counter())
+        await cache.run("/api/artifacts", "k1", {"content": "y"}, _Counter())
+
+    with pytest.raises(IdempotencyKeyReused):
+        asyncio.run(scenario())
+
+
+def test_reused_key_maps_to_422():
+    from fastapi.testclient import TestClient
+
+    import app
+
+    client = TestClient(app.app)
+    headers = {"Idempotency-Key": "reuse-test"}
+    first = client.post("/api/artifacts", json={"content": "x"}, headers=headers)
+    assert first.status_code == 200
+    replay = client.post("/api/artifacts", json={"content": "x"}, headers=headers)
+    assert replay.json() == first.json()
+    assert replay.headers.get("Idempotent-Replayed") == "true"
+    assert client.post("/api/artifacts", json={"content": "y"}, headers=headers).status_code == 422
+
+
+def test_concurrent_duplicates_run_once():
+    async def scenario():
+        cache = IdempotencyCache(shared=None)
+        gate = asyncio.Event()
+        write = _Counter(gate)
+        tasks = [asyncio.create_task(cache.run("/p", "k", {"n": 1}, write)) for _ in range(5)]
+        await asyncio.sleep(0)
+        gate.set()
+        return await asyncio.gather(*tasks), write.calls
+
+    results, calls = asyncio.run(scenario())
+    assert calls == 1
+    assert [r[0] for r in results] == [{"id": "a1"}] * 5
+    assert sorted(r[1] for r in results) == [False] + [True] * 4
+
+
+def test_entries_expire_after_ttl():
+    async def scenario():
+        cache = IdempotencyCache(ttl=0.05, shared=None)
+        write = _Counter()
+        await cache.run("/p", "k", {}, write)
+        time.sleep(0.1)
+        result = await cache.run("/p", "k", {}, write)
+        return result, write.calls
+
+    result, calls = asyncio.run(scenario())
+    assert result == ({"id": "a2"}, False)
+    assert calls == 2
+
+
+def test_waiters_take_over_when_first_request_is_cancelled():
+    async def scenario():
+        cache = IdempotencyCache(shared=None)
+        gate = asyncio.Event()
+        write = _Counter(gate)
+        owner = asyncio.create_task(cache.run("/p", "k", {}, write))
+        await asyncio.sleep(0)
+        waiters = [asyncio.create_task(cache.run("/p", "k", {}, write)) for _ in range(3)]
+        await asyncio.sleep(0)
+        owner.cancel()  # 첫 요청의 클라이언트가 연결을 끊음
+        await asyncio.sleep(0)
+        gate.set()
+        results = await asyncio.gather(*waiters)
+        return owner, results, write.calls
+
+    owner, results, calls = asyncio.run(scenario())
+    assert owner.cancelled()
+    assert calls == 2
+    assert [r[0] for r in results] == [{"id": "a2"}] * 3
+    assert sorted(r[1] for r in results) == [False, True, True]
@@ -0,0 +1,33 @@
+import math
+
+import pytest
+
+from modules import jsonio
+
+SAMPLE = {
+    "finite": 1.5,
+    "nan": math.nan,
+    "items": [math.inf, -math.inf, 2, "한글"],
+    "nested": {"t": (math.nan, 0.25)},
+}
+EXPECTED = '{"finite":1.5,"nan":null,"items":[null,null,2,"한글"],"nested":{"t":[null,0.25]}}'.encode("utf-8")
+
+
+@pytest.fixture(params=["orjson", "json"])
+def backend(request, monkeypatch):
+    if request.param == "orjson":
+        if jsonio.orjson is None:
+            pytest.skip("orjson is not installed")
+    else:
+        monkeypatch.setattr(jsonio, "orjson", None)
+    return request.param
+
+
+def test_non_finite_floats_serialize_as_null(backend):
+    assert jsonio.dumps(SAMPLE) == EXPECTED
+    assert jsonio.dumps_text(SAMPLE) == EXPECTED.decode("utf-8")
+    assert jsonio.loads(jsonio.dumps(SAMPLE))["nan"] is None
+
+
+def test_big_int_falls_back_to_stdlib_without_nan(backend):
+    assert jsonio.dumps({"big": 2 ** 70, "x": math.nan}) == b'{"big":1180591620717411303424,"x":null}'
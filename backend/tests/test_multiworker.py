@@ -0,0 +1,125 @@
+"""
+uvicorn --workers N 에서 안전하다고 문서화한 공유 상태를 실제 여러 프로세스로 경합시켜 확인한다.
+
+- shared_state(SQLite WAL): gw_tokens, blob_cache
+- culture_map_store: 파일 잠금으로 직렬화되는 델타 기록
+- artifact_store / session_artifact_store: 파일 잠금 + 원자적 교체로 직렬화되는 인덱스 추가
+"""
+import multiprocessing
+import time
+
+from modules import artifact_store, culture_map_store, session_artifact_store, shared_state
+from modules.session_manager import create_session
+
+PROCESSES = 4
+ITEMS = 50
+CACHE_MAX_BYTES = 64 * 1024
+
+
+def _run_workers(target, *args):
+    ctx = multiprocessing.get_context("spawn")  # 워커처럼 모듈 상태를 공유하지 않는 새 프로세스
+    start = ctx.Event()
+    errors = ctx.Queue()
+    procs = [ctx.Process(target=target, args=(i, start, errors) + args) for i in range(PROCESSES)]
+    for p in procs:
+        p.start()
+    start.set()
+    for p in procs:
+        p.join(120)
+    failures = []
+    while not errors.empty():
+        failures.append(errors.get())
+    assert not failures, failures
+    assert all(p.exitcode == 0 for p in procs), [p.exitcode for p in procs]
+
+
+def _shared_state_worker(worker: int, start, errors, path: str) -> None:
+    from pathlib import Path
+
+    db = Path(path)
+    cache = shared_state.SharedBlobCache("test", CACHE_MAX_BYTES, path=db)
+    start.wait()
+    try:
+        expires_at = time.time() + 3600
+        for i in range(ITEMS):
+            shared_state.issue_token(f"gw_{worker}_{i}", expires_at, path=db)
+            shared_state.issue_token("gw_shared", expires_at + worker, path=db)
+            cache.put(f"{worker}:{i}", bytes([worker]) * 1024)
+            cache.put("shared", bytes([worker]) * 512)
+            # 다른 워커가 쓴 값을 읽는 것도 함께 경합시킨다
+            shared_state.token_expiry(f"gw_{(worker + 1) % PROCESSES}_{i}", path=db)
+            cache.get(f"{(worker + 1) % PROCESSES}:{i}")
+        if cache.errors:
+            errors.put(f"worker {worker}: {cache.errors} cache errors")
+    except Exception as e:  # 자식 프로세스의 예외를 부모 테스트로 전달
+        errors.put(f"worker {worker}: {e!r}")
+
+
+def test_shared_state_under_concurrent_workers(tmp_path):
+    db = tmp_path / "shared.sqlite3"
+    _run_workers(_shared_state_worker, str(db))
+
+    for worker in range(PROCESSES):
+        for i in range(ITEMS):
+            assert shared_state.token_expiry(f"gw_{worker}_{i}", path=db) is not None
+    assert shared_state.token_expiry("gw_shared", path=db) is not None
+
+    conn = shared_state._connect(db)
+    assert conn.execute("SELECT COUNT(*) FROM gw_tokens").fetchone()[0] == PROCESSES * ITEMS + 1
+    stats = shared_state.SharedBlobCache("test", CACHE_MAX_BYTES, path=db).stats()
+    assert 0 < stats["bytes"] <= CACHE_MAX_BYTES
+
+
+def _culture_map_worker(worker: int, start, errors, session_code: str) -> None:
+    start.wait()
+    try:
+        for i in range(ITEMS // 5):
+            note = {"id": f"n{worker}-{i}", "text": str(i)}
+            while True:
+                base = culture_map_store.get_latest_version(session_code)
+                try:
+                    culture_map_store.apply_delta(session_code, base, {"notes": {"added": [note]}})
+                    break
+                except culture_map_store.CultureMapConflict:
+                    continue
+    except Exception as e:
+        errors.put(f"worker {worker}: {e!r}")
+
+
+def test_culture_map_deltas_from_concurrent_workers():
+    code = create_session(name="multi worker")["code"]
+    culture_map_store.save_snapshot(code, {"notes": [], "connections": [], "layerState": {}})
+    _run_workers(_culture_map_worker, code)
+
+    total = PROCESSES * (ITEMS // 5)
+    assert culture_map_store.get_latest_version(code) == 1 + total
+    notes = culture_map_store.get_latest(code)["notes"]
+    assert sorted(n["id"] for n in notes) == sorted(
+        f"n{w}-{i}" for w in range(PROCESSES) for i in range(ITEMS // 5)
+    )
+    assert len(culture_map_store.list_versions(code)) == 1 + total
+
+
+def _artifact_worker(worker: int, start, errors, session_code: str, team: str) -> None:
+    start.wait()
+    try:
+        for i in range(ITEMS):
+            label = f"w{worker}-{i}"
+            artifact_store.save_artifact(content=label, team=team, label=label, type_="prompt")
+            session_artifact_store.save_session_artifact(
+                session_code=session_code, content=label, team=team, label=label, type_="prompt"
+            )
+    except Exception as e:
+        errors.put(f"worker {worker}: {e!r}")
+
+
+def test_artifact_indexes_from_concurrent_workers():
+    code = create_session(name="multi worker artifacts")["code"]
+    team = "multi-worker"
+    _run_workers(_artifact_worker, code, team)
+
+    expected = sorted(f"w{w}-{i}" for w in range(PROCESSES) for i in range(ITEMS))
+    saved = artifact_store.query_artifacts(team=team, limit=PROCESSES * ITEMS)["items"]
+    assert sorted(it["label"] for it in saved) == expected
+    session_saved = session_artifact_store.query_session_artifacts(code, team=team, limit=PROCESSES * ITEMS)["items"]
+    assert sorted(it["label"] for it in session_saved) == expected
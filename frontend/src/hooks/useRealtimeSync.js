@@ -46,6 +46,8 @@ export const useRealtimeSync = (sessionCode) => {
 
   const MAX_BACKOFF = 5000;
   const MIN_BACKOFF = 500;
+  // 서버가 제안하는 간격(nextPollMs)은 부하가 높을 때 MAX_BACKOFF보다 길 수 있다
+  const MAX_SERVER_DELAY = 10000;
 
   // 동적 API URL 초기화
   useEffect(() => {
@@ -108,7 +110,7 @@ export const useRealtimeSync = (sessionCode) => {
         {
           method: 'GET',
           cache: 'no-store',
-          headers: { 'Cache-Control': 'no-cache' },
+          headers: { 'Cache-Control': 'no-cache', 'X-Client-Id': userIdRef.current },
           signal: abortRef.current.signal,
         }
       );
@@ -128,12 +130,20 @@ export const useRealtimeSync = (sessionCode) => {
         } else {
           backoffMsRef.current = Math.min(backoffMsRef.current + 500, MAX_BACKOFF);
         }
+        // 서버가 세션 활동/부하를 보고 제안한 간격이 있으면 그대로 따른다
+        const suggested = Number(data.nextPollMs);
+        if (Number.isFinite(suggested) && suggested > 0) {
+          backoffMsRef.current = Math.min(Math.max(suggested, MIN_BACKOFF), MAX_SERVER_DELAY);
+        }
       } else if (res.status === 404) {
         // 세션 없음 → 천천히 재시도
         backoffMsRef.current = Math.min(Math.max(backoffMsRef.current, 2000), MAX_BACKOFF);
       } else if (res.status === 429) {
-        // 레이트 리밋 → 큰 백오프
-        backoffMsRef.current = Math.min(5000, MAX_BACKOFF);
+        // 레이트 리밋 → Retry-After(초)만큼 기다림 (없으면 큰 백오프)
+        const retryAfter = Number(res.headers.get('Retry-After'));
+        backoffMsRef.current = Number.isFinite(retryAfter) && retryAfter > 0
+          ? Math.min(retryAfter * 1000, MAX_SERVER_DELAY)
+          : MAX_BACKOFF;
       } else {
         console.error('Failed to poll field updates:', res.status, res.statusText);
         backoffMsRef.current = Math.min(Math.max(backoffMsRef.current, 2000), MAX_BACKOFF);
@@ -161,7 +171,7 @@ export const useRealtimeSync = (sessionCode) => {
     try {
       await fetch(`${dynamicApiBase}/fields/unlock`, {
         method: 'POST',
-        headers: { 'Content-Type': 'application/json' },
+        headers: { 'Content-Type': 'application/json', 'X-Client-Id': userIdRef.current },
         body: JSON.stringify({
           sessionCode: sessionCodeRef.current,
           fieldId,
@@ -180,7 +190,7 @@ export const useRealtimeSync = (sessionCode) => {
     try {
       const response = await fetch(`${dynamicApiBase}/fields/lock`, {
         method: 'POST',
-        headers: { 'Content-Type': 'application/json' },
+        headers: { 'Content-Type': 'application/json', 'X-Client-Id': userIdRef.current },
         body: JSON.stringify({
           sessionCode: sessionCodeRef.current,
           fieldId,
@@ -213,7 +223,7 @@ export const useRealtimeSync = (sessionCode) => {
     try {
       const response = await fetch(`${dynamicApiBase}/fields/update`, {
         method: 'POST',
-        headers: { 'Content-Type': 'application/json' },
+        headers: { 'Content-Type': 'application/json', 'X-Client-Id': userIdRef.current },
         body: JSON.stringify({
           sessionCode: sessionCodeRef.current,
           fieldId,
@@ -272,7 +282,7 @@ export const useRealtimeSync = (sessionCode) => {
       Object.keys(lockTimeouts.current).forEach((fid) => {
         void fetch(`${dynamicApiBase}/fields/unlock`, {
           method: 'POST',
-          headers: { 'Content-Type': 'application/json' },
+          headers: { 'Content-Type': 'application/json', 'X-Client-Id': userIdRef.current },
           body: JSON.stringify({
             sessionCode: sessionCodeRef.current,
             fieldId: fid,
@@ -12,6 +12,36 @@ async function initializeDynamicApi() {
   }
 }
 
+// 쓰기 요청을 같은 Idempotency-Key로 재시도 (네트워크 오류/5xx 시).
+// 서버는 같은 키의 재시도에 처음 결과를 돌려주므로 파일이 중복 저장되지 않는다.
+function newIdempotencyKey() {
+  try {
+    return crypto.randomUUID();
+  } catch {
+    return `${Date.now()}_${Math.random().toString(36).substr(2, 12)}`;
+  }
+}
+
+async function postIdempotent(url, body, retries = 2) {
+  const key = newIdempotencyKey();
+  for (let attempt = 0; ; attempt++) {
+    try {
+      const response = await fetch(url, {
+        method: 'POST',
+        headers: {
+          'Content-Type': 'application/json',
+          'Idempotency-Key': key,
+        },
+        body: JSON.stringify(body),
+      });
+      if (response.status < 500 || attempt >= retries) return response;
+    } catch (error) {
+      if (attempt >= retries) throw error;
+    }
+    await new Promise((resolve) => setTimeout(resolve, 500 * 2 ** attempt));
+  }
+}
+
 export const useSession = () => {
   const [currentSessionCode, setCurrentSessionCode] = useState(null);
   const [currentSessionName, setCurrentSessionName] = useState(null);
@@ -127,17 +157,11 @@ export const useSession = () => {
     if (!currentSessionCode) return false;
 
     try {
-      const response = await fetch(`${dynamicApiBase}/culture-map`, {
-        method: 'POST',
-        headers: {
-          'Content-Type': 'application/json',
-        },
-        body: JSON.stringify({
-          sessionCode: currentSessionCode,
-          notes,
-          connections,
-          layerState,
-        }),
+      const response = await postIdempotent(`${dynamicApiBase}/culture-map`, {
+        sessionCode: currentSessionCode,
+        notes,
+        connections,
+        layerState,
       });
 
       return response.ok;
@@ -171,16 +195,10 @@ export const useSession = () => {
     if (!currentSessionCode) return null;
 
     try {
-      const response = await fetch(`${dynamicApiBase}/session-artifacts`, {
-        method: 'POST',
-        headers: {
-          'Content-Type': 'application/json',
-        },
-        body: JSON.stringify({
-          sessionCode: currentSessionCode,
-          content,
-          ...options,
-        }),
+      const response = await postIdempotent(`${dynamicApiBase}/session-artifacts`, {
+        sessionCode: currentSessionCode,
+        content,
+        ...options,
       });
 
       if (response.ok) {